@@ -0,0 +1,10 @@
+from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
+
+from core.http import get_session
+
+
+class SocialAccountAdapter(DefaultSocialAccountAdapter):
+    def get_requests_session(self):
+        # allauth builds a new session per call by default, so the token
+        # exchange and the user info request would each open a connection.
+        return get_session()
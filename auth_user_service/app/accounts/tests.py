@@ -1,3 +1,66 @@
+"""
+Tests for the Google login callback.
+"""
+from unittest.mock import patch
+
+from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+
+from core.http import reset_session
+from core.tests.http_stub import StubServer
+
+
+GOOGLE_CALLBACK_URL = reverse('google_login_callback')
+
+
+class GoogleLoginCallbackTests(TestCase):
+    """Test exchanging the code of the Google redirect for JWTs."""
+
+    def setUp(self):
+        reset_session()
+        self.addCleanup(reset_session)
+        self.server = StubServer({
+            ('POST', '/token'): (200, {'access_token': 'google-token', 'expires_in': 3600}),
+            ('GET', '/userinfo'): (200, {
+                'id': '1234',
+                'email': 'google@example.com',
+                'verified_email': True,
+                'given_name': 'Google',
+                'family_name': 'User',
+            }),
+        })
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        patcher = patch.multiple(
+            GoogleOAuth2Adapter,
+            access_token_url=f'{self.server.url}/token',
+            identity_url=f'{self.server.url}/userinfo',
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_missing_code(self):
+        """Test the code is required."""
+        res = self.client.get(GOOGLE_CALLBACK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_code_exchanged_in_process(self):
+        """Test the social login runs in-process over one pooled connection."""
+        for code in ('first', 'second'):
+            res = self.client.get(GOOGLE_CALLBACK_URL, {'code': code})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertIn('access', res.json())
+            self.assertIn('refresh', res.json())
 
-# Create your tests here.
+        self.assertTrue(get_user_model().objects.filter(email='google@example.com').exists())
+        self.assertEqual(
+            [(method, path) for method, path, _ in self.server.requests],
+            [('POST', '/token'), ('GET', '/userinfo')] * 2,
+        )
+        self.assertIn('code=first', self.server.requests[0][2])
+        self.assertEqual(self.server.connections, 1)
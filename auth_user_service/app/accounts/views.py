@@ -1,27 +1,83 @@
-from urllib.parse import urljoin
-import requests
-
 from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render
-from django.urls import reverse
 from django.views import View
 
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 
 from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
 from allauth.socialaccount.providers.oauth2.client import OAuth2Client
-from dj_rest_auth.registration.views import SocialLoginView
+from dj_rest_auth.jwt_auth import get_refresh_view
+from dj_rest_auth.registration.views import RegisterView, SocialLoginView
+from dj_rest_auth.views import LoginView, PasswordResetView
+
+from core.metrics import LOGINS, TOKEN_REFRESHES, OutcomeMetricMixin
+from core.throttling import AUTH_THROTTLE_CLASSES
+from core.tokens import revoked_tokens
+from core.views import AsyncAPIView
+from user.serializers import TokenRefreshSerializer
+
+
+# Throttled before the serializer runs, so rejected requests never reach
+# the password hasher.
+class ThrottledLoginView(OutcomeMetricMixin, LoginView):
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    outcome_metric = LOGINS
+    outcome_labels = {'method': 'password'}
+
+
+class ThrottledRegisterView(RegisterView):
+    throttle_classes = AUTH_THROTTLE_CLASSES
+
+
+class ThrottledPasswordResetView(PasswordResetView):
+    throttle_classes = AUTH_THROTTLE_CLASSES
 
 
-class GoogleLogin(SocialLoginView):
+class TokenRefreshView(OutcomeMetricMixin, get_refresh_view()):
+    # Checks revocation through the cached set, see core.tokens.
+    serializer_class = TokenRefreshSerializer
+    outcome_metric = TOKEN_REFRESHES
+
+
+class TokenVerifyView(AsyncAPIView):
+    """Async version of the token verify view, see TokenVerifySerializer."""
+    authentication_required = False
+
+    async def post(self, request, *args, **kwargs):
+        token = self.get_data(request).get('token')
+        if not token:
+            message = 'This field is required.' if token is None else 'This field may not be blank.'
+            raise ValidationError({'token': [message]})
+        try:
+            token = UntypedToken(token)
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0])
+
+        jti = token.get(jwt_settings.JTI_CLAIM)
+        if jti and await revoked_tokens.ais_revoked(jti, datetime_from_epoch(token['exp'])):
+            raise ValidationError({'non_field_errors': ['Token is blacklisted']})
+        return JsonResponse({})
+
+
+class GoogleLogin(OutcomeMetricMixin, SocialLoginView):
     adapter_class = GoogleOAuth2Adapter
     callback_url = settings.GOOGLE_OAUTH_CALLBACK_URL
     client_class = OAuth2Client
+    throttle_classes = AUTH_THROTTLE_CLASSES
+    outcome_metric = LOGINS
+    outcome_labels = {'method': 'google'}
 
 
-class GoogleLoginCallback(APIView):
+class GoogleLoginCallback(GoogleLogin):
+    http_method_names = ['get', 'options']
+
     def get(self, request, *args, **kwargs):
         """
         If you are building a fullstack application (eq. with React app next to Django)
@@ -34,11 +90,13 @@ class GoogleLoginCallback(APIView):
         if code is None:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        # Remember to replace the localhost:8000 with the actual domain name before deployment
-        token_endpoint_url = urljoin("http://localhost:8000", reverse("google_login"))
-        response = requests.post(url=token_endpoint_url, data={"code": code})
-
-        return Response(response.json(), status=status.HTTP_200_OK)
+        # Same flow as a POST to the Google login view, run in-process.
+        # The calls to Google go through the pooled session, see
+        # accounts.adapter.
+        self.serializer = self.get_serializer(data={"code": code})
+        self.serializer.is_valid(raise_exception=True)
+        self.login()
+        return self.get_response()
 
 
 class LoginPage(View):
@@ -50,4 +108,4 @@ class LoginPage(View):
                 "google_callback_uri": settings.GOOGLE_OAUTH_CALLBACK_URL,
                 "google_client_id": settings.GOOGLE_OAUTH_CLIENT_ID,
             },
-        )
\ No newline at end of file
+        )
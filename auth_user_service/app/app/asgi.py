@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Route the hot endpoints to their async views, see core.views.get_served_view.
+os.environ.setdefault('ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -65,6 +66,9 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    # First, so that it times the whole stack.
+    'core.timing.RequestTimingMiddleware',
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +78,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
     'allauth.account.middleware.AccountMiddleware',
+    'core.replicas.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -96,19 +101,171 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+# Serve the hot endpoints with their async views; set by app/asgi.py, since
+# under WSGI the sync views are faster. See core.views.get_served_view.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'false') == 'true'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# External connection pooler in front of Postgres (e.g. PgBouncer): empty
+# when connecting directly, 'session' or 'transaction' for its pool mode.
+DATABASE_POOLER = os.getenv('DB_POOLER', '')
+
+# Seconds a connection is kept open for the next requests of the same
+# worker thread; 0 closes it after each request, 'none' never does. Keep 0
+# under ASGI, where requests do not reuse threads.
+DB_CONN_MAX_AGE = os.getenv('DB_CONN_MAX_AGE', '60')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'HOST': os.getenv('DB_HOST'),
+        'PORT': os.getenv('DB_PORT', ''),
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
+        'CONN_MAX_AGE': None if DB_CONN_MAX_AGE.lower() == 'none' else int(DB_CONN_MAX_AGE),
+        # Checks a persistent connection before reusing it in a request,
+        # so a restarted database or pooler costs no failed request.
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true',
+        # Server-side cursors (QuerySet.iterator()) would outlive the
+        # transaction on the pooler's server connection.
+        'DISABLE_SERVER_SIDE_CURSORS': DATABASE_POOLER == 'transaction',
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+        },
+    }
+}
 
+# Read replicas, as a comma separated list of hosts sharing the other
+# settings of the primary. Safe reads of the admin and profile views go to
+# them, see core.replicas.
+for index, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    'REPLICAS': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_TTL': int(os.getenv('DB_REPLICA_PIN_TTL', 5)),
+    'MAX_LAG': float(os.getenv('DB_REPLICA_MAX_LAG', 5)),
+}
+
+
+# Worker processes serving the app, when not sized by gunicorn.conf.py
+# (e.g. uvicorn --workers). With more than one, the caches must be shared,
+# see core.checks.
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 0))
+
+
+# Request instrumentation, see core.timing.RequestTimingMiddleware
+REQUEST_TIMING = {
+    # Server-Timing header, for development and benchmark runs only.
+    'HEADER': os.getenv('REQUEST_TIMING_HEADER', 'false') == 'true',
+    'LOG': os.getenv('REQUEST_TIMING_LOG', 'true') == 'true',
+}
+
+# Prometheus metrics, see core.metrics
+METRICS = {
+    # Comma separated addresses or networks allowed to read /metrics, by
+    # the peer address of the request: add the Prometheus server's.
+    'ALLOWED_NETWORKS': [
+        network.strip() for network in os.getenv('METRICS_ALLOWED_NETWORKS', '127.0.0.1,::1').split(',')
+        if network.strip()
+    ],
+}
+
+# Logging
+# https://docs.djangoproject.com/en/4.2/topics/logging/
+# The per-request records are logged at INFO level; set
+# REQUEST_TIMING_LOG_LEVEL=INFO to write them.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'request_timing': {'()': 'core.timing.RequestTimingFormatter'},
+    },
+    'handlers': {
+        'request_timing': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'request_timing',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['request_timing'],
+            'level': os.getenv('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Use a shared backend (e.g. django.core.cache.backends.redis.RedisCache)
+# in production so that user invalidation reaches every worker process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+    # Authentication throttle counters, see core.throttling. Shared across
+    # workers in production so that the limits apply to the whole service.
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', 'throttle'),
+    },
+}
+
+# Resolved users for JWT authentication, see core.cache.UserCache
+USER_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'LOCAL_MAXSIZE': int(os.getenv('USER_CACHE_LOCAL_MAXSIZE', 1024)),
+    'LOCAL_TTL': int(os.getenv('USER_CACHE_LOCAL_TTL', 30)),
+    'SHARED_TTL': int(os.getenv('USER_CACHE_SHARED_TTL', 300)),
+}
+
+# Bulk user import, see user.bulk.BulkUserImporter
+USER_BULK_IMPORT = {
+    'BATCH_SIZE': int(os.getenv('USER_BULK_IMPORT_BATCH_SIZE', 500)),
+    # Processes hashing passwords in import_users; 0 uses one per CPU, 1
+    # hashes in-process. The API endpoint always hashes in-process.
+    'HASH_WORKERS': int(os.getenv('USER_BULK_IMPORT_HASH_WORKERS', 0)),
+    # Rows accepted by the API endpoint, whose hashes must fit the server
+    # timeout (about 0.3 s each); larger files go to import_users.
+    'MAX_API_ROWS': int(os.getenv('USER_BULK_IMPORT_MAX_API_ROWS', 100)),
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/4.2/topics/auth/passwords/
+# New passwords are hashed with the first hasher. Hashes made by the others,
+# or with other costs, are upgraded on login (see core.hashers).
+
+PASSWORD_HASHERS = [
+    'core.hashers.PBKDF2PasswordHasher',
+    'core.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if os.getenv('PASSWORD_HASHER', 'pbkdf2') == 'argon2':
+    PASSWORD_HASHERS[:2] = reversed(PASSWORD_HASHERS[:2])
+
+# Size the costs with `manage.py benchmark_hashers` on the production hosts.
+PASSWORD_HASHING = {
+    'PBKDF2_ITERATIONS': int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 600000)),
+    'ARGON2_TIME_COST': int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 8)),
 }
 
 
@@ -178,8 +335,18 @@ JAZZMIN_SETTINGS = {
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'core.authentication.CachedJWTAuthentication',
+    ),
+    # Reverse proxies in front of the app, each appending the address it got
+    # the request from to X-Forwarded-For. The client address is taken that
+    # many entries from the end; with 0, the header is ignored and the peer
+    # address used, so clients cannot pick their throttle key.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    # Login, registration, password reset and Google login requests.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('AUTH_THROTTLE_IP_RATE', '30/min'),
+        'auth_email': os.getenv('AUTH_THROTTLE_EMAIL_RATE', '10/min'),
+    },
 }
 
 SIMPLE_JWT = {
@@ -189,6 +356,13 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": False,
     "TOKEN_OBTAIN_SERIALIZER": "user.serializers.MyTokenObtainPairSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "user.serializers.TokenVerifySerializer",
+}
+
+# Revoked refresh tokens, see core.tokens.RevokedTokenSet
+TOKEN_REVOCATION = {
+    'CACHE_ALIAS': os.getenv('TOKEN_REVOCATION_CACHE_ALIAS', 'default'),
+    'COMPLETE_TTL': int(os.getenv('TOKEN_REVOCATION_COMPLETE_TTL', 2 * 60 * 60)),
 }
 
 REST_AUTH = {
@@ -220,8 +394,18 @@ ACCOUNT_ADAPTER = 'allauth.account.adapter.DefaultAccountAdapter'
 ACCOUNT_AUTHENTICATED_LOGIN_REDIRECTS = True
 
 
+# Emails are queued in the outbox table and sent by the send_queued_mail
+# worker, see core.mail
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'core.mail.QueuedEmailBackend')
+EMAIL_OUTBOX = {
+    'BACKEND': os.getenv('EMAIL_OUTBOX_BACKEND', 'django.core.mail.backends.smtp.EmailBackend'),
+    'BATCH_SIZE': int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50)),
+    'MAX_ATTEMPTS': int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)),
+    'RETRY_BACKOFF': int(os.getenv('EMAIL_OUTBOX_RETRY_BACKOFF', 30)),
+}
+
 # Django SMTP
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 10))
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -232,12 +416,21 @@ ACCOUNT_EMAIL_SUBJECT_PREFIX = '[DreamDrive] '
 ACCOUNT_EMAIL_CONFIRMATION_HMAC = 'Confirmation code'
 ACCOUNT_EMAIL_CONFIRMATION_TEMPLATE = 'emails/confirmation.html'
 
+# Outbound HTTP calls (Google OAuth), see core.http
+HTTP_CLIENT = {
+    'CONNECT_TIMEOUT': float(os.getenv('HTTP_CLIENT_CONNECT_TIMEOUT', 3.05)),
+    'READ_TIMEOUT': float(os.getenv('HTTP_CLIENT_READ_TIMEOUT', 10)),
+    'RETRIES': int(os.getenv('HTTP_CLIENT_RETRIES', 2)),
+    'POOL_MAXSIZE': int(os.getenv('HTTP_CLIENT_POOL_MAXSIZE', 10)),
+}
+
 # Google OAuth
 GOOGLE_OAUTH_CLIENT_ID = os.getenv("GOOGLE_OAUTH_CLIENT_ID")
 GOOGLE_OAUTH_CLIENT_SECRET = os.getenv("GOOGLE_OAUTH_CLIENT_SECRET")
 GOOGLE_OAUTH_CALLBACK_URL = os.getenv("GOOGLE_OAUTH_CALLBACK_URL")
 
 # django-allauth (social)
+SOCIALACCOUNT_ADAPTER = 'accounts.adapter.SocialAccountAdapter'
 # Authenticate if local account with this email address already exists
 SOCIALACCOUNT_EMAIL_AUTHENTICATION = True
 # Connect local account and social account if local account with that email address already exists
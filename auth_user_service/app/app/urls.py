@@ -7,26 +7,44 @@ from django.conf.urls.static import static
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from rest_framework_simplejwt import views as jwt_views
 from allauth.account.views import ConfirmEmailView
 from dj_rest_auth.views import PasswordResetConfirmView
 from dj_rest_auth import views as dj_rest_auth_views
 from app import settings
-from accounts.views import GoogleLogin, GoogleLoginCallback, LoginPage
+from core.views import MetricsView, ReadinessView, get_served_view
+from accounts.views import (
+    GoogleLogin,
+    GoogleLoginCallback,
+    LoginPage,
+    ThrottledLoginView,
+    ThrottledPasswordResetView,
+    ThrottledRegisterView,
+    TokenRefreshView,
+    TokenVerifyView,
+)
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('health/ready/', ReadinessView.as_view(), name='readiness'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path("login/", LoginPage.as_view(), name="login"),
     path('api/v1/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/v1/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='docs'),
 
     # Auth Routes
+    # These views take precedence over the ones of the includes.
+    path('api/v1/auth/login/', ThrottledLoginView.as_view(), name='rest_login'),
+    path('api/v1/auth/registration/', ThrottledRegisterView.as_view(), name='rest_register'),
+    path('api/v1/auth/password/reset/', ThrottledPasswordResetView.as_view(), name='password_reset'),
+    path('api/v1/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/v1/auth/token/verify/', get_served_view(jwt_views.TokenVerifyView, TokenVerifyView).as_view(),
+         name='token_verify'),
     path('api/v1/auth/', include("dj_rest_auth.urls")),
     path('api/v1/auth/registration/', include('dj_rest_auth.registration.urls')),
 
     # Password Reset Endpoints
-    path('api/v1/auth/password/reset/', dj_rest_auth_views.PasswordResetView.as_view(), name='password_reset'),
-
     path('api/v1/auth/password/reset/confirm/<slug:uidb64>/<slug:token>/', dj_rest_auth_views.PasswordResetConfirmView.as_view(),
          name='password_reset_confirm'),
     path('accounts/', include('allauth.urls')),
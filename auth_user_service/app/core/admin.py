@@ -63,3 +63,12 @@ admin.site.register(models.DrivingCategory)
 admin.site.register(models.Group)
 admin.site.register(models.StudentProfile)
 admin.site.register(models.TeacherProfile)
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Define the admin page for the email outbox."""
+    list_display = ['id', 'from_email', 'recipients', 'created_at', 'send_after', 'attempts']
+    readonly_fields = ['message']
+
+
+admin.site.register(models.OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,149 @@
+"""
+Authentication classes for the application.
+"""
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import user_cache
+from core.timing import measure
+
+
+class TokenBackedUser(TokenUser):
+    """
+    User served from the validated access token claims.
+
+    Only the identity claims added in `MyTokenObtainPairSerializer.get_token`
+    are read from the token; they do not change while the token is valid.
+    Any other attribute, e.g. the names rendered by /me/, is read from the
+    cached `User` the authentication resolved, so it is current after an
+    update. Writes use `instance`, fetched from the database on first access.
+    """
+
+    def __init__(self, token, user):
+        super().__init__(token)
+        self.user = user
+
+    @cached_property
+    def email(self):
+        return self.token['email']
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    def get_full_name(self):
+        """Return full name of the user."""
+        return f"{self.first_name} {self.last_name}"
+
+    def get_username(self):
+        return self.email
+
+    @cached_property
+    def instance(self):
+        """Return the `User` model instance backing this token."""
+        return get_user_model().objects.get(
+            **{api_settings.USER_ID_FIELD: self.id}
+        )
+
+    def __str__(self):
+        return f"{self.email} ({self.role})"
+
+    def __getattr__(self, attr):
+        """Fall back to the cached user for anything not in the identity claims."""
+        if attr.startswith('_') or attr in ('token', 'user'):
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that resolves the user through `user_cache`."""
+
+    def authenticate(self, request):
+        with measure('auth'):
+            return super().authenticate(request)
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+    def check_user(self, user):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+    def get_user(self, validated_token):
+        """Return the cached user for the token, rejecting inactive ones."""
+        try:
+            user = user_cache.get(self.get_user_id(validated_token))
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        return self.check_user(user)
+
+    async def aget_user(self, validated_token):
+        """Async version of `get_user`."""
+        try:
+            user = await user_cache.aget(self.get_user_id(validated_token))
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        return self.check_user(user)
+
+    async def aauthenticate(self, request):
+        """Async version of `authenticate`, for the async views.
+
+        Token validation is CPU only; the user comes from the cache.
+        """
+        with measure('auth'):
+            header = self.get_header(request)
+            if header is None:
+                return None
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated_token = self.get_validated_token(raw_token)
+            return await self.aget_user(validated_token), validated_token
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication that builds `request.user` from the token claims
+    instead of fetching the `User` row on every request.
+
+    The cached user is still consulted so that deactivated users and tokens
+    carrying an outdated role or staff flag are rejected. Tokens issued
+    without the required claims are resolved as with `CachedJWTAuthentication`.
+    """
+    required_claims = (api_settings.USER_ID_CLAIM, 'email', 'role', 'is_staff')
+
+    def get_user(self, validated_token):
+        """Return a token-backed user, or the model user for legacy tokens."""
+        return self.get_claims_user(validated_token, super().get_user(validated_token))
+
+    async def aget_user(self, validated_token):
+        """Async version of `get_user`."""
+        return self.get_claims_user(validated_token, await super().aget_user(validated_token))
+
+    def get_claims_user(self, validated_token, user):
+        if any(claim not in validated_token for claim in self.required_claims):
+            return user
+
+        if (validated_token['role'] != user.role
+                or validated_token['is_staff'] != user.is_staff):
+            raise AuthenticationFailed(
+                _('User role has changed, please log in again.'), code='token_claims_stale'
+            )
+        return TokenBackedUser(validated_token, user)
+
+
+def get_model_user(user):
+    """Return the `User` model instance for `request.user`."""
+    if isinstance(user, TokenBackedUser):
+        return user.instance
+    return user
@@ -0,0 +1,217 @@
+"""
+Caching of resolved users for request authentication.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+
+USER_CACHE_DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'LOCAL_MAXSIZE': 1024,
+    'LOCAL_TTL': 30,
+    'SHARED_TTL': 300,
+    'KEY_PREFIX': 'user',
+}
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value for key, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class UserCache:
+    """
+    Two-level cache of `User` instances keyed by id.
+
+    Entries are keyed by a per-user version kept in the shared Django cache.
+    Bumping the version (on changes to `is_active`, `role` or `is_staff`)
+    orphans every cached copy at once, including the local ones held by
+    other processes, so the next request sees the new state. The shared
+    cache must be a cross-process backend (e.g. Redis) in production; the
+    default locmem backend is per-process and only suitable for tests.
+    """
+
+    def __init__(self, **options):
+        self._options = options
+        self._local = None
+        self._lock = threading.Lock()
+        self.shared_hits = 0
+        self.db_loads = 0
+
+    @property
+    def config(self):
+        config = dict(USER_CACHE_DEFAULTS)
+        config.update(getattr(settings, 'USER_CACHE', {}))
+        config.update(self._options)
+        return config
+
+    @property
+    def shared(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    @property
+    def local(self):
+        if self._local is None:
+            with self._lock:
+                if self._local is None:
+                    config = self.config
+                    self._local = LocalLRUCache(
+                        config['LOCAL_MAXSIZE'], config['LOCAL_TTL']
+                    )
+        return self._local
+
+    def _version_key(self, user_id):
+        return f"{self.config['KEY_PREFIX']}:{user_id}:version"
+
+    def _user_key(self, user_id, version):
+        return f"{self.config['KEY_PREFIX']}:{user_id}:v{version}"
+
+    def get_version(self, user_id):
+        """Return the current version of the cached user."""
+        key = self._version_key(user_id)
+        version = self.shared.get(key)
+        if version is None:
+            # A lost version must not bring back entries cached under an
+            # older one, so start from a fresh value instead of zero.
+            self.shared.add(key, time.time_ns(), timeout=None)
+            version = self.shared.get(key)
+        return version
+
+    async def aget_version(self, user_id):
+        """Async version of `get_version`."""
+        key = self._version_key(user_id)
+        version = await self.shared.aget(key)
+        if version is None:
+            await self.shared.aadd(key, time.time_ns(), timeout=None)
+            version = await self.shared.aget(key)
+        return version
+
+    def bump_version(self, user_id):
+        """Invalidate every cached copy of the user in all processes."""
+        key = self._version_key(user_id)
+        try:
+            self.shared.incr(key)
+        except ValueError:
+            self.shared.add(key, time.time_ns(), timeout=None)
+
+    def get(self, user_id):
+        """Return a copy of the user with the given id, raising `DoesNotExist`.
+
+        A copy is returned so that changes made while handling one request
+        never leak into the instance shared through the local cache.
+        """
+        version = self.get_version(user_id)
+        key = self._user_key(user_id, version)
+
+        user = self.local.get(key)
+        if user is not None:
+            return copy.copy(user)
+
+        user = self.shared.get(key)
+        if user is not None:
+            self.shared_hits += 1
+        else:
+            user = get_user_model().objects.get(pk=user_id)
+            self.db_loads += 1
+            self.shared.set(key, user, timeout=self.config['SHARED_TTL'])
+
+        self.local.set(key, user)
+        return copy.copy(user)
+
+    async def aget(self, user_id):
+        """Async version of `get`."""
+        version = await self.aget_version(user_id)
+        key = self._user_key(user_id, version)
+
+        user = self.local.get(key)
+        if user is not None:
+            return copy.copy(user)
+
+        user = await self.shared.aget(key)
+        if user is not None:
+            self.shared_hits += 1
+        else:
+            user = await get_user_model().objects.aget(pk=user_id)
+            self.db_loads += 1
+            await self.shared.aset(key, user, timeout=self.config['SHARED_TTL'])
+
+        self.local.set(key, user)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        """Drop the cached copy of the current version of the user."""
+        key = self._user_key(user_id, self.get_version(user_id))
+        self.shared.delete(key)
+        self.local.delete(key)
+
+    def clear(self):
+        """Clear the local cache and reset the counters."""
+        self.local.clear()
+        self.local.hits = self.local.misses = self.local.evictions = 0
+        self.shared_hits = self.db_loads = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters of this process."""
+        local = self.local
+        return {
+            'local_size': len(local),
+            'local_maxsize': local.maxsize,
+            'local_hits': local.hits,
+            'local_misses': local.misses,
+            'local_evictions': local.evictions,
+            'shared_hits': self.shared_hits,
+            'db_loads': self.db_loads,
+        }
+
+
+user_cache = UserCache()
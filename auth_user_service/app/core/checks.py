@@ -0,0 +1,57 @@
+"""
+System checks of the deployment settings.
+"""
+from django.conf import settings
+from django.core import checks
+
+from core.settings import get_setting
+
+
+PROCESS_LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def get_shared_cache_aliases():
+    """Return the cache aliases holding state all the processes must see, with what they hold."""
+    from core.cache import user_cache
+    from core.replicas import REPLICA_ROUTING_DEFAULTS
+    from core.throttling import SlidingWindowRateThrottle
+    from core.tokens import revoked_tokens
+
+    aliases = {}
+    for alias, state in (
+        (user_cache.config['CACHE_ALIAS'], 'the cached user versions'),
+        (SlidingWindowRateThrottle.cache_alias, 'the throttle counters'),
+        (get_setting('REPLICA_ROUTING', 'CACHE_ALIAS', REPLICA_ROUTING_DEFAULTS), 'the replica pins'),
+        (revoked_tokens.config['CACHE_ALIAS'], 'the revoked tokens'),
+    ):
+        aliases.setdefault(alias, []).append(state)
+    return aliases
+
+
+def check_shared_caches(workers):
+    """
+    Return an error per cache kept by each process on its own while `workers`
+    processes serve: the throttle limits would be multiplied by the number
+    of workers, and invalidations, pins and revocations would only reach
+    the process handling the write.
+    """
+    if workers <= 1:
+        return []
+    errors = []
+    for alias, states in get_shared_cache_aliases().items():
+        backend = settings.CACHES[alias]['BACKEND']
+        if backend in PROCESS_LOCAL_CACHE_BACKENDS:
+            errors.append(checks.Error(
+                f'The {alias!r} cache ({backend}) holds {", ".join(states)} '
+                f'but is local to each of the {workers} worker processes.',
+                hint='Set CACHE_BACKEND and THROTTLE_CACHE_BACKEND (and their LOCATION) to a shared '
+                     'backend, e.g. django.core.cache.backends.redis.RedisCache, or serve with one worker.',
+                id='core.E001',
+            ))
+    return errors
+
+
+@checks.register(checks.Tags.caches)
+def shared_caches_check(app_configs, **kwargs):
+    """Check the caches against the SERVER_WORKERS setting."""
+    return check_shared_caches(settings.SERVER_WORKERS)
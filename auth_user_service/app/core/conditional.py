@@ -0,0 +1,144 @@
+"""
+Conditional GET of the API reads: ETag and Last-Modified validators, and
+304 Not Modified answers to clients whose copy is current.
+
+The validators are computed from the `updated_at` columns of the rendered
+rows and the ids of their relations, never from the rendered body, so an
+unchanged resource is answered without serializing it. The ETag decides
+when both validators are sent; Last-Modified only has a one-second
+resolution.
+"""
+import hashlib
+from datetime import datetime
+
+from django.db.models import F
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from core.serializers import get_list_param
+
+
+def make_etag(*parts):
+    """Return a quoted ETag hashing the `repr()` of the parts."""
+    return quote_etag(hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest())
+
+
+def get_last_modified(values):
+    """Return the latest datetime among the values, or None."""
+    return max((value for value in values if isinstance(value, datetime)), default=None)
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add the validators to the response, which must be revalidated before reuse."""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Private to the user, and revalidated on every use, so that it is
+    # never shown stale.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def get_not_modified_response(request, etag, last_modified=None):
+    """Return a 304 (or 412) response if the client's copy is current, else None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=None if last_modified is None else int(last_modified.timestamp()),
+    )
+    if isinstance(response, HttpResponseNotModified):
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer `retrieve` and `list` of a model viewset conditionally.
+
+    `etag_lookups` select the `updated_at` of the rendered row, and
+    `etag_field_lookups` what a field renders when it is rendered: the
+    `updated_at` of its related rows, or its column if it is saved without
+    `updated_at`. The ids of the relations are selected along, since they
+    may change without `updated_at`, e.g. when a related row is deleted.
+    Expanded fields add their `etag_expand_lookups`; requests expanding a
+    field missing there are answered without validators.
+
+    The lookups are annotated on the query of the object or the page, so no
+    query is added; a current copy is answered before serialization. The
+    ETag of a list covers the rows of the requested page. Lists get no
+    Last-Modified, since a removed row would not make it newer.
+    """
+    etag_lookups = ('updated_at',)
+    etag_field_lookups = {}
+    etag_expand_lookups = {}
+    etag_annotations = None
+    etag = None
+
+    def get_etag_annotations(self):
+        """Return the annotations selecting the validators, or None."""
+        lookups = ['pk', *self.etag_lookups]
+        fields = get_list_param(self.request, 'fields')
+        for name, field_lookups in self.etag_field_lookups.items():
+            if fields is None or name in fields:
+                lookups.extend(field_lookups)
+        for name in get_list_param(self.request, 'expand') or ():
+            if name not in self.etag_expand_lookups:
+                return None
+            lookups.extend(self.etag_expand_lookups[name])
+        return {f'etag_{index}': F(lookup) for index, lookup in enumerate(dict.fromkeys(lookups))}
+
+    def get_etag(self, *parts):
+        # Differs per representation, e.g. JSON and the browsable API.
+        return make_etag(self.request.get_full_path(), self.request.accepted_renderer.format, *parts)
+
+    def get_etag_values(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name in self.etag_annotations]
+        return [getattr(row, name) for name in self.etag_annotations]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'retrieve' and self.etag_annotations:
+            queryset = queryset.annotate(**self.etag_annotations)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        self.etag_annotations = self.get_etag_annotations()
+        if self.etag_annotations is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        instance = self.get_object()
+        values = self.get_etag_values(instance)
+        etag, last_modified = self.get_etag(values), get_last_modified(values)
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is None:
+            response = set_validators(Response(self.get_serializer(instance).data), etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        self.etag_annotations = self.get_etag_annotations()
+        self.conditional_response = None
+        response = super().list(request, *args, **kwargs)
+        if self.conditional_response is not None:
+            return self.conditional_response
+        if self.etag is not None:
+            set_validators(response, self.etag)
+        return response
+
+    def paginate_queryset(self, queryset):
+        if self.etag_annotations is None or self.paginator is None:
+            return super().paginate_queryset(queryset)
+
+        # Annotated here rather than in filter_queryset, since the rows may
+        # be selected with values().
+        page = super().paginate_queryset(queryset.annotate(**self.etag_annotations))
+        self.etag = self.get_etag(
+            [self.get_etag_values(row) for row in page],
+            getattr(self.paginator, 'has_next', None),
+            getattr(self.paginator, 'has_previous', None),
+        )
+        self.conditional_response = get_not_modified_response(self.request, self.etag)
+        # Nothing is rendered for a current copy.
+        return [] if self.conditional_response is not None else page
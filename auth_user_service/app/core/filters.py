@@ -0,0 +1,65 @@
+"""
+Filter backends for the list endpoints.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+
+
+def apply_query_filters(request, queryset, filters):
+    """
+    Filter the queryset by query parameters.
+
+    `filters` maps parameter names to an (ORM lookup, DRF field) pair, the
+    field parsing and validating the raw parameter value.
+    """
+    for param, (lookup, field) in filters.items():
+        value = request.query_params.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            value = field.run_validation(value)
+        except ValidationError as exc:
+            raise ValidationError({param: exc.detail})
+        queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """Filter by the parameters declared in the view's `query_filters`."""
+
+    def filter_queryset(self, request, queryset, view):
+        return apply_query_filters(request, queryset, getattr(view, 'query_filters', {}))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': param,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string'},
+            }
+            for param in getattr(view, 'query_filters', {})
+        ]
+
+
+class PrefixSearchFilter(SearchFilter):
+    """
+    Search by prefix only.
+
+    `istartswith` compiles to `UPPER(column) LIKE 'TERM%'`, which an index on
+    `UPPER(column)` with `text_pattern_ops` serves, unlike a substring search.
+    """
+
+    def construct_search(self, field_name):
+        return f'{field_name}__istartswith'
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Whitelisted ordering with `id` appended as a tie-breaker."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') == 'id' for field in ordering):
+            direction = '-' if ordering[0].startswith('-') else ''
+            ordering = [*ordering, f'{direction}id']
+        return ordering
@@ -0,0 +1,42 @@
+"""
+Password hashers with their cost taken from the PASSWORD_HASHING setting.
+
+Django rehashes a password on login when `must_update()` reports that its
+stored hash was made with other parameters, so raising a cost here upgrades
+the hashes of the users as they log in.
+"""
+from django.contrib.auth import hashers
+
+from core.settings import get_setting
+
+
+PASSWORD_HASHING_DEFAULTS = {
+    'PBKDF2_ITERATIONS': hashers.PBKDF2PasswordHasher.iterations,
+    'ARGON2_TIME_COST': hashers.Argon2PasswordHasher.time_cost,
+    'ARGON2_MEMORY_COST': hashers.Argon2PasswordHasher.memory_cost,
+    'ARGON2_PARALLELISM': hashers.Argon2PasswordHasher.parallelism,
+}
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with `PBKDF2_ITERATIONS` iterations."""
+
+    @property
+    def iterations(self):
+        return get_setting('PASSWORD_HASHING', 'PBKDF2_ITERATIONS', PASSWORD_HASHING_DEFAULTS)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with the `ARGON2_*` time, memory (KiB) and parallelism costs."""
+
+    @property
+    def time_cost(self):
+        return get_setting('PASSWORD_HASHING', 'ARGON2_TIME_COST', PASSWORD_HASHING_DEFAULTS)
+
+    @property
+    def memory_cost(self):
+        return get_setting('PASSWORD_HASHING', 'ARGON2_MEMORY_COST', PASSWORD_HASHING_DEFAULTS)
+
+    @property
+    def parallelism(self):
+        return get_setting('PASSWORD_HASHING', 'ARGON2_PARALLELISM', PASSWORD_HASHING_DEFAULTS)
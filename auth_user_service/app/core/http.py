@@ -0,0 +1,84 @@
+"""
+Shared HTTP session for outbound calls, with connection pooling, timeouts
+and retries taken from the HTTP_CLIENT setting.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from core.settings import get_setting
+
+
+HTTP_CLIENT_DEFAULTS = {
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    # Connection errors are retried for any method, since nothing was sent.
+    # Read errors and the statuses below only for idempotent methods, so an
+    # OAuth code is never posted twice.
+    'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.2,
+    'RETRY_STATUSES': (502, 503, 504),
+    # Connections kept per host.
+    'POOL_MAXSIZE': 10,
+}
+
+
+class PooledSession(requests.Session):
+    """Session applying the configured timeout to requests without one."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', (
+            get_setting('HTTP_CLIENT', 'CONNECT_TIMEOUT', HTTP_CLIENT_DEFAULTS),
+            get_setting('HTTP_CLIENT', 'READ_TIMEOUT', HTTP_CLIENT_DEFAULTS),
+        ))
+        return super().request(method, url, **kwargs)
+
+
+def build_session():
+    """Return a new session with pooled, retrying HTTP(S) adapters."""
+    retries = get_setting('HTTP_CLIENT', 'RETRIES', HTTP_CLIENT_DEFAULTS)
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=get_setting('HTTP_CLIENT', 'BACKOFF_FACTOR', HTTP_CLIENT_DEFAULTS),
+        status_forcelist=get_setting('HTTP_CLIENT', 'RETRY_STATUSES', HTTP_CLIENT_DEFAULTS),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_maxsize=get_setting('HTTP_CLIENT', 'POOL_MAXSIZE', HTTP_CLIENT_DEFAULTS), max_retries=retry,
+    )
+    session = PooledSession()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """Return the session shared by the threads of this process.
+
+    Reusing it keeps the TCP and TLS connections to a host open across
+    requests, instead of a handshake per call.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def reset_session():
+    """Close the shared session; the next `get_session()` builds a new one."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
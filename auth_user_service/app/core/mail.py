@@ -0,0 +1,138 @@
+"""
+Queued email delivery: the email backend stores messages in an outbox
+table, and `OutboxSender` sends them from a worker process.
+"""
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import sanitize_address
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+from core.settings import get_setting
+
+
+EMAIL_OUTBOX_DEFAULTS = {
+    # Backend sending the queued emails; must be SMTP based.
+    'BACKEND': 'django.core.mail.backends.smtp.EmailBackend',
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+    # Seconds before the first retry, doubled on each further attempt.
+    'RETRY_BACKOFF': 30,
+}
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Email backend storing the messages in the outbox instead of sending them.
+
+    Requests sending emails (registration confirmation, password reset)
+    then cost one INSERT instead of an SMTP session, and emails queued in
+    a transaction that rolls back are never sent.
+    """
+
+    def send_messages(self, email_messages):
+        emails = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            encoding = message.encoding or settings.DEFAULT_CHARSET
+            emails.append(OutgoingEmail(
+                from_email=sanitize_address(message.from_email, encoding),
+                recipients=[sanitize_address(address, encoding) for address in message.recipients()],
+                message=message.message().as_bytes(linesep='\r\n'),
+            ))
+        try:
+            OutgoingEmail.objects.bulk_create(emails)
+        except DatabaseError:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(emails)
+
+
+class OutboxSender:
+    """
+    Send the due queued emails over one SMTP connection.
+
+    The connection stays open across batches until `close()`. Each batch is
+    locked with SKIP LOCKED, so several workers can run. Sent emails are
+    deleted. Failed ones are retried with an exponential backoff, except on
+    permanent (5xx) SMTP errors, and are kept after `MAX_ATTEMPTS` for
+    inspection. An email may be sent twice if the worker dies mid-batch.
+    """
+
+    def __init__(self, **options):
+        self._options = options
+        self.connection = None
+
+    def get_setting(self, name):
+        return self._options.get(name.lower(), get_setting('EMAIL_OUTBOX', name, EMAIL_OUTBOX_DEFAULTS))
+
+    def open(self):
+        if self.connection is None:
+            connection = get_connection(self.get_setting('BACKEND'))
+            connection.open()
+            self.connection = connection
+
+    def close(self):
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            try:
+                connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def send(self, email):
+        self.open()
+        try:
+            self.connection.connection.sendmail(email.from_email, email.recipients, bytes(email.message))
+        except smtplib.SMTPServerDisconnected:
+            # The server closed the connection, e.g. after being idle.
+            self.close()
+            self.open()
+            self.connection.connection.sendmail(email.from_email, email.recipients, bytes(email.message))
+
+    def send_batch(self):
+        """Send one batch of due emails; return the numbers sent and failed."""
+        max_attempts = self.get_setting('MAX_ATTEMPTS')
+        now = timezone.now()
+        with transaction.atomic():
+            emails = list(
+                OutgoingEmail.objects.filter(send_after__lte=now, attempts__lt=max_attempts)
+                .order_by('send_after', 'id')
+                .select_for_update(skip_locked=True)[:self.get_setting('BATCH_SIZE')]
+            )
+            sent = []
+            for index, email in enumerate(emails):
+                try:
+                    self.send(email)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                    # The message was rejected, the connection is still usable.
+                    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+                        permanent = all(code >= 500 for code, _ in exc.recipients.values())
+                    else:
+                        permanent = exc.smtp_code >= 500
+                    self.retry(email, exc, max_attempts if permanent else email.attempts + 1, now)
+                except (smtplib.SMTPException, OSError) as exc:
+                    # The connection is unusable, retry the rest of the batch later.
+                    self.close()
+                    for pending in emails[index:]:
+                        self.retry(pending, exc, pending.attempts + 1, now)
+                    break
+                else:
+                    sent.append(email.id)
+            OutgoingEmail.objects.filter(id__in=sent).delete()
+        return len(sent), len(emails) - len(sent)
+
+    def retry(self, email, exc, attempts, now):
+        backoff = self.get_setting('RETRY_BACKOFF') * 2 ** (attempts - 1)
+        OutgoingEmail.objects.filter(id=email.id).update(
+            attempts=attempts,
+            send_after=now + timedelta(seconds=backoff),
+            last_error=f'{type(exc).__name__}: {exc}',
+        )
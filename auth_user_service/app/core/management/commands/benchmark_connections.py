@@ -0,0 +1,70 @@
+"""
+Django command to compare the request latency with and without persistent
+database connections
+"""
+import statistics
+import time
+
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from core.models import User
+
+
+MODES = (
+    # name, CONN_MAX_AGE, CONN_HEALTH_CHECKS
+    ('new connection', 0, False),
+    ('persistent', 60, False),
+    ('persistent + health checks', 60, True),
+)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark database connection reuse"""
+    help = (
+        'Run requests doing one indexed query, with the request_started and '
+        'request_finished signals that open and close the connections, for '
+        'each CONN_MAX_AGE mode, and report their latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per mode.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        saved = {key: connection.settings_dict[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        opened = []
+
+        def count_connection(sender, **kwargs):
+            opened.append(sender)
+
+        connection_created.connect(count_connection)
+        try:
+            for name, max_age, health_checks in MODES:
+                connection.close()
+                connection.settings_dict.update(CONN_MAX_AGE=max_age, CONN_HEALTH_CHECKS=health_checks)
+                opened.clear()
+                latencies = [self.request() for _ in range(options['requests'])]
+                self.report(name, latencies, len(opened))
+        finally:
+            connection_created.disconnect(count_connection)
+            connection.close()
+            connection.settings_dict.update(saved)
+
+    def request(self):
+        """Time one request cycle; return its seconds."""
+        start = time.perf_counter()
+        request_started.send(sender=BaseHandler)
+        User.objects.filter(pk=0).exists()
+        request_finished.send(sender=BaseHandler)
+        return time.perf_counter() - start
+
+    def report(self, name, latencies, connections):
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f'{name:<28} p50 {quantiles[49] * 1000:>6.2f} ms  p95 {quantiles[94] * 1000:>6.2f} ms  '
+            f'{connections} connections'
+        )
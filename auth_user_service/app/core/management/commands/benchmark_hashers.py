@@ -0,0 +1,88 @@
+"""
+Django command to measure the password hashes per second of each core, to
+size the workers for the login peak
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+from user.bulk import _init_hash_worker
+
+
+def count_hashes(algorithm, seconds):
+    """Hash for `seconds` and return the number of hashes and the elapsed time."""
+    hasher = get_hasher(algorithm)
+    salt = hasher.salt()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.encode('benchmark-password', salt)
+        count += 1
+    return count, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    """Django command to benchmark password hashers"""
+    help = (
+        'Report the hashes/sec of the configured password hashers with their '
+        'current costs, on one core and across processes. Every login checks '
+        'one hash, so this bounds the logins/sec of a worker process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hasher', action='append', dest='algorithms',
+            help='Algorithm to measure (repeatable); all available ones by default.',
+        )
+        parser.add_argument('--seconds', type=float, default=2.0, help='Hashing time per measure.')
+        parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Parallel processes.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        algorithms = options['algorithms'] or [
+            hasher.algorithm for hasher in get_hashers() if self.is_available(hasher)
+        ]
+        for algorithm in algorithms:
+            try:
+                hasher = get_hasher(algorithm)
+            except ValueError as exc:
+                raise CommandError(exc)
+            if not self.is_available(hasher):
+                raise CommandError(f'The library of {algorithm} is not installed.')
+            self.report(hasher, options['seconds'], options['processes'])
+
+    @staticmethod
+    def is_available(hasher):
+        if hasher.library is None:
+            return True
+        try:
+            hasher._load_library()
+        except ValueError:
+            return False
+        return True
+
+    def report(self, hasher, seconds, processes):
+        params = hasher.decode(hasher.encode('benchmark-password', hasher.salt()))
+        params = ', '.join(
+            f'{name}={value}' for name, value in params.items() if name not in ('algorithm', 'hash', 'salt', 'params')
+        )
+        preferred = ' (preferred)' if hasher.algorithm == get_hasher().algorithm else ''
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {hasher.algorithm}{preferred}: {params}'))
+
+        count, elapsed = count_hashes(hasher.algorithm, seconds)
+        single = count / elapsed
+        self.stdout.write(f'1 process    {single:>10.1f} hashes/s  {1000 / single:.1f} ms per hash')
+
+        if processes > 1:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_hash_worker) as executor:
+                results = list(executor.map(
+                    count_hashes, [hasher.algorithm] * processes, [seconds] * processes
+                ))
+            total = sum(count / elapsed for count, elapsed in results)
+            self.stdout.write(
+                f'{processes} processes {total:>10.1f} hashes/s  '
+                f'{total / processes:.1f} per core, x{total / single:.1f}'
+            )
@@ -0,0 +1,149 @@
+"""
+Django command to benchmark the common admin queries with and without
+the indexes declared on the models
+"""
+import random
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import DrivingCategory, Filial, Group, User
+
+
+class Rollback(Exception):
+    """Raised to roll back the benchmark transaction."""
+
+
+class Command(BaseCommand):
+    """Django command to benchmark admin queries"""
+    help = (
+        'Seed a dataset inside a transaction, report EXPLAIN plans and timings '
+        'of the common admin queries with and without the model indexes, '
+        'then roll everything back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help='Number of users to seed.')
+        parser.add_argument('--filials', type=int, default=20, help='Number of filials to seed.')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument('--no-plans', action='store_true', help='Print timings only.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        if connection.vendor != 'postgresql':
+            raise CommandError('The benchmark requires PostgreSQL.')
+
+        self.options = options
+        try:
+            with transaction.atomic():
+                self.seed(random.Random(options['seed']))
+                after = self.run_queries('with indexes')
+                self.drop_indexes()
+                before = self.run_queries('without indexes')
+                self.report(before, after)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Rolled back the seeded data.')
+
+    def seed(self, rng):
+        """Insert filials, categories, groups and users."""
+        users = self.options['users']
+        self.stdout.write(f'Seeding {users} users...')
+
+        filials = Filial.objects.bulk_create(
+            Filial(city=f'City {i}', address=f'Street {i}') for i in range(self.options['filials'])
+        )
+        categories = DrivingCategory.objects.bulk_create(
+            DrivingCategory(name=f'Z{i}') for i in range(5)
+        )
+        Group.objects.bulk_create(
+            Group(
+                name=f'Group {i}',
+                filial=rng.choice(filials),
+                driving_category=rng.choice(categories),
+                type=rng.choice(Group.GroupType.values),
+            )
+            for i in range(max(1, users // 25))
+        )
+
+        password = make_password('benchmark')
+        roles = [User.Role.STUDENT] * 90 + [User.Role.TEACHER] * 9 + [User.Role.ADMIN]
+        batch = []
+        for i in range(users):
+            role = rng.choice(roles)
+            batch.append(User(
+                email=f'bench{i}@example.com',
+                password=password,
+                first_name=f'First{i}',
+                last_name=f'Last{i}',
+                role=role,
+                is_active=rng.random() < 0.95,
+                is_paid=rng.random() < 0.7 if role == User.Role.STUDENT else None,
+            ))
+            if len(batch) == 5000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {User._meta.db_table}, {Group._meta.db_table}')
+
+        self.filial = filials[0]
+        self.category = categories[0]
+
+    def get_queries(self):
+        """Return the benchmarked queries by name."""
+        return {
+            'unpaid active students': User.objects.filter(
+                role=User.Role.STUDENT, is_paid=False, is_active=True,
+            ).order_by('-created_at')[:50],
+            'active teachers': User.objects.filter(
+                role=User.Role.TEACHER, is_active=True,
+            )[:50],
+            'email iexact': User.objects.filter(email__iexact='BENCH123@EXAMPLE.COM'),
+            'users newest page': User.objects.order_by('-created_at', '-id')[:50],
+            'last name prefix search': User.objects.filter(last_name__istartswith='last123')[:50],
+            'groups by filial/type/category': Group.objects.filter(
+                filial=self.filial, type=Group.GroupType.THEORY, driving_category=self.category,
+            ),
+        }
+
+    def run_queries(self, label):
+        """Return the median time in ms of each query; print its plan."""
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {label}'))
+        timings = {}
+        for name, queryset in self.get_queries().items():
+            if not self.options['no_plans']:
+                self.stdout.write(f'\n-- {name}')
+                self.stdout.write(queryset.explain(analyze=True))
+
+            runs = []
+            for _ in range(self.options['repeat']):
+                start = time.perf_counter()
+                list(queryset.all())
+                runs.append((time.perf_counter() - start) * 1000)
+            timings[name] = statistics.median(runs)
+        return timings
+
+    def drop_indexes(self):
+        """Drop the indexes and constraints declared in the models' Meta."""
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for model in (User, Group):
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+                for constraint in model._meta.constraints:
+                    schema_editor.remove_constraint(model, constraint)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {User._meta.db_table}, {Group._meta.db_table}')
+
+    def report(self, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING('\n== median ms (without -> with indexes)'))
+        for name in after:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            self.stdout.write(
+                f'{name:<32} {before[name]:>9.3f} -> {after[name]:>9.3f}  x{speedup:.1f}'
+            )
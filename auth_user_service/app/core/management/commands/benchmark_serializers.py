@@ -0,0 +1,101 @@
+"""
+Django command to compare the rows/sec of the serializers and of the
+values() rendering used by the admin list endpoints
+"""
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import DrivingCategory, Filial, Group, TeacherProfile, User
+from core.serializers import compile_values_representation
+from group.serializers import GroupSerializer
+from user.serializers import AdminUserSerializer
+
+
+class Rollback(Exception):
+    """Raised to roll back the benchmark transaction."""
+
+
+class Command(BaseCommand):
+    """Django command to benchmark list rendering"""
+    help = (
+        'Seed users and groups inside a transaction, time rendering a page '
+        'with the serializers and from values() rows, then roll back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows per page.')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per renderer.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        self.options = options
+        try:
+            with transaction.atomic():
+                self.seed()
+                for name, serializer_class, queryset in (
+                    ('users', AdminUserSerializer, User.objects.order_by('-created_at', '-id')),
+                    ('groups', GroupSerializer, Group.objects.order_by('id')),
+                ):
+                    self.compare(name, serializer_class, queryset[:options['rows']])
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Rolled back the seeded data.')
+
+    def seed(self):
+        """Insert a page of users, and of groups with a teacher."""
+        rows = self.options['rows']
+        password = make_password('benchmark')
+        users = User.objects.bulk_create(
+            User(
+                email=f'bench{i}@example.com',
+                password=password,
+                first_name=f'First{i}',
+                last_name=f'Last{i}',
+                role=User.Role.TEACHER,
+            )
+            for i in range(rows)
+        )
+        teachers = TeacherProfile.objects.bulk_create(
+            TeacherProfile(user=user, type=TeacherProfile.TeachingType.THEORY) for user in users
+        )
+        filial = Filial.objects.create(city='City', address='Street')
+        category = DrivingCategory.objects.create(name='Z')
+        Group.objects.bulk_create(
+            Group(
+                name=f'Group {i}',
+                filial=filial,
+                driving_category=category,
+                teacher=teacher,
+                type=Group.GroupType.THEORY,
+            )
+            for i, teacher in enumerate(teachers)
+        )
+
+    def time(self, render):
+        """Return the median seconds of `render`."""
+        runs = []
+        for _ in range(self.options['repeat']):
+            start = time.perf_counter()
+            render()
+            runs.append(time.perf_counter() - start)
+        return statistics.median(runs)
+
+    def compare(self, name, serializer_class, queryset):
+        serializer = serializer_class()
+        lookups, render = compile_values_representation(serializer)
+        count = queryset.count()
+
+        serialized = self.time(
+            lambda: serializer_class(serializer.optimize_queryset(queryset), many=True).data
+        )
+        from_values = self.time(lambda: [render(row) for row in queryset.values(*lookups)])
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {name} ({count} rows)'))
+        self.stdout.write(f'{"serializer":<12} {count / serialized:>12,.0f} rows/s')
+        self.stdout.write(
+            f'{"values()":<12} {count / from_values:>12,.0f} rows/s  x{serialized / from_values:.1f}'
+        )
@@ -0,0 +1,82 @@
+"""
+Django command to measure the per-request overhead of the request timing
+instrumentation
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, override_settings
+
+from core.models import User
+from core.timing import RequestTimingMiddleware, measure, time_query
+
+
+def view(request):
+    """A small view: authentication, three queries and serialization."""
+    with measure('auth'):
+        User.objects.filter(pk=0).exists()
+    users = list(User.objects.filter(pk__lt=0)[:10])
+    User.objects.filter(pk=0).exists()
+    with measure('serializer'):
+        data = {'results': [user.email for user in users], 'count': len(users)}
+    return JsonResponse(data)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the request timing middleware"""
+    help = (
+        'Run a small view doing three queries with and without the request '
+        'timing middleware and its query wrapper, and fail when the median '
+        'overhead per request exceeds the budget. The Server-Timing header '
+        'is measured too; logging the records adds the cost of the log handler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per variant.')
+        parser.add_argument('--budget', type=float, default=100, help='Allowed overhead per request, in µs.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        with override_settings(REQUEST_TIMING={**getattr(settings, 'REQUEST_TIMING', {}), 'HEADER': True}):
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        factory = RequestFactory()
+        instrumented = RequestTimingMiddleware(view)
+        wrappers = connection.execute_wrappers
+        baseline_wrappers = [wrapper for wrapper in wrappers if wrapper is not time_query]
+        instrumented_wrappers = [*baseline_wrappers, time_query]
+
+        baseline, timed = [], []
+        try:
+            # Warm up, then interleave the variants so that both see the same noise.
+            for index in range(options['requests'] + 100):
+                request = factory.get('/benchmark/')
+                connection.execute_wrappers = baseline_wrappers
+                baseline_time = self.time(view, request)
+                connection.execute_wrappers = instrumented_wrappers
+                timed_time = self.time(instrumented, request)
+                if index >= 100:
+                    baseline.append(baseline_time)
+                    timed.append(timed_time)
+        finally:
+            connection.execute_wrappers = wrappers
+
+        overhead = statistics.median([t - b for t, b in zip(timed, baseline)]) * 1e6
+        self.stdout.write(
+            f'baseline     p50 {statistics.median(baseline) * 1e6:>8.1f} µs\n'
+            f'instrumented p50 {statistics.median(timed) * 1e6:>8.1f} µs\n'
+            f'overhead         {overhead:>8.1f} µs per request (budget {options["budget"]:.0f} µs)'
+        )
+        if overhead > options['budget']:
+            raise CommandError(f'The instrumentation costs {overhead:.1f} µs per request.')
+
+    @staticmethod
+    def time(handler, request):
+        start = time.perf_counter()
+        handler(request)
+        return time.perf_counter() - start
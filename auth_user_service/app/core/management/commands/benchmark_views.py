@@ -0,0 +1,136 @@
+"""
+Django command to compare the requests/sec of the sync and async views of
+the hot endpoints at a fixed concurrency
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework_simplejwt.views import TokenVerifyView
+
+from accounts.views import TokenVerifyView as AsyncTokenVerifyView
+from core.cache import user_cache
+from core.models import User
+from core.tokens import revoked_tokens
+from user.serializers import MyTokenObtainPairSerializer
+from user.views import AsyncManageUserView, ManageUserView
+
+
+class Rollback(Exception):
+    """Raised to roll back the benchmark transaction."""
+
+
+VIEWS = {
+    # name: (method, path, sync view, async view)
+    'me': ('get', '/api/v1/user/me/', ManageUserView, AsyncManageUserView),
+    'verify': ('post', '/api/v1/auth/token/verify/', TokenVerifyView, AsyncTokenVerifyView),
+}
+
+
+class Command(BaseCommand):
+    """Django command to benchmark sync and async views"""
+    help = (
+        'Call the sync (DRF) and async views of the hot endpoints with a fixed '
+        'number of concurrent clients: the sync ones on a pool of worker '
+        'threads, as a threaded WSGI worker does, the async ones on a single '
+        'event loop, as an ASGI worker does. Latencies include the wait for a '
+        'free thread. Caches are warmed first, so no view queries the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', action='append', dest='views', choices=list(VIEWS), help='View to measure.')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per view and mode.')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients.')
+        parser.add_argument('--threads', type=int, default=4, help='Worker threads of the sync views.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        self.options = options
+        try:
+            with transaction.atomic():
+                token = self.seed()
+                for name in options['views'] or list(VIEWS):
+                    self.compare(name, token)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Rolled back the seeded data.')
+
+    def seed(self):
+        """Create a user, warm the caches and return an access token."""
+        user = User.objects.create_user(email='bench@example.com', password='benchmark')
+        user_cache.get(user.id)
+        revoked_tokens.warm()
+        return str(MyTokenObtainPairSerializer.get_token(user).access_token)
+
+    def compare(self, name, token):
+        method, path, sync_view_class, async_view_class = VIEWS[name]
+        kwargs = {'headers': {'Authorization': f'Bearer {token}'}}
+        if method == 'post':
+            kwargs.update(data={'token': token}, content_type='application/json')
+
+        sync_view = sync_view_class.as_view()
+        sync_factory = RequestFactory()
+
+        def call_sync():
+            response = sync_view(getattr(sync_factory, method)(path, **kwargs))
+            response.render()
+            return response
+
+        async_view = async_view_class.as_view()
+        async_factory = AsyncRequestFactory()
+
+        async def call_async():
+            return await async_view(getattr(async_factory, method)(path, **kwargs))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'\n== {name} ({self.options["concurrency"]} clients, {self.options["threads"]} threads)'
+        ))
+        self.report('sync', *self.run_sync(call_sync))
+        self.report('async', *asyncio.run(self.run_async(call_async)))
+
+    def run_sync(self, call):
+        """Keep `concurrency` calls queued on the thread pool."""
+        total, concurrency = self.options['requests'], self.options['concurrency']
+        latencies, errors = [], 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.options['threads']) as executor:
+            pending, sent = {}, 0
+            while sent < total or pending:
+                while sent < total and len(pending) < concurrency:
+                    pending[executor.submit(call)] = time.perf_counter()
+                    sent += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    latencies.append(time.perf_counter() - pending.pop(future))
+                    errors += future.result().status_code >= 400
+        return latencies, errors, time.perf_counter() - start
+
+    async def run_async(self, call):
+        """Run `concurrency` clients on the event loop."""
+        remaining = self.options['requests']
+        latencies, errors = [], 0
+
+        async def client():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                sent = time.perf_counter()
+                response = await call()
+                latencies.append(time.perf_counter() - sent)
+                errors += response.status_code >= 400
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(self.options['concurrency'])))
+        return latencies, errors, time.perf_counter() - start
+
+    def report(self, mode, latencies, errors, elapsed):
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f'{mode:<6} {len(latencies) / elapsed:>9,.0f} requests/s  '
+            f'p50 {quantiles[49] * 1000:>7.2f} ms  p95 {quantiles[94] * 1000:>7.2f} ms  '
+            f'errors {errors}'
+        )
@@ -0,0 +1,309 @@
+"""
+Django command to load test the authentication flows of a running server
+"""
+import json
+import platform
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.models import OutgoingEmail, User
+
+
+EMAIL_PREFIX = 'loadtest-'
+PASSWORD = 'Load-test-password-1'
+
+# operation: default weight in the mix of each virtual user
+OPERATIONS = {
+    'register': 1,
+    'login': 2,
+    'refresh': 4,
+    'me_get': 10,
+    'me_patch': 2,
+    'admin_users': 2,
+    'admin_groups': 1,
+    'admin_students': 1,
+}
+
+URL_NAMES = {
+    'register': 'rest_register',
+    'login': 'rest_login',
+    'refresh': 'token_refresh',
+    'me': 'user:me',
+    'admin_users': 'user:admin-users-list',
+    'admin_groups': 'group:group-list',
+    'admin_students': 'student-list',
+}
+
+
+def parse_mix(value):
+    """Parse `name=weight,...` into the operation weights."""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS or not weight.isdigit():
+            raise CommandError(f'Invalid mix item {item!r}; operations are {", ".join(OPERATIONS)}.')
+        mix[name] = int(weight)
+    return mix
+
+
+class Results:
+    """Latencies and statuses per operation, shared by the virtual users."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def add(self, operation, latency, status, ok):
+        with self.lock:
+            self.latencies[operation].append(latency)
+            self.statuses[operation][str(status)] += 1
+            if not ok:
+                self.errors[operation] += 1
+
+    def summary(self, elapsed):
+        operations = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            operations[operation] = {
+                'requests': len(latencies),
+                'errors': self.errors[operation],
+                'error_rate': round(self.errors[operation] / len(latencies), 4),
+                'throughput': round(len(latencies) / elapsed, 2),
+                'p50_ms': round(quantiles[49] * 1000, 2),
+                'p95_ms': round(quantiles[94] * 1000, 2),
+                'p99_ms': round(quantiles[98] * 1000, 2),
+                'max_ms': round(max(latencies) * 1000, 2),
+                'statuses': dict(self.statuses[operation]),
+            }
+        total = sum(op['requests'] for op in operations.values())
+        errors = sum(op['errors'] for op in operations.values())
+        return {
+            'requests': total,
+            'errors': errors,
+            'error_rate': round(errors / total, 4) if total else 0,
+            'throughput': round(total / elapsed, 2),
+        }, operations
+
+
+class VirtualUser:
+    """A client logged in as one seeded user, running a random mix of operations."""
+
+    def __init__(self, command, email, rng):
+        self.command = command
+        self.paths = command.paths
+        self.email = email
+        self.rng = rng
+        self.session = requests.Session()
+        self.access = self.refresh_token = None
+        self.access_at = 0
+
+    def request(self, operation, method, path, expected, access=None, **kwargs):
+        access = access or self.access
+        headers = {'Authorization': f'Bearer {access}'} if access else {}
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.command.base_url + path, headers=headers, timeout=self.command.timeout, **kwargs,
+            )
+        except requests.RequestException:
+            self.command.results.add(operation, time.perf_counter() - start, 'connection_error', False)
+            return None
+        self.command.results.add(operation, time.perf_counter() - start, response.status_code,
+                                 response.status_code == expected)
+        return response if response.status_code == expected else None
+
+    def run(self, deadline, mix):
+        names, weights = list(mix), list(mix.values())
+        try:
+            self.login()
+            while time.monotonic() < deadline:
+                operation = self.rng.choices(names, weights)[0]
+                self.renew_access()
+                getattr(self, operation)()
+        finally:
+            self.session.close()
+
+    def login(self):
+        response = self.request('login', 'post', self.paths['login'], 200,
+                                json={'email': self.email, 'password': PASSWORD})
+        if response is not None:
+            data = response.json()
+            self.access, self.refresh_token = data['access'], data['refresh']
+            self.access_at = time.monotonic()
+
+    def renew_access(self):
+        """Refresh the access token before it expires, as a client would."""
+        if self.access and time.monotonic() - self.access_at > self.command.access_ttl:
+            self.refresh()
+
+    def register(self):
+        email = f'{EMAIL_PREFIX}reg-{uuid.UUID(int=self.rng.getrandbits(128)).hex}@example.com'
+        self.request('register', 'post', self.paths['register'], 201, json={
+            'email': email, 'password1': PASSWORD, 'password2': PASSWORD,
+        })
+
+    def refresh(self):
+        # The refresh token is rotated: the next refresh must use the new one.
+        response = self.request('refresh', 'post', self.paths['refresh'], 200,
+                                json={'refresh': self.refresh_token})
+        if response is not None:
+            data = response.json()
+            self.access, self.refresh_token = data['access'], data.get('refresh', self.refresh_token)
+            self.access_at = time.monotonic()
+        else:
+            self.login()
+
+    def me_get(self):
+        self.request('me_get', 'get', self.paths['me'], 200)
+
+    def me_patch(self):
+        self.request('me_patch', 'patch', self.paths['me'], 200,
+                     json={'first_name': f'Load{self.rng.randrange(1000)}'})
+
+    def admin_list(self, operation):
+        admin = self.command.admin
+        with self.command.admin_lock:
+            admin.renew_access()
+            access = admin.access
+        self.request(operation, 'get', self.paths[operation], 200, access=access)
+
+    def admin_users(self):
+        self.admin_list('admin_users')
+
+    def admin_groups(self):
+        self.admin_list('admin_groups')
+
+    def admin_students(self):
+        self.admin_list('admin_students')
+
+
+class Command(BaseCommand):
+    """Django command to load test the authentication flows"""
+    help = (
+        'Drive registration, login, token refresh with rotation, GET/PATCH of '
+        'the current user and the admin lists of a running server with '
+        'concurrent virtual users, and write the throughput, latency '
+        'percentiles and error rates per operation to a JSON file. Users are '
+        'seeded in the database of the server and removed afterwards. Run '
+        'the server with high AUTH_THROTTLE_*_RATE values, or logins and '
+        'registrations are throttled.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='URL of the server.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Virtual users.')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds of load.')
+        parser.add_argument(
+            '--mix', type=parse_mix,
+            default=OPERATIONS, help='Operation weights, e.g. login=1,me_get=10 (default: %(default)s).',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the operation sequences.')
+        parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds.')
+        parser.add_argument('--output', default='load-test-results.json', help='File the results are written to.')
+        parser.add_argument('--label', default='', help='Label of the build under test, copied to the results.')
+        parser.add_argument('--keep-data', action='store_true', help='Keep the seeded users.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        # Renew the access tokens a minute before they expire.
+        self.access_ttl = max(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds() - 60, 1)
+        self.paths = {name: reverse(url_name) for name, url_name in URL_NAMES.items()}
+        self.results = Results()
+        emails = self.seed(options['concurrency'])
+        # Shared by the virtual users for the admin lists.
+        self.admin = VirtualUser(self, f'{EMAIL_PREFIX}admin@example.com', random.Random(options['seed']))
+        self.admin_lock = threading.Lock()
+        try:
+            self.admin.login()
+            if self.admin.access is None:
+                raise CommandError(f'Could not log in to {self.base_url}: {dict(self.results.statuses["login"])}.')
+            # Only the load is reported.
+            self.results = Results()
+
+            started_at = timezone.now()
+            start = time.monotonic()
+            deadline = start + options['duration']
+            users = [
+                VirtualUser(self, email, random.Random(options['seed'] * 100003 + index))
+                for index, email in enumerate(emails)
+            ]
+            with ThreadPoolExecutor(max_workers=len(users)) as executor:
+                for future in [executor.submit(user.run, deadline, options['mix']) for user in users]:
+                    future.result()
+            elapsed = time.monotonic() - start
+        finally:
+            self.admin.session.close()
+            if not options['keep_data']:
+                self.cleanup()
+
+        totals, operations = self.results.summary(elapsed)
+        report = {
+            'label': options['label'],
+            'started_at': started_at.isoformat(),
+            'elapsed_s': round(elapsed, 2),
+            'config': {
+                'base_url': self.base_url,
+                'concurrency': options['concurrency'],
+                'duration_s': options['duration'],
+                'mix': options['mix'],
+                'seed': options['seed'],
+                'python': platform.python_version(),
+            },
+            'totals': totals,
+            'operations': operations,
+        }
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+
+        for operation, result in operations.items():
+            self.stdout.write(
+                f'{operation:<15} {result["throughput"]:>8.1f} req/s  p50 {result["p50_ms"]:>7.1f} ms  '
+                f'p95 {result["p95_ms"]:>7.1f} ms  p99 {result["p99_ms"]:>7.1f} ms  '
+                f'errors {result["error_rate"]:.1%}'
+            )
+        self.stdout.write(
+            f'{"total":<15} {totals["throughput"]:>8.1f} req/s  errors {totals["error_rate"]:.1%}  '
+            f'-> {options["output"]}'
+        )
+
+    def seed(self, count):
+        """Create the admin and one verified user per virtual user; return their emails."""
+        self.cleanup()
+        # One hash for every seeded user, since they share the password.
+        password = make_password(PASSWORD)
+        # bulk_create skips User.save(), which clears is_paid of non-students.
+        admin = User(
+            email=f'{EMAIL_PREFIX}admin@example.com', password=password,
+            role=User.Role.ADMIN, is_staff=True, is_superuser=True, is_paid=None,
+        )
+        users = [
+            User(email=f'{EMAIL_PREFIX}user-{index}@example.com', password=password, role=User.Role.STUDENT)
+            for index in range(count)
+        ]
+        User.objects.bulk_create([admin, *users])
+        EmailAddress.objects.bulk_create([
+            EmailAddress(user=user, email=user.email, verified=True, primary=True)
+            for user in User.objects.filter(email__startswith=EMAIL_PREFIX)
+        ])
+        return [user.email for user in users]
+
+    def cleanup(self):
+        User.objects.filter(email__startswith=EMAIL_PREFIX).delete()
+        OutgoingEmail.objects.filter(recipients__icontains=EMAIL_PREFIX).delete()
@@ -0,0 +1,249 @@
+"""
+Django command to seed a production-scale synthetic dataset
+"""
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from core.cache import user_cache
+from core.models import DrivingCategory, Filial, Group, StudentProfile, TeacherProfile, User
+
+
+EMAIL_DOMAIN = 'seed.dreamdrive.test'
+FILIAL_DESCRIPTION = 'Synthetic data, see manage.py seed_data.'
+
+# Dates are relative to a fixed day, so that a seed always gives the same rows.
+REFERENCE_DAY = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+CITIES = ['Kyiv', 'Lviv', 'Odesa', 'Kharkiv', 'Dnipro', 'Zaporizhzhia', 'Vinnytsia', 'Poltava', 'Chernihiv',
+          'Ivano-Frankivsk', 'Ternopil', 'Lutsk', 'Rivne', 'Uzhhorod', 'Zhytomyr', 'Cherkasy', 'Sumy']
+STREETS = ['Shevchenka', 'Franka', 'Khreshchatyk', 'Sadova', 'Zelena', 'Shkilna', 'Soborna', 'Hrushevskoho']
+FIRST_NAMES = ['Oleksandr', 'Andrii', 'Dmytro', 'Serhii', 'Maksym', 'Ivan', 'Mykola', 'Yurii', 'Olena',
+               'Iryna', 'Nataliia', 'Oksana', 'Tetiana', 'Yuliia', 'Anna', 'Mariia', 'Sofiia', 'Viktoriia']
+LAST_NAMES = ['Melnyk', 'Shevchenko', 'Boiko', 'Kovalenko', 'Bondarenko', 'Tkachenko', 'Kovalchuk',
+              'Kravchenko', 'Oliinyk', 'Shevchuk', 'Koval', 'Polishchuk', 'Bondar', 'Tkachuk', 'Moroz']
+# Category: share of the groups; most students learn for B.
+CATEGORIES = {'B': 70, 'A': 10, 'C': 8, 'BE': 5, 'D': 4, 'CE': 3}
+
+USER_COLUMNS = (
+    'id', 'password', 'last_login', 'is_superuser', 'email', 'first_name', 'last_name', 'role',
+    'birth_date', 'phone', 'address', 'is_active', 'is_staff', 'is_paid', 'created_at', 'updated_at',
+)
+
+
+class Command(BaseCommand):
+    """Django command to seed synthetic data"""
+    help = (
+        'Seed filials, driving categories, groups, teachers, admins and students '
+        'with realistic distributions, deterministically for a seed. The small '
+        'tables are inserted with bulk_create, the users, profiles and emails '
+        'with COPY, all sharing one pre-computed password hash. Seeded users '
+        f'have @{EMAIL_DOMAIN} emails; --clear removes a previous run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200000, help='Number of students.')
+        parser.add_argument('--teachers', type=int, help='Number of teachers (default: 1 per 100 students).')
+        parser.add_argument('--admins', type=int, default=10, help='Number of admins.')
+        parser.add_argument('--filials', type=int, default=20, help='Number of filials.')
+        parser.add_argument('--group-size', type=int, default=25, help='Mean number of students per group.')
+        parser.add_argument('--paid-ratio', type=float, default=0.7, help='Share of students in a group who paid.')
+        parser.add_argument('--ungrouped-ratio', type=float, default=0.1, help='Share of students without group.')
+        parser.add_argument('--inactive-ratio', type=float, default=0.03, help='Share of deactivated users.')
+        parser.add_argument('--password', default='seed-password', help='Password of every seeded user.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+        parser.add_argument('--batch-size', type=int, default=50000, help='Rows per COPY.')
+        parser.add_argument('--clear', action='store_true', help='Remove the previously seeded data first.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        if connection.vendor != 'postgresql':
+            raise CommandError('Seeding uses COPY and requires PostgreSQL.')
+
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        start = time.perf_counter()
+        with transaction.atomic():
+            if options['clear']:
+                self.step('Cleared', self.clear)
+            elif User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists():
+                raise CommandError('The database is already seeded; use --clear to seed again.')
+
+            self.password = make_password(options['password'])
+            filials = self.step('Filials', self.seed_filials)
+            categories = self.step('Driving categories', self.seed_categories)
+            teachers = self.step('Teachers and admins', self.seed_staff)
+            groups, members = self.step('Groups', self.seed_groups, filials, categories, teachers)
+            self.step('Students', self.seed_students, groups, members)
+
+        with connection.cursor() as cursor:
+            for model in (User, StudentProfile, EmailAddress, Group):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+        self.stdout.write(self.style.SUCCESS(f'Seeded in {time.perf_counter() - start:.1f}s.'))
+
+    def step(self, name, function, *args):
+        """Run a phase of the seeding and print its rows and duration."""
+        start = time.perf_counter()
+        result = function(*args)
+        count = len(result[0] if isinstance(result, tuple) else result) if result is not None else ''
+        self.stdout.write(f'{name:<22} {count:>8}  {time.perf_counter() - start:6.2f}s')
+        return result
+
+    def clear(self):
+        """Delete the seeded filials, groups and users with their related rows."""
+        users = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+        user_ids = list(users.values_list('id', flat=True))
+        # QuerySet.delete() would load every user to send post_delete, which
+        # takes minutes at this scale: delete the rows directly instead and
+        # invalidate the cached users as core.signals does.
+        students = StudentProfile.objects.filter(user__in=users)
+        students._raw_delete(students.db)
+        Filial.objects.filter(description=FILIAL_DESCRIPTION).delete()
+        for relation in User._meta.related_objects:
+            related = relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': users})
+            if relation.on_delete is models.SET_NULL:
+                related.update(**{relation.field.name: None})
+            else:
+                related.delete()
+        users._raw_delete(users.db)
+        transaction.on_commit(lambda: [user_cache.bump_version(user_id) for user_id in user_ids])
+        return user_ids
+
+    def seed_filials(self):
+        """Create the filials, spread over the cities."""
+        rng = self.rng
+        return Filial.objects.bulk_create(
+            Filial(
+                city=CITIES[index % len(CITIES)],
+                address=f'{rng.choice(STREETS)} St, {rng.randint(1, 200)}',
+                description=FILIAL_DESCRIPTION,
+            )
+            for index in range(self.options['filials'])
+        )
+
+    def seed_categories(self):
+        """Return the driving categories in CATEGORIES order, creating the missing ones."""
+        existing = {category.name: category for category in DrivingCategory.objects.filter(name__in=CATEGORIES)}
+        created = DrivingCategory.objects.bulk_create(
+            DrivingCategory(name=name) for name in CATEGORIES if name not in existing
+        )
+        categories = {category.name: category for category in [*existing.values(), *created]}
+        return [categories[name] for name in CATEGORIES]
+
+    def seed_staff(self):
+        """Create the admins and the teachers; return the teacher profiles."""
+        teachers = self.options['teachers']
+        if teachers is None:
+            teachers = max(1, self.options['students'] // 100)
+        users = [self.user_row(f'admin{index}', User.Role.ADMIN) for index in range(self.options['admins'])]
+        users += [self.user_row(f'teacher{index}', User.Role.TEACHER) for index in range(teachers)]
+        self.copy_users(users)
+
+        rng = self.rng
+        return TeacherProfile.objects.bulk_create(
+            TeacherProfile(user_id=user[0], type=rng.choice(TeacherProfile.TeachingType.values))
+            for user in users if user[7] == User.Role.TEACHER
+        )
+
+    def seed_groups(self, filials, categories, teachers):
+        """Create groups of gamma-distributed sizes; return them and their sizes."""
+        rng = self.rng
+        students = self.options['students']
+        grouped = students - round(students * self.options['ungrouped_ratio'])
+        mean = self.options['group_size']
+        # Bigger cities have more students: Zipf-like weights by filial rank.
+        filial_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(filials))]
+        category_weights = [CATEGORIES[category.name] for category in categories]
+        teachers_by_type = {}
+        for teacher in teachers:
+            teachers_by_type.setdefault(teacher.type, []).append(teacher)
+
+        groups, sizes = [], []
+        while grouped > 0:
+            size = min(grouped, max(5, min(60, round(rng.gammavariate(4, mean / 4)))))
+            category = rng.choices(categories, category_weights)[0]
+            group_type = rng.choice(Group.GroupType.values)
+            candidates = teachers_by_type.get(group_type)
+            groups.append(Group(
+                name=f'{category.name}-{len(groups) + 1:05d}',
+                filial=rng.choices(filials, filial_weights)[0],
+                driving_category=category,
+                type=group_type,
+                teacher=rng.choice(candidates) if candidates else None,
+            ))
+            sizes.append(size)
+            grouped -= size
+        return Group.objects.bulk_create(groups), sizes
+
+    def seed_students(self, groups, sizes):
+        """Create the students, their profiles and verified emails."""
+        rng = self.rng
+        paid_ratio = self.options['paid_ratio']
+        memberships = [group.id for group, size in zip(groups, sizes) for _ in range(size)]
+        memberships += [None] * (self.options['students'] - len(memberships))
+        rng.shuffle(memberships)
+
+        batch_size = self.options['batch_size']
+        for offset in range(0, len(memberships), batch_size):
+            chunk = memberships[offset:offset + batch_size]
+            users = []
+            for index, group_id in enumerate(chunk, offset):
+                # Students waiting for a group paid less often.
+                paid = rng.random() < (paid_ratio if group_id else paid_ratio / 2)
+                users.append(self.user_row(f'student{index}', User.Role.STUDENT, is_paid=paid))
+            self.copy_users(users)
+            self.copy(StudentProfile, ('user_id', 'group_id', 'updated_at'), (
+                (user[0], group_id, user[-1]) for user, group_id in zip(users, chunk)
+            ))
+        return memberships
+
+    def user_row(self, name, role, is_paid=None):
+        """Return the USER_COLUMNS of a user without id (set when copied)."""
+        rng = self.rng
+        created_at = REFERENCE_DAY - timedelta(seconds=rng.randrange(3 * 365 * 24 * 3600))
+        birth_date = date(REFERENCE_DAY.year - rng.randint(17, 55), rng.randint(1, 12), rng.randint(1, 28))
+        return [
+            None, self.password, None, role == User.Role.ADMIN, f'{name}@{EMAIL_DOMAIN}',
+            rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), role, birth_date,
+            f'+380{rng.randrange(10 ** 9):09d}', None,
+            # COPY skips User.save(), which clears is_paid of non-students.
+            rng.random() >= self.options['inactive_ratio'], role == User.Role.ADMIN,
+            is_paid if role == User.Role.STUDENT else None,
+            created_at, created_at,
+        ]
+
+    def copy_users(self, users):
+        """COPY the user rows, with ids taken from the sequence, and their emails."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [User._meta.db_table, 'id', len(users)],
+            )
+            for user, (user_id,) in zip(users, cursor.fetchall()):
+                user[0] = user_id
+        self.copy(User, USER_COLUMNS, users)
+        self.copy(EmailAddress, ('user_id', 'email', 'verified', 'primary'), (
+            (user[0], user[4], True, True) for user in users
+        ))
+
+    def copy(self, model, columns, rows):
+        """Load the rows into the table of the model with COPY."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([r'\N' if value is None else value for value in row])
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(model._meta.db_table)} ({", ".join(quote(column) for column in columns)}) '
+                r"FROM STDIN WITH (FORMAT csv, NULL '\N')",
+                buffer,
+            )
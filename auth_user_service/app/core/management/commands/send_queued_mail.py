@@ -0,0 +1,59 @@
+"""
+Django command to send the emails queued by core.mail.QueuedEmailBackend
+"""
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import OutboxSender
+
+
+class Command(BaseCommand):
+    """Django command to run the email outbox worker"""
+    help = (
+        'Send the queued emails in batches over one SMTP connection, kept open '
+        'while there are emails to send, then poll the outbox for new ones.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Send the due emails and exit.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds between polls of the outbox.')
+        parser.add_argument('--batch-size', type=int, help='Emails per transaction.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        self.stopping = False
+        if not options['once']:
+            # Finish the current batch on SIGTERM, so nothing is sent twice.
+            signal.signal(signal.SIGTERM, self.stop)
+
+        sender = OutboxSender(**({'batch_size': options['batch_size']} if options['batch_size'] else {}))
+        try:
+            while not self.stopping:
+                sent, failed, elapsed = self.drain(sender)
+                if sent or failed or options['once']:
+                    rate = sent / elapsed if elapsed else 0
+                    self.stdout.write(f'Sent {sent} emails in {elapsed:.2f}s ({rate:.0f}/s), {failed} failed.')
+                if options['once']:
+                    break
+                # Do not hold the SMTP connection while idle.
+                sender.close()
+                time.sleep(options['interval'])
+        finally:
+            sender.close()
+
+    def drain(self, sender):
+        """Send batches until none is due; return the numbers sent and failed, and the time taken."""
+        sent = failed = 0
+        start = time.perf_counter()
+        while not self.stopping:
+            batch_sent, batch_failed = sender.send_batch()
+            if not batch_sent and not batch_failed:
+                break
+            sent += batch_sent
+            failed += batch_failed
+        return sent, failed, time.perf_counter() - start
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,148 @@
+"""
+Prometheus metrics of the service, exposed at /metrics.
+
+Each process updates its own values under a process-local lock. When
+PROMETHEUS_MULTIPROC_DIR is set, as gunicorn.conf.py does, the values are
+kept in memory-mapped files of that directory instead, one per process, and
+/metrics aggregates the files of every worker. The environment variable must
+be set before prometheus_client is imported, and the directory emptied when
+the server starts.
+
+/metrics is only answered to the peer addresses of
+`METRICS['ALLOWED_NETWORKS']`, e.g. the Prometheus server.
+"""
+import ipaddress
+import os
+import shutil
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+
+from core.settings import get_setting
+from core.timing import get_timings
+
+
+METRICS_DEFAULTS = {
+    # Networks allowed to read /metrics.
+    'ALLOWED_NETWORKS': ('127.0.0.1/32', '::1/128'),
+}
+
+
+HTTP_METHODS = {'GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Latency of the requests by URL name.',
+    ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'http_requests',
+    'Responses by URL name and status code.',
+    ['view', 'method', 'status'],
+)
+LOGINS = Counter('auth_logins', 'Login attempts by method and outcome.', ['method', 'outcome'])
+TOKEN_REFRESHES = Counter('auth_token_refreshes', 'Refresh token rotations by outcome.', ['outcome'])
+BLACKLIST_HITS = Counter(
+    'auth_token_blacklist_hits',
+    'Blacklisted tokens presented, by where the revocation was found.',
+    ['source'],
+)
+DB_CONNECTIONS = Counter(
+    'db_request_connections',
+    'Database connections used by the requests, by whether they were opened or reused.',
+    ['alias', 'outcome'],
+)
+
+
+def get_registry():
+    """Return the registry to expose, aggregating the processes if needed."""
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not path:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return registry
+
+
+def reset_multiprocess_dir():
+    """Empty the PROMETHEUS_MULTIPROC_DIR directory of a previous run."""
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def is_scrape_allowed(request):
+    """
+    Return whether the request may read the metrics. The peer address is
+    checked, never X-Forwarded-For, so a scraper must connect directly.
+    """
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in get_setting('METRICS', 'ALLOWED_NETWORKS', METRICS_DEFAULTS)
+    )
+
+
+def get_outcome(response):
+    if response.status_code == 429:
+        return 'throttled'
+    return 'success' if response.status_code < 400 else 'failure'
+
+
+class OutcomeMetricMixin:
+    """Count the responses of a DRF view by outcome in `outcome_metric`."""
+    outcome_metric = None
+    outcome_labels = {}
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        self.outcome_metric.labels(outcome=get_outcome(response), **self.outcome_labels).inc()
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Observe the latency of the requests and the database connections they
+    used; place right after core.timing.RequestTimingMiddleware, whose
+    measures it reads.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, duration):
+        match = request.resolver_match
+        # Unmatched paths share a label, so that scans cannot add series.
+        view = (match.view_name if match else None) or 'unmatched'
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        REQUEST_LATENCY.labels(view, method).observe(duration)
+        REQUESTS.labels(view, method, response.status_code).inc()
+
+        timings = get_timings()
+        if timings is not None:
+            for alias in timings.aliases:
+                DB_CONNECTIONS.labels(alias, 'opened' if alias in timings.opened else 'reused').inc()
@@ -0,0 +1,47 @@
+# Generated by Django 4.2 on 2026-10-17 21:54
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.functions.text
+
+
+def normalize_emails(apps, schema_editor):
+    """Fail on emails differing only by case, then lowercase the domains."""
+    User = apps.get_model('core', 'User')
+    duplicates = (
+        User.objects
+        .values(email_upper=django.db.models.functions.text.Upper('email'))
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('email_upper', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Merge users whose emails differ only by case before migrating: '
+            + ', '.join(duplicates)
+        )
+
+    for user in User.objects.only('email').iterator():
+        local_part, _, domain = user.email.rpartition('@')
+        if domain != domain.lower():
+            user.email = f'{local_part}@{domain.lower()}'
+            user.save(update_fields=['email'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_user_and_group_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='core_user_email_upper_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Upper('email'), name='core_user_email_ci_unique'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-17 23:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the expiry of outstanding tokens, scanned by the prune_tokens
+    command. The table belongs to simplejwt, so the index is created with
+    SQL, concurrently so that token writes are not blocked.
+    """
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_user_search_and_ordering_indexes'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS token_outstanding_expires_at_idx '
+                'ON token_blacklist_outstandingtoken (expires_at)'
+            ),
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS token_outstanding_expires_at_idx',
+        ),
+    ]
@@ -1,7 +1,10 @@
 """
 Database models for the authentication service.
 """
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Upper
 from django.utils import timezone
 from django.contrib.auth.models import (AbstractBaseUser,
                                         BaseUserManager,
@@ -10,6 +13,13 @@ from django.contrib.auth.models import (AbstractBaseUser,
 
 class UserManager(BaseUserManager):
     """Manager for Users"""
+    def get_by_natural_key(self, username):
+        """Return the user with the given email, ignoring its case.
+
+        Served by the unique index on UPPER(email).
+        """
+        return self.get(**{f'{self.model.USERNAME_FIELD}__iexact': username})
+
     def create_user(self, email, password, **extra_fields):
         """Create and return a new user"""
         if not email:
@@ -71,10 +81,55 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    class Meta:
+        indexes = [
+            # Admin filters by role and activity.
+            models.Index(fields=['role', 'is_active'], name='core_user_role_active_idx'),
+            # Unpaid active students, newest first.
+            models.Index(
+                fields=['created_at'],
+                name='core_user_unpaid_students_idx',
+                condition=Q(role='student', is_paid=False, is_active=True),
+            ),
+            models.Index(fields=['is_paid', 'role'], name='core_user_paid_role_idx'),
+            # Keyset pagination of the admin user list.
+            models.Index(fields=['created_at', 'id'], name='core_user_created_at_id_idx'),
+            # Ordering the admin user list by name.
+            models.Index(fields=['last_name', 'id'], name='core_user_last_name_id_idx'),
+            # Prefix search (`istartswith`) over email and names.
+            models.Index(OpClass(Upper('email'), name='text_pattern_ops'), name='core_user_email_prefix_idx'),
+            models.Index(OpClass(Upper('first_name'), name='text_pattern_ops'), name='core_user_fname_prefix_idx'),
+            models.Index(OpClass(Upper('last_name'), name='text_pattern_ops'), name='core_user_lname_prefix_idx'),
+        ]
+        constraints = [
+            # Emails are unique ignoring case; also serves `email__iexact`.
+            models.UniqueConstraint(Upper('email'), name='core_user_email_ci_unique'),
+        ]
+
+    # Fields whose change must invalidate already issued sessions at once.
+    SECURITY_FIELDS = ('is_active', 'role', 'is_staff')
+
     def __str__(self):
         """Return string representation of the user"""
         return f"{self.email} ({self.role})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded security fields to detect changes on save."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_security_values = {
+            name: getattr(instance, name)
+            for name in cls.SECURITY_FIELDS if name in field_names
+        }
+        return instance
+
+    def security_fields_changed(self):
+        """Return True if is_active, role or is_staff differ from the loaded values."""
+        loaded = getattr(self, '_loaded_security_values', None)
+        if loaded is None or len(loaded) != len(self.SECURITY_FIELDS):
+            return True
+        return any(getattr(self, name) != value for name, value in loaded.items())
+
     def save(self, *args, **kwargs):
         """Override save method to set is_paid to None for non-student roles."""
         if self.role != self.Role.STUDENT:
@@ -91,6 +146,7 @@ class Filial(models.Model):
     city = models.CharField(max_length=100)
     address = models.CharField(max_length=255)
     description = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.city} - {self.address}"
@@ -99,6 +155,7 @@ class Filial(models.Model):
 class DrivingCategory(models.Model):
     """Driving categories (e.g., A, B, C)."""
     name = models.CharField(max_length=5, unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -120,6 +177,7 @@ class TeacherProfile(models.Model):
         max_length=20,
         choices=TeachingType.choices
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.user.get_full_name()} ({self.get_type_display()})"
@@ -154,6 +212,15 @@ class Group(models.Model):
         max_length=20,
         choices=GroupType.choices
     )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['filial', 'type', 'driving_category'],
+                name='core_group_filial_type_cat_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.get_type_display()}"
@@ -173,6 +240,28 @@ class StudentProfile(models.Model):
         blank=True,
         related_name='students'
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.user.get_full_name()
+
+
+class OutgoingEmail(models.Model):
+    """Email queued by `core.mail.QueuedEmailBackend`, sent by a worker."""
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField()
+    # The MIME message as sent over SMTP.
+    message = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker takes the due emails in this order.
+            models.Index(fields=['send_after', 'id'], name='core_outgoingemail_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.from_email} -> {', '.join(self.recipients)}"
@@ -0,0 +1,28 @@
+"""
+Pagination classes for the list endpoints.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+# Pagination is chosen per viewset; these bound every list endpoint.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination keyed on the primary key.
+
+    Each page is an index range scan from the previous position, so the
+    latency does not grow with the page number or the table size, and no
+    `COUNT(*)` is issued.
+    """
+    ordering = 'id'
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Cursor pagination over the newest rows first."""
+    ordering = ('-created_at', '-id')
@@ -0,0 +1,233 @@
+"""
+Routing of the safe reads of selected views to read replicas.
+
+`ReplicaRoutingMiddleware` keeps the routing state of each request. Views
+opt in with `ReplicaReadMixin` (or `replica_reads` on the async views),
+and `ReplicaRouter` then sends the reads of the request to a replica,
+unless:
+
+- the request already wrote, so it reads its own writes;
+- the user wrote within `PIN_TTL` seconds, in any process, as pinned in
+  the shared cache by the middleware;
+- every replica lags more than `MAX_LAG` seconds.
+
+Anything outside a request, such as management commands, uses the primary.
+"""
+import contextvars
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from core.settings import get_setting
+
+
+REPLICA_ROUTING_DEFAULTS = {
+    # Database aliases of the replicas.
+    'REPLICAS': (),
+    # Seconds the reads of a user stay on the primary after a write.
+    'PIN_TTL': 5,
+    # Replicas replaying more than this many seconds behind are skipped.
+    'MAX_LAG': 5,
+    # Seconds between two lag checks of a replica by a process.
+    'LAG_CHECK_INTERVAL': 5,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'replica-pin',
+}
+
+
+class RoutingState:
+    """Routing of the reads of the current request."""
+
+    def __init__(self):
+        self.use_replica = False
+        self.wrote = False
+        self.alias = None
+
+
+_state = contextvars.ContextVar('replica_routing_state', default=None)
+
+
+# Zero when the replica replayed all the WAL it received, so an idle
+# primary does not look like lag.
+LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+
+class ReplicaLagMonitor:
+    """Per-process, periodically refreshed replication lag of the replicas."""
+
+    def __init__(self):
+        self._lags = {}
+        self._lock = threading.Lock()
+
+    def measure(self, alias):
+        """Return the lag of the replica in seconds, infinite if unreachable."""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                return float(cursor.fetchone()[0])
+        except DatabaseError:
+            return float('inf')
+
+    def lag(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._lags.get(alias, (None, None))
+        interval = get_setting('REPLICA_ROUTING', 'LAG_CHECK_INTERVAL', REPLICA_ROUTING_DEFAULTS)
+        if checked_at is None or now - checked_at >= interval:
+            lag = self.measure(alias)
+            with self._lock:
+                self._lags[alias] = (now, lag)
+        return lag
+
+    def available(self):
+        """Return the replicas within the lag limit."""
+        max_lag = get_setting('REPLICA_ROUTING', 'MAX_LAG', REPLICA_ROUTING_DEFAULTS)
+        replicas = get_setting('REPLICA_ROUTING', 'REPLICAS', REPLICA_ROUTING_DEFAULTS)
+        return [alias for alias in replicas if self.lag(alias) <= max_lag]
+
+    def clear(self):
+        with self._lock:
+            self._lags.clear()
+
+
+lag_monitor = ReplicaLagMonitor()
+
+
+class ReplicaRouter:
+    """Database router sending the reads of opted-in requests to a replica."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return 'default'
+        if state.alias is None:
+            # One replica per request, so its reads see a single snapshot.
+            available = lag_monitor.available()
+            state.alias = random.choice(available) if available else 'default'
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_setting('REPLICA_ROUTING', 'REPLICAS', REPLICA_ROUTING_DEFAULTS):
+            return False
+        return None
+
+
+def _pin_key(user_id):
+    return f"{get_setting('REPLICA_ROUTING', 'KEY_PREFIX', REPLICA_ROUTING_DEFAULTS)}:{user_id}"
+
+
+def _pin_cache():
+    return caches[get_setting('REPLICA_ROUTING', 'CACHE_ALIAS', REPLICA_ROUTING_DEFAULTS)]
+
+
+def _pin_ttl():
+    return get_setting('REPLICA_ROUTING', 'PIN_TTL', REPLICA_ROUTING_DEFAULTS)
+
+
+def _can_use_replica(request):
+    state = _state.get()
+    if state is None or request.method not in SAFE_METHODS:
+        return None
+    if not get_setting('REPLICA_ROUTING', 'REPLICAS', REPLICA_ROUTING_DEFAULTS):
+        return None
+    return state
+
+
+def route_reads_to_replica(request):
+    """Send the next reads of the request to a replica, unless its user is pinned."""
+    state = _can_use_replica(request)
+    if state is None:
+        return
+    user = request.user
+    if user.is_authenticated and _pin_cache().get(_pin_key(user.id)):
+        return
+    state.use_replica = True
+
+
+async def aroute_reads_to_replica(request):
+    """Async version of `route_reads_to_replica`."""
+    state = _can_use_replica(request)
+    if state is None:
+        return
+    user = request.user
+    if user.is_authenticated and await _pin_cache().aget(_pin_key(user.id)):
+        return
+    state.use_replica = True
+
+
+class ReplicaRoutingMiddleware:
+    """Keep the routing state of each request and pin the users who wrote."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        user = self.user_to_pin(request, state)
+        if user is not None:
+            _pin_cache().set(_pin_key(user.id), True, timeout=_pin_ttl())
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        user = self.user_to_pin(request, state)
+        if user is not None:
+            await _pin_cache().aset(_pin_key(user.id), True, timeout=_pin_ttl())
+        return response
+
+    @staticmethod
+    def user_to_pin(request, state):
+        user = getattr(request, 'user', None)
+        if state.wrote and user is not None and user.is_authenticated:
+            return user
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe requests of `replica_actions` from a replica, once the
+    request is authenticated. Views without actions route all safe requests.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        action = getattr(self, 'action', None)
+        if action is None or action in self.replica_actions:
+            route_reads_to_replica(request)
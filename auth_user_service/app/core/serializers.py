@@ -0,0 +1,285 @@
+"""
+Sparse fieldsets, expandable relations and values() rendering for the model
+serializers.
+"""
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils.module_loading import import_string
+from rest_framework import ISO_8601, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core.timing import measure
+
+
+def get_list_param(request, name):
+    """Return the comma separated values of a query parameter, or None."""
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def get_serializer_lookups(serializer, prefix=''):
+    """
+    Return the `only()`, `select_related()` and `prefetch_related()` lookups
+    needed to render the serializer's readable fields.
+
+    Relations rendered by a nested model serializer are joined and trimmed to
+    the nested fields. Other fields reading anything but a model field need
+    an entry in `Meta.field_lookups` listing the lookups they read; without
+    one the `only()` lookups are None and no column is deferred.
+    """
+    model = serializer.Meta.model
+    field_lookups = getattr(serializer.Meta, 'field_lookups', {})
+    only, select_related, prefetch_related = [], [], []
+    traceable = True
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in field_lookups and not isinstance(field, serializers.BaseSerializer):
+            for lookup in field_lookups[name]:
+                relation = lookup.rpartition('__')[0]
+                if relation:
+                    select_related.append(prefix + relation)
+                only.append(prefix + lookup)
+            continue
+
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            traceable = False
+            continue
+
+        lookup = prefix + field.source
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetch_related.append(lookup)
+        elif not model_field.is_relation or isinstance(field, serializers.PrimaryKeyRelatedField):
+            only.append(lookup)
+        elif isinstance(field, serializers.ModelSerializer):
+            nested_only, nested_select, nested_prefetch = get_serializer_lookups(field, f'{lookup}__')
+            select_related += [lookup, *nested_select]
+            prefetch_related += nested_prefetch
+            # A relation listed without its columns is loaded in full.
+            only += [lookup] if nested_only is None else [lookup, *nested_only]
+        else:
+            select_related.append(lookup)
+            only.append(lookup)
+
+    return only if traceable else None, select_related, prefetch_related
+
+
+class SparseFieldsetMixin:
+    """
+    Model serializer rendering only the requested fields and relations.
+
+    `fields` restricts the rendered fields to the given names. `expand` names
+    entries of `Meta.expandable_fields`, which map a field name to the
+    serializer (or field) class, or its dotted path, and the keyword
+    arguments rendering the relation. Expanded fields replace the default
+    field of that name, or are added to the rendered fields.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        self.requested_fields = fields
+        self.requested_expand = expand or []
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        unknown = [name for name in self.requested_expand if name not in expandable]
+        if unknown:
+            raise ValidationError({'expand': [f"Unknown relations: {', '.join(unknown)}."]})
+        for name in self.requested_expand:
+            field_class, kwargs = expandable[name]
+            if isinstance(field_class, str):
+                field_class = import_string(field_class)
+            fields[name] = field_class(**kwargs)
+
+        if self.requested_fields is None:
+            return fields
+        unknown = [name for name in self.requested_fields if name not in fields]
+        if unknown:
+            raise ValidationError({'fields': [f"Unknown fields: {', '.join(unknown)}."]})
+        selected = {*self.requested_fields, *self.requested_expand}
+        return {name: field for name, field in fields.items() if name in selected}
+
+    def optimize_queryset(self, queryset, required=()):
+        """
+        Join, prefetch and select the columns the fields render, along with
+        the `required` ones.
+        """
+        only, select_related, prefetch_related = get_serializer_lookups(self)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if only is not None:
+            queryset = queryset.only(*only, *required)
+        return queryset
+
+
+# Fields whose representation of a column value is the value itself.
+IDENTITY_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _converted(key, convert):
+    def get(row):
+        value = row[key]
+        return None if value is None else convert(value)
+    return get
+
+
+def _nested(key, render):
+    def get(row):
+        return None if row[key] is None else render(row)
+    return get
+
+
+def _formatted(key, keys, formatter):
+    def get(row):
+        return None if row[key] is None else formatter(*(row[lookup] for lookup in keys))
+    return get
+
+
+def _datetime_converter(field):
+    """
+    Return a function rendering aware datetimes as `field` does.
+
+    The field timezone is resolved once rather than for every value.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def compile_values_representation(serializer, prefix=''):
+    """
+    Return the `values()` lookups and a function rendering a row of them as
+    the serializer renders the instance, or None if a field cannot be
+    rendered from columns.
+
+    Fields reading `Meta.field_lookups` are rendered by the function of the
+    same name in `Meta.value_formatters`, called with the looked up values.
+    Many-to-many and reverse relations are not supported.
+    """
+    model = serializer.Meta.model
+    field_lookups = getattr(serializer.Meta, 'field_lookups', {})
+    formatters = getattr(serializer.Meta, 'value_formatters', {})
+    lookups, getters = [], []
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.auto_created and not model_field.concrete or model_field.many_to_many:
+            return None
+
+        key = prefix + field.source
+        lookups.append(key)
+        if isinstance(field, serializers.BaseSerializer):
+            if not isinstance(field, serializers.ModelSerializer):
+                return None
+            nested = compile_values_representation(field, f'{key}__')
+            if nested is None:
+                return None
+            lookups += nested[0]
+            getters.append((name, _nested(key, nested[1])))
+        elif name in formatters:
+            keys = [prefix + lookup for lookup in field_lookups[name]]
+            lookups += keys
+            getters.append((name, _formatted(key, keys, formatters[name])))
+        elif model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None
+        elif isinstance(field, IDENTITY_FIELDS):
+            getters.append((name, itemgetter(key)))
+        elif isinstance(field, serializers.DateTimeField):
+            getters.append((name, _converted(key, _datetime_converter(field))))
+        else:
+            getters.append((name, _converted(key, field.to_representation)))
+
+    def render(row):
+        return {name: get(row) for name, get in getters}
+
+    return lookups, render
+
+
+class SparseFieldsetViewMixin:
+    """
+    Apply `?fields=` and `?expand=` to the reads of a model viewset.
+
+    The queryset is trimmed to the rendered columns and joins or prefetches
+    only the rendered relations. The columns the rows are ordered by are
+    always selected, since the cursor pagination reads them.
+    """
+    sparse_fieldset_actions = ('list', 'retrieve')
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in self.sparse_fieldset_actions:
+            kwargs.setdefault('fields', get_list_param(self.request, 'fields'))
+            kwargs.setdefault('expand', get_list_param(self.request, 'expand'))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_ordering_fields(self, queryset):
+        """Return the columns the pagination or the queryset order by."""
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return {
+            field.lstrip('-')
+            for field in (*ordering, *queryset.query.order_by)
+            if isinstance(field, str) and '__' not in field
+        }
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.sparse_fieldset_actions:
+            return queryset
+        return self.get_serializer().optimize_queryset(queryset, self.get_ordering_fields(queryset))
+
+
+class ValuesListViewMixin(SparseFieldsetViewMixin):
+    """
+    Render the list from `values()` rows instead of model instances.
+
+    No instance or serializer is created per row, which is most of the CPU
+    time of large pages. Lists the rows cannot be rendered from (expanded
+    many-to-many or reverse relations, computed fields) use the serializer.
+    """
+
+    def list(self, request, *args, **kwargs):
+        representation = compile_values_representation(self.get_serializer())
+        if representation is None:
+            return super().list(request, *args, **kwargs)
+        lookups, render = representation
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*dict.fromkeys([*lookups, *self.get_ordering_fields(queryset)]))
+
+        page = self.paginate_queryset(rows)
+        rows = list(rows) if page is None else page
+        with measure('serializer'):
+            data = [render(row) for row in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
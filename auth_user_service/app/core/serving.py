@@ -0,0 +1,39 @@
+"""
+Sizing of the production server processes, see gunicorn.conf.py.
+"""
+import os
+import time
+
+from django.contrib.auth.hashers import get_hasher
+
+
+def measure_hash_seconds(rounds=3):
+    """Return the CPU time of one hash of the preferred password hasher."""
+    hasher = get_hasher()
+    salt = hasher.salt()
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.process_time()
+        hasher.encode('autotune-password', salt)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def autotune(cpu_count=None, hash_seconds=None, latency_budget=1.0, max_threads=8):
+    """
+    Return the number of worker processes and of threads per worker.
+
+    One worker per CPU, and at least two so that one can be recycled while
+    the other serves, runs the Python code of the requests in parallel.
+    Threads let a worker overlap the requests waiting on the database and
+    the cache, but the password hashes of logins and registrations are CPU
+    bound: a request may wait for every other thread of its worker to hash.
+    The threads are thus limited to the hashes fitting in `latency_budget`
+    seconds, e.g. 3 for 300 ms PBKDF2 hashes and a 1 s budget.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if hash_seconds is None:
+        hash_seconds = measure_hash_seconds()
+    workers = max(2, cpu_count)
+    threads = int(latency_budget / hash_seconds) if hash_seconds > 0 else max_threads
+    return workers, max(1, min(threads, max_threads))
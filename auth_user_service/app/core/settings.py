@@ -0,0 +1,9 @@
+"""
+Settings of the services of the project, grouped in dicts of app/settings.py.
+"""
+from django.conf import settings
+
+
+def get_setting(group, name, defaults):
+    """Return `name` of the `group` settings dict, falling back to `defaults`."""
+    return getattr(settings, group, {}).get(name, defaults[name])
@@ -0,0 +1,57 @@
+"""
+Signal handlers of the core app.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from core.cache import user_cache
+from core.models import User
+from core.timing import install_query_timer
+from core.tokens import revoked_tokens
+
+
+def invalidate_user(user_id, bump_version):
+    """Drop cached copies of the user; bump its version if requested."""
+    if bump_version:
+        user_cache.bump_version(user_id)
+    else:
+        user_cache.invalidate(user_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_on_save(sender, instance, created, **kwargs):
+    """Invalidate the cached user after it is saved."""
+    if created:
+        return
+    bump_version = instance.security_fields_changed()
+    invalidate_user(instance.pk, bump_version)
+    # Invalidate again after commit so a concurrent request cannot cache
+    # the pre-commit row in between.
+    transaction.on_commit(partial(invalidate_user, instance.pk, bump_version))
+    instance._loaded_security_values = {
+        name: getattr(instance, name) for name in User.SECURITY_FIELDS
+    }
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_on_delete(sender, instance, **kwargs):
+    """Invalidate every cached copy of a deleted user."""
+    invalidate_user(instance.pk, True)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_revoked_token(sender, instance, created, **kwargs):
+    """Add a blacklisted token to the revoked set."""
+    if created:
+        revoked_tokens.add(instance.token.jti, instance.token.expires_at)
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    """Count and time the queries of the requests, see core.timing."""
+    install_query_timer(connection)
@@ -0,0 +1,60 @@
+"""
+Local HTTP server standing in for the external services in tests.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer from the `routes` of the server, keeping connections alive."""
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode()
+        self.server.requests.append((self.command, self.path, body))
+        route = self.server.routes[(self.command, self.path.split('?')[0])]
+        status, data = route() if callable(route) else route
+        content = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = handle_request
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Server answering `routes`, a dict of (method, path) to (status, data)
+    or to a callable returning them, and counting the TCP connections.
+    """
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(self, routes):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.routes = routes
+        self.connections = 0
+        self.requests = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,188 @@
+"""
+Tests for the claims-backed JWT authentication.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import ClaimsJWTAuthentication, TokenBackedUser
+from core.cache import user_cache
+from user.serializers import MyTokenObtainPairSerializer
+
+
+ME_URL = reverse('user:me')
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+REFRESH_URL = reverse('token_refresh')
+
+
+def get_access_token(user):
+    """Return an access token carrying the custom claims."""
+    return MyTokenObtainPairSerializer.get_token(user).access_token
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    """Test authenticating requests from token claims."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User',
+        )
+        self.factory = APIRequestFactory()
+
+    def authenticate(self, token):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ClaimsJWTAuthentication().authenticate(request)
+
+    def test_user_built_from_claims_without_query(self):
+        """Test authentication does not fetch the user row once cached."""
+        token = get_access_token(self.user)
+        self.authenticate(token)
+
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+            self.assertIsInstance(user, TokenBackedUser)
+            self.assertEqual(user.id, self.user.id)
+            self.assertEqual(user.email, self.user.email)
+            self.assertEqual(user.role, self.user.role)
+            self.assertFalse(user.is_staff)
+            self.assertEqual(user.get_full_name(), 'Test User')
+
+    def test_missing_attribute_falls_back_to_cached_user(self):
+        """Test attributes outside the claims are read from the cached user."""
+        user, _ = self.authenticate(get_access_token(self.user))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user.created_at, self.user.created_at)
+            self.assertEqual(user.updated_at, self.user.updated_at)
+
+    def test_profile_fields_current_after_update(self):
+        """Test the names are read from the user, not from the token."""
+        token = get_access_token(self.user)
+        self.user.first_name = 'New'
+        self.user.save()
+
+        user, _ = self.authenticate(token)
+
+        self.assertEqual(user.first_name, 'New')
+        self.assertNotIn('first_name', token)
+
+    def test_legacy_token_resolved_from_database(self):
+        """Test tokens without the custom claims load the model user."""
+        user, _ = self.authenticate(AccessToken.for_user(self.user))
+
+        self.assertEqual(user, self.user)
+        self.assertIsInstance(user, get_user_model())
+
+
+class ClaimsJWTApiTests(TestCase):
+    """Test API endpoints authenticated with claims-backed tokens."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User',
+        )
+        self.client = APIClient()
+
+    def test_retrieve_me_from_claims(self):
+        """Test GET /me is served without loading the user."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}')
+        user_cache.get(self.user.id)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {
+            'email': self.user.email,
+            'first_name': self.user.first_name,
+            'last_name': self.user.last_name,
+        })
+
+    def test_update_me_uses_model(self):
+        """Test PATCH /me updates the database row."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}')
+
+        res = self.client.patch(ME_URL, {'first_name': 'Updated'})
+
+        self.user.refresh_from_db()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user.first_name, 'Updated')
+
+    def test_admin_permission_from_claims(self):
+        """Test IsAdminUser is checked against the is_staff claim."""
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}')
+        res = self.client.get(ADMIN_USERS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(admin)}')
+        res = self.client.get(ADMIN_USERS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user is rejected on the next request."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}')
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_rejects_stale_token(self):
+        """Test a token with an outdated role claim is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}')
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_200_OK)
+
+        self.user.role = get_user_model().Role.TEACHER
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.json(), {'detail': 'User role has changed, please log in again.'})
+
+    def test_retrieve_me_after_update(self):
+        """Test GET /me returns the update made with the same token."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {get_access_token(self.user)}')
+
+        self.client.patch(ME_URL, {'first_name': 'New'})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.json()['first_name'], 'New')
+
+    def test_refresh_reissues_claims(self):
+        """Test a refreshed token carries the current role instead of the stale one."""
+        refresh = MyTokenObtainPairSerializer.get_token(self.user)
+        self.user.role = get_user_model().Role.TEACHER
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL, {'refresh': str(refresh)})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {res.data["access"]}')
+
+        self.assertEqual(self.client.get(ME_URL).status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(res.data['refresh'], verify=False)['role'], 'teacher')
+
+    def test_refresh_rejects_inactive_user(self):
+        """Test a deactivated user cannot refresh."""
+        refresh = MyTokenObtainPairSerializer.get_token(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.post(REFRESH_URL, {'refresh': str(refresh)})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,135 @@
+"""
+Tests for the user cache.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.cache import LocalLRUCache, UserCache, user_cache
+
+
+class LocalLRUCacheTests(TestCase):
+    """Test the in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the oldest unused entry is evicted when full."""
+        cache = LocalLRUCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_expired_entry_is_a_miss(self):
+        """Test entries past their TTL are not returned."""
+        cache = LocalLRUCache(maxsize=2, ttl=-1)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.misses, 1)
+
+
+class UserCacheTests(TestCase):
+    """Test resolving users through the cache."""
+
+    def setUp(self):
+        self.cache = UserCache(KEY_PREFIX='test-user')
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+
+    def tearDown(self):
+        self.cache.shared.clear()
+
+    def test_get_hits_local_cache(self):
+        """Test a user is loaded from the database only once."""
+        self.cache.get(self.user.id)
+
+        with self.assertNumQueries(0):
+            user = self.cache.get(self.user.id)
+
+        self.assertEqual(user, self.user)
+        stats = self.cache.stats()
+        self.assertEqual(stats['db_loads'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+
+    def test_get_falls_back_to_shared_cache(self):
+        """Test a local miss is served from the shared cache."""
+        self.cache.get(self.user.id)
+        self.cache.local.clear()
+
+        with self.assertNumQueries(0):
+            self.cache.get(self.user.id)
+
+        self.assertEqual(self.cache.stats()['shared_hits'], 1)
+
+    def test_get_returns_copy(self):
+        """Test changes to a returned user do not leak into the cache."""
+        self.cache.get(self.user.id).first_name = 'Changed'
+
+        self.assertEqual(self.cache.get(self.user.id).first_name, '')
+
+    def test_invalidate(self):
+        """Test invalidated users are reloaded."""
+        self.cache.get(self.user.id)
+        self.cache.invalidate(self.user.id)
+
+        with self.assertNumQueries(1):
+            self.cache.get(self.user.id)
+
+    def test_bump_version_orphans_entries(self):
+        """Test bumping the version skips every cached copy."""
+        self.cache.get(self.user.id)
+        version = self.cache.get_version(self.user.id)
+        self.cache.bump_version(self.user.id)
+
+        self.assertNotEqual(self.cache.get_version(self.user.id), version)
+        with self.assertNumQueries(1):
+            self.cache.get(self.user.id)
+
+
+class UserCacheInvalidationTests(TestCase):
+    """Test saving and deleting users invalidates the cache."""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+
+    def test_security_field_change_bumps_version(self):
+        """Test saving a changed is_active bumps the version."""
+        user = get_user_model().objects.get(id=self.user.id)
+        version = user_cache.get_version(user.id)
+
+        user.first_name = 'Changed'
+        user.save()
+        self.assertEqual(user_cache.get_version(user.id), version)
+
+        user.is_active = False
+        user.save()
+        self.assertNotEqual(user_cache.get_version(user.id), version)
+
+    def test_save_invalidates_cached_user(self):
+        """Test saving a user drops the cached copy."""
+        user_cache.get(self.user.id)
+
+        self.user.first_name = 'Changed'
+        self.user.save()
+
+        self.assertEqual(user_cache.get(self.user.id).first_name, 'Changed')
+
+    def test_delete_invalidates_cached_user(self):
+        """Test a deleted user is no longer resolved."""
+        user_id = self.user.id
+        user_cache.get(user_id)
+
+        self.user.delete()
+
+        with self.assertRaises(get_user_model().DoesNotExist):
+            user_cache.get(user_id)
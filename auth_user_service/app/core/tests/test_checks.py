@@ -0,0 +1,60 @@
+"""
+Tests for the system checks of the deployment settings.
+"""
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_shared_caches
+
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+SHARED = {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/check-cache'}
+
+
+class SharedCachesCheckTests(SimpleTestCase):
+    """Test several workers are refused per-process caches."""
+
+    @override_settings(CACHES={'default': LOCMEM, 'throttle': LOCMEM})
+    def test_single_worker(self):
+        """Test one worker may keep its caches in-process."""
+        self.assertEqual(check_shared_caches(1), [])
+
+    @override_settings(CACHES={'default': LOCMEM, 'throttle': LOCMEM})
+    def test_locmem_with_workers(self):
+        """Test every process-local alias is reported, with what it holds."""
+        errors = check_shared_caches(2)
+
+        self.assertEqual([error.id for error in errors], ['core.E001', 'core.E001'])
+        self.assertIn('replica pins', errors[0].msg)
+        self.assertIn('throttle counters', errors[1].msg)
+
+    @override_settings(CACHES={'default': SHARED, 'throttle': LOCMEM})
+    def test_locmem_throttle(self):
+        """Test the throttle alias must be shared too."""
+        errors = check_shared_caches(4)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("'throttle'", errors[0].msg)
+
+    @override_settings(
+        CACHES={'default': SHARED, 'throttle': SHARED, 'pins': LOCMEM},
+        REPLICA_ROUTING={'CACHE_ALIAS': 'pins'},
+    )
+    def test_replica_pins_alias(self):
+        """Test the alias of the replica pins is checked."""
+        errors = check_shared_caches(2)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn('replica pins', errors[0].msg)
+
+    @override_settings(CACHES={'default': SHARED, 'throttle': SHARED})
+    def test_shared(self):
+        """Test shared backends pass."""
+        self.assertEqual(check_shared_caches(8), [])
+
+    @override_settings(CACHES={'default': LOCMEM, 'throttle': LOCMEM}, SERVER_WORKERS=2)
+    def test_system_check(self):
+        """Test the management commands refuse to run with SERVER_WORKERS over per-process caches."""
+        with self.assertRaises(SystemCheckError):
+            call_command('check')
@@ -1,13 +1,21 @@
 """
 Test custom Django management commands
 """
+import json
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from allauth.account.models import EmailAddress
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+
+from core.models import Group, StudentProfile, TeacherProfile, User
+from core.throttling import SlidingWindowRateThrottle
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -34,3 +42,157 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class BenchmarkQueriesCommandTests(TestCase):
+    """Test the benchmark_queries command."""
+
+    def test_benchmark_rolls_back(self):
+        """Test the benchmark reports timings and leaves no data behind."""
+        out = StringIO()
+
+        call_command('benchmark_queries', users=50, repeat=1, no_plans=True, stdout=out)
+
+        self.assertIn('email iexact', out.getvalue())
+        self.assertIn('Rolled back', out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+
+class BenchmarkSerializersCommandTests(TestCase):
+    """Test the benchmark_serializers command."""
+
+    def test_benchmark_rolls_back(self):
+        """Test the benchmark reports rows/sec and leaves no data behind."""
+        out = StringIO()
+
+        call_command('benchmark_serializers', rows=10, repeat=1, stdout=out)
+
+        self.assertIn('rows/s', out.getvalue())
+        self.assertIn('Rolled back', out.getvalue())
+        self.assertFalse(User.objects.exists())
+
+
+class BenchmarkHashersCommandTests(TestCase):
+    """Test the benchmark_hashers command."""
+
+    @override_settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': 1000})
+    def test_benchmark_reports_hashes_per_second(self):
+        """Test the rate is reported with the configured cost."""
+        out = StringIO()
+
+        call_command('benchmark_hashers', algorithms=['pbkdf2_sha256'], seconds=0.01, processes=1, stdout=out)
+
+        self.assertIn('pbkdf2_sha256 (preferred): iterations=1000', out.getvalue())
+        self.assertIn('hashes/s', out.getvalue())
+
+    def test_unknown_hasher(self):
+        """Test an unknown algorithm is an error."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_hashers', algorithms=['md5'], stdout=StringIO())
+
+
+class BenchmarkViewsCommandTests(TestCase):
+    """Test the benchmark_views command."""
+
+    def test_benchmark_compares_sync_and_async(self):
+        """Test both modes are reported without errors and nothing is left behind."""
+        out = StringIO()
+
+        call_command('benchmark_views', requests=10, concurrency=4, threads=2, stdout=out)
+
+        self.assertIn('sync', out.getvalue())
+        self.assertIn('async', out.getvalue())
+        self.assertEqual(out.getvalue().count('errors 0'), 4)
+        self.assertFalse(User.objects.exists())
+
+
+class BenchmarkConnectionsCommandTests(SimpleTestCase):
+    """Test the benchmark_connections command."""
+    # Not in a test transaction, which closing connections would end.
+    databases = {'default'}
+
+    def test_persistent_connection_reused(self):
+        """Test only the non-persistent mode opens a connection per request."""
+        out = StringIO()
+
+        call_command('benchmark_connections', requests=5, stdout=out)
+
+        self.assertRegex(out.getvalue(), r'new connection .* 5 connections')
+        self.assertRegex(out.getvalue(), r'persistent .* 1 connections')
+
+
+class BenchmarkTimingCommandTests(TestCase):
+    """Test the benchmark_timing command."""
+
+    def test_overhead_within_budget(self):
+        """Test the instrumentation overhead stays within the default budget."""
+        out = StringIO()
+
+        call_command('benchmark_timing', requests=300, stdout=out)
+
+        self.assertIn('overhead', out.getvalue())
+
+    def test_over_budget_fails(self):
+        """Test the command fails when the overhead exceeds the budget."""
+        with self.assertRaises(CommandError):
+            call_command('benchmark_timing', requests=10, budget=-1000, stdout=StringIO())
+
+
+class SeedDataCommandTests(TestCase):
+    """Test the seed_data command."""
+
+    def seed(self, **options):
+        call_command('seed_data', students=400, teachers=8, admins=2, filials=3, batch_size=150,
+                     stdout=StringIO(), **options)
+        students = User.objects.filter(email__endswith='@seed.dreamdrive.test', role=User.Role.STUDENT)
+        return list(students.order_by('email').values_list('email', 'first_name', 'is_paid', 'created_at'))
+
+    def test_seed_data(self):
+        """Test the users, profiles and groups are created with verified emails."""
+        self.seed()
+
+        self.assertEqual(User.objects.filter(role=User.Role.ADMIN, is_superuser=True).count(), 2)
+        self.assertEqual(TeacherProfile.objects.count(), 8)
+        self.assertEqual(StudentProfile.objects.count(), 400)
+        self.assertEqual(StudentProfile.objects.filter(group=None).count(), 40)
+        self.assertEqual(sum(group.students.count() for group in Group.objects.all()), 360)
+        self.assertEqual(EmailAddress.objects.filter(verified=True).count(), 410)
+        self.assertTrue(User.objects.filter(role=User.Role.STUDENT, is_paid=True).exists())
+        self.assertFalse(User.objects.exclude(role=User.Role.STUDENT).exclude(is_paid=None).exists())
+        self.assertTrue(User.objects.get(email='student0@seed.dreamdrive.test').check_password('seed-password'))
+
+    def test_deterministic(self):
+        """Test the same seed gives the same data, after clearing the previous run."""
+        first = self.seed(seed=7)
+        with self.assertRaises(CommandError):
+            self.seed(seed=7)
+
+        self.assertEqual(self.seed(seed=7, clear=True), first)
+        self.assertNotEqual(self.seed(seed=8, clear=True), first)
+        self.assertEqual(StudentProfile.objects.count(), 400)
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test the load_test command against a live server."""
+
+    def test_load_test_report(self):
+        """Test every operation is run without errors and reported to the file."""
+        out = StringIO()
+        with tempfile.NamedTemporaryFile(suffix='.json') as output, \
+                patch.object(SlidingWindowRateThrottle, 'get_rate', return_value=None):
+            call_command(
+                'load_test', base_url=self.live_server_url, concurrency=2, duration=1.5,
+                mix={'register': 1, 'login': 1, 'refresh': 1, 'me_get': 1, 'me_patch': 1,
+                     'admin_users': 1, 'admin_groups': 1, 'admin_students': 1},
+                output=output.name, label='test', stdout=out,
+            )
+            report = json.load(output)
+
+        self.assertEqual(report['label'], 'test')
+        self.assertEqual(report['totals']['errors'], 0, report['operations'])
+        self.assertGreater(report['totals']['requests'], 0)
+        for result in report['operations'].values():
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+        self.assertIn('total', out.getvalue())
+        self.assertFalse(User.objects.filter(email__startswith='loadtest-').exists())
@@ -0,0 +1,275 @@
+"""
+Tests for the conditional GETs of the API reads.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import user_cache
+from core.models import DrivingCategory, Filial, Group, StudentProfile, TeacherProfile
+from user.serializers import MyTokenObtainPairSerializer
+
+
+ME_URL = reverse('user:me')
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+GROUPS_URL = reverse('group:group-list')
+STUDENTS_URL = reverse('student-list')
+FILIALS_URL = reverse('group:filial-list')
+DRIVING_CATEGORIES_URL = reverse('group:driving-category-list')
+
+
+def user_detail_url(user_id):
+    return reverse('user:admin-users-detail', args=[user_id])
+
+
+def group_detail_url(group_id):
+    return reverse('group:group-detail', args=[group_id])
+
+
+def student_detail_url(student_id):
+    return reverse('student-detail', args=[student_id])
+
+
+def filial_detail_url(filial_id):
+    return reverse('group:filial-detail', args=[filial_id])
+
+
+class MeConditionalTests(TestCase):
+    """Test the conditional GET of the current user."""
+
+    def setUp(self):
+        caches['default'].clear()
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123', first_name='Test', last_name='User',
+        )
+        self.client = APIClient()
+        self.login()
+
+    def login(self):
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_not_modified(self):
+        """Test a current copy is answered with 304 and the validators."""
+        res = self.client.get(ME_URL)
+        etag = res['ETag']
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertIn('no-cache', res['Cache-Control'])
+        self.assertEqual(res.content, b'')
+
+    def test_modified_after_new_token(self):
+        """Test the ETag follows the token claims the user is served from."""
+        etag = self.client.get(ME_URL)['ETag']
+        self.user.first_name = 'Changed'
+        self.user.save()
+        self.login()
+
+        res = self.client.get(ME_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['first_name'], 'Changed')
+        self.assertNotEqual(res['ETag'], etag)
+
+
+class AdminConditionalTests(TestCase):
+    """Test the conditional GETs of the admin viewsets."""
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(email='admin@example.com', password='adminpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        self.student = get_user_model().objects.create_user(email='student@example.com', password='testpass123')
+        teacher = get_user_model().objects.create_user(
+            email='teacher@example.com', password='testpass123', first_name='Old', last_name='Name',
+        )
+        self.teacher = TeacherProfile.objects.create(user=teacher, type=TeacherProfile.TeachingType.THEORY)
+        self.group = Group.objects.create(
+            name='B-1', driving_category=DrivingCategory.objects.create(name='B'),
+            filial=Filial.objects.create(city='Kyiv', address='Main St, 1'),
+            teacher=self.teacher, type=Group.GroupType.THEORY,
+        )
+        self.profile = StudentProfile.objects.create(user=self.student, group=self.group)
+
+    def revalidate(self, url):
+        """Return the answer to a revalidation of the current copy of the URL."""
+        etag = self.client.get(url)['ETag']
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_retrieve_not_modified(self):
+        """Test an unchanged user is answered with 304, without adding a query."""
+        url = user_detail_url(self.student.id)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(res['Last-Modified'][-3:], 'GMT')
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 1)
+
+    def test_retrieve_modified(self):
+        """Test a changed user is answered in full."""
+        url = user_detail_url(self.student.id)
+        etag = self.client.get(url)['ETag']
+        self.client.patch(url, {'first_name': 'Changed'})
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['first_name'], 'Changed')
+
+    def test_retrieve_modified_by_login(self):
+        """Test a login, which leaves updated_at as is, changes the rendered last_login."""
+        url = user_detail_url(self.student.id)
+        etag = self.client.get(url)['ETag']
+        update_last_login(None, self.student)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(res.data['last_login'])
+
+    def test_if_modified_since(self):
+        """Test Last-Modified is honoured when no ETag is sent."""
+        url = user_detail_url(self.student.id)
+        last_modified = self.client.get(url)['Last-Modified']
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_representations_differ(self):
+        """Test the ETag differs per sparse fieldset."""
+        etag = self.client.get(user_detail_url(self.student.id))['ETag']
+
+        res = self.client.get(f'{user_detail_url(self.student.id)}?fields=id', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_missing(self):
+        """Test a missing object is still answered with 404."""
+        res = self.client.get(user_detail_url(0), HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_modified_by_new_and_deleted_rows(self):
+        """Test the ETag of a list covers the rows of the page."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.revalidate(ADMIN_USERS_URL)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 2)
+        etag = self.client.get(ADMIN_USERS_URL)['ETag']
+
+        other = get_user_model().objects.create_user(email='other@example.com', password='testpass123')
+        res = self.client.get(ADMIN_USERS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Last-Modified', res)
+
+        other.delete()
+        res = self.client.get(ADMIN_USERS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_group_modified_by_teacher_name(self):
+        """Test the ETag of a group changes with the rows it renders."""
+        url = group_detail_url(self.group.id)
+        self.assertEqual(self.revalidate(url).status_code, status.HTTP_304_NOT_MODIFIED)
+        etag = self.client.get(url)['ETag']
+
+        self.teacher.user.first_name = 'New'
+        self.teacher.user.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['teacher'], 'New Name (Theory)')
+
+    def test_group_list_modified_by_filial(self):
+        """Test the ETag of the group list changes with a rendered filial."""
+        etag = self.client.get(GROUPS_URL)['ETag']
+        self.group.filial.city = 'Lviv'
+        self.group.filial.save()
+
+        res = self.client.get(GROUPS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_student_modified_by_deleted_group(self):
+        """Test a profile whose group is deleted is answered in full."""
+        url = student_detail_url(self.profile.id)
+        etag = self.client.get(url)['ETag']
+        self.group.delete()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['group'])
+
+    def test_expanded_student(self):
+        """Test expanded relations are covered by the ETag."""
+        url = f'{student_detail_url(self.profile.id)}?expand=user'
+        self.assertEqual(self.revalidate(url).status_code, status.HTTP_304_NOT_MODIFIED)
+        etag = self.client.get(url)['ETag']
+
+        self.student.last_name = 'Changed'
+        self.student.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_expanded_group_of_student(self):
+        """Test the relations rendered by an expanded group are covered by the ETag."""
+        url = f'{student_detail_url(self.profile.id)}?expand=group'
+        etag = self.client.get(url)['ETag']
+        self.group.driving_category.name = 'BE'
+        self.group.driving_category.save()
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['group']['driving_category']['name'], 'BE')
+
+    def test_uncovered_expansion(self):
+        """Test expansions not covered by the lookups are answered without ETag."""
+        res = self.client.get(f'{GROUPS_URL}?expand=students')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', res)
+
+    def test_student_list(self):
+        """Test the profile list is answered conditionally."""
+        self.assertEqual(self.revalidate(STUDENTS_URL).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_filial_not_modified(self):
+        """Test filials are answered conditionally, and change with their columns."""
+        url = filial_detail_url(self.group.filial_id)
+        self.assertEqual(self.revalidate(url).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.revalidate(FILIALS_URL).status_code, status.HTTP_304_NOT_MODIFIED)
+        etag = self.client.get(FILIALS_URL)['ETag']
+
+        self.group.filial.address = 'Main St, 2'
+        self.group.filial.save()
+
+        res = self.client.get(FILIALS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_driving_category_list(self):
+        """Test the driving categories are answered conditionally."""
+        self.assertEqual(self.revalidate(DRIVING_CATEGORIES_URL).status_code, status.HTTP_304_NOT_MODIFIED)
+        etag = self.client.get(DRIVING_CATEGORIES_URL)['ETag']
+        DrivingCategory.objects.create(name='C')
+
+        res = self.client.get(DRIVING_CATEGORIES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,67 @@
+"""Tests for the password hashing policy."""
+from allauth.account.models import EmailAddress
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+LOGIN_URL = reverse('rest_login')
+
+FAST_HASHING = {
+    'PBKDF2_ITERATIONS': 1000,
+    'ARGON2_TIME_COST': 1,
+    'ARGON2_MEMORY_COST': 1024,
+    'ARGON2_PARALLELISM': 1,
+}
+
+PBKDF2_FIRST = ['core.hashers.PBKDF2PasswordHasher', 'core.hashers.Argon2PasswordHasher']
+ARGON2_FIRST = ['core.hashers.Argon2PasswordHasher', 'core.hashers.PBKDF2PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHING=FAST_HASHING, PASSWORD_HASHERS=PBKDF2_FIRST)
+class PasswordHashingTests(TestCase):
+    """Test the hasher costs and the upgrade of hashes on login."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+        )
+        EmailAddress.objects.create(user=self.user, email=self.user.email, verified=True, primary=True)
+        self.client = APIClient()
+
+    def login(self):
+        res = self.client.post(LOGIN_URL, {'email': 'user@example.com', 'password': 'testpass123'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+
+    def test_password_hashed_with_configured_iterations(self):
+        """Test new hashes use the configured cost."""
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_outdated_cost_upgraded_on_login(self):
+        """Test a hash with fewer iterations is rehashed on login."""
+        with self.settings(PASSWORD_HASHING={**FAST_HASHING, 'PBKDF2_ITERATIONS': 2000}):
+            self.login()
+
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertTrue(self.user.check_password('testpass123'))
+
+    def test_hasher_upgraded_on_login(self):
+        """Test a PBKDF2 hash is replaced with Argon2 once it is preferred."""
+        with self.settings(PASSWORD_HASHERS=ARGON2_FIRST):
+            self.login()
+
+            self.assertEqual(identify_hasher(self.user.password).algorithm, 'argon2')
+            self.assertIn('m=1024,t=1,p=1', self.user.password)
+
+    def test_current_hash_not_rewritten_on_login(self):
+        """Test a hash with the current parameters is kept."""
+        password = self.user.password
+
+        self.login()
+
+        self.assertEqual(self.user.password, password)
@@ -0,0 +1,63 @@
+"""
+Tests for the shared HTTP session.
+"""
+import time
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from core.http import build_session, get_session, reset_session
+from core.tests.http_stub import StubServer
+
+
+class PooledSessionTests(SimpleTestCase):
+    """Test pooling, retries and timeouts of the shared session."""
+
+    def setUp(self):
+        reset_session()
+        self.addCleanup(reset_session)
+
+    def test_connections_reused(self):
+        """Test the shared session keeps one connection to the host."""
+        with StubServer({('GET', '/ok'): (200, {})}) as server:
+            for _ in range(10):
+                get_session().get(f'{server.url}/ok')
+
+            self.assertEqual(server.connections, 1)
+
+            for _ in range(10):
+                with build_session() as session:
+                    session.get(f'{server.url}/ok')
+
+            self.assertEqual(server.connections, 11)
+
+    def test_idempotent_request_retried(self):
+        """Test a GET is retried on a 503."""
+        statuses = iter([503, 503, 200])
+        with StubServer({('GET', '/flaky'): lambda: (next(statuses), {})}) as server:
+            res = get_session().get(f'{server.url}/flaky')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_post_not_retried(self):
+        """Test a POST, e.g. an OAuth code, is sent only once."""
+        with StubServer({('POST', '/token'): (503, {})}) as server:
+            res = get_session().post(f'{server.url}/token', data={'code': 'abc'})
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(len(server.requests), 1)
+
+    @override_settings(HTTP_CLIENT={'READ_TIMEOUT': 0.1, 'RETRIES': 0})
+    def test_timeout_bounds_latency(self):
+        """Test a slow response fails after the read timeout."""
+        def slow():
+            time.sleep(1)
+            return 200, {}
+
+        with StubServer({('GET', '/slow'): slow}) as server:
+            start = time.perf_counter()
+            with self.assertRaises(requests.RequestException):
+                get_session().get(f'{server.url}/slow')
+
+            self.assertLess(time.perf_counter() - start, 0.5)
@@ -0,0 +1,151 @@
+"""
+Tests for the queued email delivery, against a local SMTP server.
+"""
+import asyncio
+import re
+import socket
+import time
+from datetime import timedelta
+from io import StringIO
+
+from aiosmtpd.controller import Controller
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from core.models import OutgoingEmail
+
+
+def get_free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """SMTP handler recording the messages with the client port they came from."""
+
+    def __init__(self):
+        self.messages = []
+        self.delay = 0
+        self.replies = []
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.replies:
+            return self.replies.pop(0)
+        self.messages.append((session.peer[1], envelope.rcpt_tos, envelope.content))
+        return '250 Message accepted for delivery'
+
+
+SMTP_PORT = get_free_port()
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_PORT=SMTP_PORT,
+    EMAIL_USE_TLS=False,
+    EMAIL_HOST_USER='',
+    EMAIL_HOST_PASSWORD='',
+    EMAIL_OUTBOX={'RETRY_BACKOFF': 30, 'MAX_ATTEMPTS': 3},
+)
+class QueuedEmailTests(TestCase):
+    """Test queueing emails and sending them from the worker."""
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.controller = Controller(self.handler, hostname='127.0.0.1', port=SMTP_PORT)
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+
+    def queue(self, count):
+        mail.send_mass_mail(
+            (f'Subject {i}', 'Body', 'from@example.com', [f'user{i}@example.com']) for i in range(count)
+        )
+
+    def send_queued(self, **options):
+        out = StringIO()
+        call_command('send_queued_mail', once=True, stdout=out, **options)
+        return out.getvalue()
+
+    def test_send_queues_without_smtp(self):
+        """Test sending an email stores it in the outbox only."""
+        mail.send_mail('Subject', 'Body', 'from@example.com', ['user@example.com'])
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.recipients, ['user@example.com'])
+        self.assertIn(b'Subject: Subject', bytes(email.message))
+        self.assertEqual(self.handler.messages, [])
+
+    def test_request_latency_independent_of_smtp(self):
+        """Test a password reset request does not wait for a slow SMTP server."""
+        caches['throttle'].clear()
+        get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        self.handler.delay = 1
+
+        start = time.perf_counter()
+        res = self.client.post(reverse('password_reset'), {'email': 'user@example.com'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertLess(time.perf_counter() - start, self.handler.delay)
+        self.assertEqual(OutgoingEmail.objects.get().recipients, ['user@example.com'])
+
+        self.send_queued()
+
+        self.assertEqual(len(self.handler.messages), 1)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_batches_sent_over_one_connection(self):
+        """Test the worker sends every batch over the same SMTP connection."""
+        self.queue(120)
+
+        out = self.send_queued(batch_size=50)
+
+        self.assertIn('Sent 120 emails', out)
+        rate = int(re.search(r'\((\d+)/s\)', out).group(1))
+        self.assertGreater(rate, 100)
+        self.assertEqual(len(self.handler.messages), 120)
+        self.assertEqual(len({port for port, _, _ in self.handler.messages}), 1)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_rejected_email_retried_with_backoff(self):
+        """Test a temporary rejection is retried after the backoff."""
+        self.handler.replies = ['451 Try again later']
+        self.queue(2)
+
+        self.assertIn('Sent 1 emails', self.send_queued())
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('451', email.last_error)
+        self.assertGreater(email.send_after, timezone.now() + timedelta(seconds=25))
+
+        self.assertIn('Sent 0 emails', self.send_queued())
+
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        self.assertIn('Sent 1 emails', self.send_queued())
+        self.assertEqual(len(self.handler.messages), 2)
+
+    def test_permanent_rejection_not_retried(self):
+        """Test a 5xx rejection is not retried."""
+        self.handler.replies = ['554 Rejected']
+        self.queue(1)
+
+        self.send_queued()
+
+        self.assertEqual(OutgoingEmail.objects.get().attempts, 3)
+
+    def test_connection_failure_retries_batch(self):
+        """Test every email of the batch is retried when the server is down."""
+        self.queue(3)
+
+        with override_settings(EMAIL_PORT=get_free_port()):
+            self.assertIn('Sent 0 emails in', self.send_queued())
+
+        self.assertEqual(list(OutgoingEmail.objects.values_list('attempts', flat=True)), [1, 1, 1])
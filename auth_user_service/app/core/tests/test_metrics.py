@@ -0,0 +1,155 @@
+"""
+Tests for the Prometheus metrics.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import user_cache
+from core.throttling import AuthIPThrottle
+from core.tokens import RefreshToken
+from user.serializers import MyTokenObtainPairSerializer
+
+
+LOGIN_URL = reverse('rest_login')
+REFRESH_URL = reverse('token_refresh')
+ME_URL = reverse('user:me')
+METRICS_URL = reverse('metrics')
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTests(TestCase):
+    """Test the metrics recorded for the requests."""
+
+    def setUp(self):
+        caches['default'].clear()
+        caches['throttle'].clear()
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        EmailAddress.objects.create(user=self.user, email=self.user.email, verified=True, primary=True)
+        self.client = APIClient()
+
+    def test_latency_per_url_name(self):
+        """Test the latency of the requests is observed per URL name."""
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        before = sample('http_request_duration_seconds_count', view='user:me', method='GET')
+
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        after = sample('http_request_duration_seconds_count', view='user:me', method='GET')
+        self.assertEqual(after - before, 2)
+
+    def test_unmatched_paths_share_a_label(self):
+        """Test unknown paths do not create a series each."""
+        before = sample('http_requests_total', view='unmatched', method='GET', status='404')
+
+        self.client.get('/no-such-page/')
+
+        self.assertEqual(sample('http_requests_total', view='unmatched', method='GET', status='404') - before, 1)
+
+    def test_login_outcomes(self):
+        """Test successful and failed logins are counted."""
+        success = sample('auth_logins_total', method='password', outcome='success')
+        failure = sample('auth_logins_total', method='password', outcome='failure')
+
+        self.client.post(LOGIN_URL, {'email': 'user@example.com', 'password': 'testpass123'})
+        self.client.post(LOGIN_URL, {'email': 'user@example.com', 'password': 'wrong'})
+
+        self.assertEqual(sample('auth_logins_total', method='password', outcome='success') - success, 1)
+        self.assertEqual(sample('auth_logins_total', method='password', outcome='failure') - failure, 1)
+
+    def test_throttled_login(self):
+        """Test throttled logins are counted apart from the failures."""
+        throttled = sample('auth_logins_total', method='password', outcome='throttled')
+
+        with patch.object(AuthIPThrottle, 'get_rate', return_value='0/min'):
+            res = self.client.post(LOGIN_URL, {'email': 'user@example.com', 'password': 'testpass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(sample('auth_logins_total', method='password', outcome='throttled') - throttled, 1)
+
+    def test_refresh_and_blacklist_hits(self):
+        """Test refreshes are counted, and reuse of a rotated token hits the blacklist."""
+        token = str(RefreshToken.for_user(self.user))
+        success = sample('auth_token_refreshes_total', outcome='success')
+        failure = sample('auth_token_refreshes_total', outcome='failure')
+        hits = sample('auth_token_blacklist_hits_total', source='cache')
+
+        self.client.post(REFRESH_URL, {'refresh': token})
+        res = self.client.post(REFRESH_URL, {'refresh': token})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(sample('auth_token_refreshes_total', outcome='success') - success, 1)
+        self.assertEqual(sample('auth_token_refreshes_total', outcome='failure') - failure, 1)
+        self.assertEqual(sample('auth_token_blacklist_hits_total', source='cache') - hits, 1)
+
+    def test_connection_reuse(self):
+        """Test the requests count the connections they reused."""
+        before = sample('db_request_connections_total', alias='default', outcome='reused')
+
+        self.client.post(LOGIN_URL, {'email': 'user@example.com', 'password': 'wrong'})
+
+        self.assertEqual(sample('db_request_connections_total', alias='default', outcome='reused') - before, 1)
+
+    def test_metrics_endpoint(self):
+        """Test the metrics are exposed in the Prometheus text format."""
+        self.client.post(LOGIN_URL, {'email': 'user@example.com', 'password': 'wrong'})
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'http_request_duration_seconds_bucket{', res.content)
+        self.assertIn(b'auth_logins_total{method="password",outcome="failure"}', res.content)
+
+    def test_metrics_endpoint_restricted(self):
+        """Test only the allowed networks read the metrics, whatever X-Forwarded-For says."""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5', HTTP_X_FORWARDED_FOR='127.0.0.1')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.settings(METRICS={'ALLOWED_NETWORKS': ['203.0.113.0/24']}):
+            res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+# Run in a fresh interpreter, where PROMETHEUS_MULTIPROC_DIR is set before
+# prometheus_client is imported.
+WORKER_SCRIPT = '''
+import django
+django.setup()
+from core.metrics import LOGINS
+LOGINS.labels(method='password', outcome='success').inc(3)
+'''
+
+
+class MultiprocessMetricsTests(TestCase):
+    """Test the metrics of several processes are aggregated."""
+
+    def test_workers_aggregated(self):
+        """Test /metrics sums the values written by every process."""
+        with tempfile.TemporaryDirectory() as path:
+            env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': path, 'DJANGO_SETTINGS_MODULE': 'app.settings'}
+            for _ in range(2):
+                subprocess.run([sys.executable, '-c', WORKER_SCRIPT], env=env, cwd=settings.BASE_DIR, check=True)
+
+            with patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': path}):
+                res = self.client.get(METRICS_URL)
+
+        self.assertIn(b'auth_logins_total{method="password",outcome="success"} 6.0', res.content)
@@ -1,8 +1,9 @@
 """
 Tests for models
 """
+from django.db import IntegrityError, connection
 from django.test import TestCase
-from django.contrib.auth import get_user_model
+from django.contrib.auth import authenticate, get_user_model
 
 
 class ModelTests(TestCase):
@@ -62,3 +63,30 @@ class ModelTests(TestCase):
             password='adminpass'
         )
         self.assertEqual(user.role, get_user_model().Role.ADMIN)
+
+    def test_email_unique_ignoring_case(self):
+        """Test emails differing only by case are rejected"""
+        get_user_model().objects.create_user('test@example.com', 'test123')
+
+        with self.assertRaises(IntegrityError):
+            get_user_model().objects.create_user('TEST@example.com', 'test123')
+
+    def test_authenticate_ignores_email_case(self):
+        """Test logging in with a differently cased email"""
+        user = get_user_model().objects.create_user('Test@example.com', 'testpass123')
+
+        self.assertEqual(
+            authenticate(email='tEST@EXAMPLE.com', password='testpass123'),
+            user,
+        )
+
+    def test_email_lookup_uses_index(self):
+        """Test case-insensitive email lookups are an index scan"""
+        get_user_model().objects.create_user('test@example.com', 'test123')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        plan = get_user_model().objects.filter(email__iexact='TEST@example.com').explain()
+
+        self.assertNotIn('Seq Scan', plan)
+        self.assertIn('Index Cond: (upper((email)::text)', plan)
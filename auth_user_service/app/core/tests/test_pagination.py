@@ -0,0 +1,59 @@
+"""
+Tests for the pagination classes.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.pagination import MAX_PAGE_SIZE, KeysetPagination
+
+
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+
+
+class KeysetPaginationTests(TestCase):
+    """Test keyset pagination of the admin user list."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        for index in range(4):
+            get_user_model().objects.create_user(
+                email=f'user{index}@example.com',
+                password='testpass123',
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_pages_cover_all_rows_without_count(self):
+        """Test following the cursors returns every user once."""
+        emails = []
+        url = f'{ADMIN_USERS_URL}?page_size=2'
+
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                res = self.client.get(url)
+                emails += [user['email'] for user in res.data['results']]
+                url = res.data['next']
+
+        self.assertEqual(len(emails), 5)
+        self.assertEqual(len(set(emails)), 5)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+
+    def test_newest_users_first(self):
+        """Test users are ordered from the newest."""
+        res = self.client.get(ADMIN_USERS_URL)
+
+        self.assertEqual(res.data['results'][0]['email'], 'user3@example.com')
+
+    def test_page_size_is_capped(self):
+        """Test the requested page size is limited."""
+        request = Request(APIRequestFactory().get('/', {'page_size': 100000}))
+
+        self.assertEqual(KeysetPagination().get_page_size(request), MAX_PAGE_SIZE)
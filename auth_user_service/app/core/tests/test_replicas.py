@@ -0,0 +1,110 @@
+"""
+Tests for the routing of reads to read replicas.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.replicas import ReplicaRouter, RoutingState, _state, lag_monitor
+
+
+# A replica alias mirroring the test database, registered before the test
+# runner sets the databases up. Being a separate connection, it does not
+# see the data of the test transactions, so these tests check where the
+# queries run rather than what they return.
+connections.settings.setdefault('replica', {
+    **connections.settings['default'],
+    'TEST': {**connections.settings['default']['TEST'], 'MIRROR': 'default'},
+})
+
+
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+NEW_USER = {'email': 'new@example.com', 'password': 'newpass123', 'first_name': 'New', 'last_name': 'User'}
+GROUPS_URL = reverse('group:group-list')
+STUDENTS_URL = reverse('student-list')
+
+
+@override_settings(REPLICA_ROUTING={'REPLICAS': ['replica'], 'LAG_CHECK_INTERVAL': 0})
+class ReplicaRoutingTests(TestCase):
+    """Test the reads of opted-in views are served by the replica."""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        caches['default'].clear()
+        lag_monitor.clear()
+        self.admin = get_user_model().objects.create_superuser(email='admin@example.com', password='adminpass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def get(self, url):
+        """Return the response and the number of queries run on the replica and on the primary."""
+        with CaptureQueriesContext(connections['replica']) as replica, \
+                CaptureQueriesContext(connections['default']) as primary:
+            res = self.client.get(url)
+        return res, len(replica), len(primary)
+
+    def test_list_reads_from_replica(self):
+        """Test the list endpoints query the replica only."""
+        for url in (ADMIN_USERS_URL, GROUPS_URL, STUDENTS_URL):
+            res, replica_queries, primary_queries = self.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK, url)
+            self.assertGreater(replica_queries, 0, url)
+            self.assertEqual(primary_queries, 0, url)
+
+    def test_writer_pinned_to_primary(self):
+        """Test the reads following a write of the same user use the primary."""
+        res = self.client.post(ADMIN_USERS_URL, NEW_USER)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res, replica_queries, primary_queries = self.get(ADMIN_USERS_URL)
+
+        self.assertEqual(replica_queries, 0)
+        self.assertGreater(primary_queries, 0)
+        self.assertIn('new@example.com', [user['email'] for user in res.data['results']])
+
+    def test_pin_expires(self):
+        """Test reads go back to the replica once the pin expired."""
+        self.client.post(ADMIN_USERS_URL, NEW_USER)
+        caches['default'].clear()
+
+        _, replica_queries, _ = self.get(ADMIN_USERS_URL)
+
+        self.assertGreater(replica_queries, 0)
+
+    def test_lagging_replica_skipped(self):
+        """Test reads fall back to the primary when the replica lags."""
+        with patch.object(lag_monitor, 'measure', return_value=60.0):
+            _, replica_queries, primary_queries = self.get(ADMIN_USERS_URL)
+
+        self.assertEqual(replica_queries, 0)
+        self.assertGreater(primary_queries, 0)
+
+    def test_other_actions_read_from_primary(self):
+        """Test actions not opted in, such as exports, use the primary."""
+        _, replica_queries, _ = self.get(reverse('user:admin-users-export'))
+
+        self.assertEqual(replica_queries, 0)
+
+    def test_router_reads_own_writes(self):
+        """Test a request reads from the primary once it wrote."""
+        router = ReplicaRouter()
+        state = RoutingState()
+        state.use_replica = True
+        token = _state.set(state)
+        self.addCleanup(_state.reset, token)
+
+        self.assertEqual(router.db_for_read(get_user_model()), 'replica')
+        self.assertEqual(router.db_for_write(get_user_model()), 'default')
+        self.assertEqual(router.db_for_read(get_user_model()), 'default')
+
+    def test_primary_outside_requests(self):
+        """Test code running outside a request reads from the primary."""
+        self.assertEqual(ReplicaRouter().db_for_read(get_user_model()), 'default')
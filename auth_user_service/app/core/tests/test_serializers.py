@@ -0,0 +1,89 @@
+"""Tests for rendering lists from values() rows."""
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import DrivingCategory, Filial, Group, TeacherProfile
+from core.serializers import compile_values_representation
+from group.serializers import GroupSerializer
+from user.serializers import AdminUserSerializer
+
+User = get_user_model()
+
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+GROUPS_URL = reverse('group:group-list')
+
+
+class ValuesRepresentationTests(TestCase):
+    """Test the values() rendering matches the serializers."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+        teacher = User.objects.create_user(
+            email='teacher@example.com',
+            password='testpass123',
+            first_name='Ivan',
+            last_name='Franko',
+            role=User.Role.TEACHER,
+            is_paid=None,
+            birth_date=datetime.date(1990, 5, 17),
+            phone='+380000000000',
+            address='Street 1',
+        )
+        User.objects.create_user(email='student@example.com', password='testpass123', is_active=False)
+        category = DrivingCategory.objects.create(name='B')
+        filial = Filial.objects.create(city='Lviv', address='Street 2', description='Main')
+        Group.objects.create(
+            name='With teacher',
+            driving_category=category,
+            filial=filial,
+            teacher=TeacherProfile.objects.create(user=teacher, type=TeacherProfile.TeachingType.PRACTICE),
+            type=Group.GroupType.PRACTICE,
+        )
+        Group.objects.create(
+            name='Without teacher',
+            driving_category=category,
+            filial=filial,
+            type=Group.GroupType.THEORY,
+        )
+
+    def assert_parity(self, url, serializer_class, queryset, params=None):
+        res = self.client.get(url, params or {})
+
+        expected = serializer_class(queryset, many=True).data
+        self.assertEqual(res.data['results'], expected)
+
+    def test_admin_users_parity(self):
+        """Test the admin user list matches AdminUserSerializer."""
+        self.assert_parity(
+            ADMIN_USERS_URL, AdminUserSerializer, User.objects.order_by('-created_at', '-id'),
+        )
+
+    def test_groups_parity(self):
+        """Test the group list matches GroupSerializer."""
+        self.assert_parity(GROUPS_URL, GroupSerializer, Group.objects.order_by('id'))
+
+    def test_sparse_fieldset_parity(self):
+        """Test `?fields=` is applied to the values() rendering."""
+        res = self.client.get(GROUPS_URL, {'fields': 'name,teacher'})
+
+        self.assertEqual(res.data['results'], [
+            {'name': 'With teacher', 'teacher': 'Ivan Franko (Practice)'},
+            {'name': 'Without teacher', 'teacher': None},
+        ])
+
+    def test_unsupported_fields_are_not_compiled(self):
+        """Test many-to-many and reverse relations fall back to the serializer."""
+        self.assertIsNotNone(compile_values_representation(AdminUserSerializer()))
+        self.assertIsNotNone(compile_values_representation(GroupSerializer()))
+        self.assertIsNone(compile_values_representation(AdminUserSerializer(expand=['groups'])))
+        self.assertIsNone(compile_values_representation(GroupSerializer(expand=['students'])))
@@ -0,0 +1,32 @@
+"""
+Tests for the sizing of the production server.
+"""
+from django.test import SimpleTestCase, override_settings
+
+from core.serving import autotune, measure_hash_seconds
+
+
+class AutotuneTests(SimpleTestCase):
+    """Test the workers and threads derived from the CPUs and hash cost."""
+
+    def test_worker_per_cpu(self):
+        """Test one worker runs per CPU, and at least two."""
+        self.assertEqual(autotune(cpu_count=8, hash_seconds=0.3)[0], 8)
+        self.assertEqual(autotune(cpu_count=1, hash_seconds=0.3)[0], 2)
+
+    def test_threads_fit_latency_budget(self):
+        """Test expensive hashes get fewer threads."""
+        self.assertEqual(autotune(cpu_count=4, hash_seconds=0.3)[1], 3)
+        self.assertEqual(autotune(cpu_count=4, hash_seconds=0.15)[1], 6)
+        self.assertEqual(autotune(cpu_count=4, hash_seconds=0.3, latency_budget=0.6)[1], 2)
+
+    def test_threads_bounds(self):
+        """Test there is at least one thread and at most max_threads."""
+        self.assertEqual(autotune(cpu_count=4, hash_seconds=2)[1], 1)
+        self.assertEqual(autotune(cpu_count=4, hash_seconds=0.001)[1], 8)
+        self.assertEqual(autotune(cpu_count=4, hash_seconds=0)[1], 8)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_measure_hash_seconds(self):
+        """Test the cost of the preferred hasher is measured."""
+        self.assertLess(measure_hash_seconds(), 0.1)
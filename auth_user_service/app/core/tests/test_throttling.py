@@ -0,0 +1,127 @@
+"""Tests for the authentication throttles."""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.hashers import PBKDF2PasswordHasher
+from core.throttling import AuthEmailThrottle, AuthIPThrottle, SlidingWindowRateThrottle
+
+
+LOGIN_URL = reverse('rest_login')
+
+
+class MinuteThrottle(SlidingWindowRateThrottle):
+    rate = '3/min'
+
+    def get_cache_key(self, request, view):
+        return 'throttle_test'
+
+
+class SlidingWindowRateThrottleTests(SimpleTestCase):
+    """Test the sliding window estimate."""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        self.request = APIRequestFactory().post('/')
+
+    def attempt(self, now):
+        throttle = MinuteThrottle()
+        with patch.object(throttle, 'timer', return_value=now):
+            return throttle.allow_request(self.request, None), throttle
+
+    def test_requests_over_the_rate_are_rejected(self):
+        """Test the rate is enforced within a window."""
+        results = [self.attempt(6000 + second)[0] for second in range(4)]
+
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_previous_window_is_weighted(self):
+        """Test the previous window counts for the part still in the sliding window."""
+        for _ in range(3):
+            self.attempt(6000)
+
+        # Half of the previous window's 3 requests still count.
+        allowed, _ = self.attempt(6090)
+        self.assertTrue(allowed)
+        allowed, throttle = self.attempt(6090)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(throttle.wait(), 30)
+
+    def test_counters_are_stored_per_window(self):
+        """Test a key holds one counter per window."""
+        for second in range(3):
+            self.attempt(6000 + second)
+
+        self.assertEqual(caches['throttle'].get('throttle_test:100'), 3)
+
+
+@patch.object(AuthIPThrottle, 'rate', '100/min', create=True)
+@patch.object(AuthEmailThrottle, 'rate', '2/min', create=True)
+class AuthThrottleApiTests(TestCase):
+    """Test the throttling of the authentication endpoints."""
+
+    def setUp(self):
+        caches['throttle'].clear()
+        get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+
+    def test_login_throttled_per_email_before_hashing(self):
+        """Test a throttled login returns 429 without checking the password."""
+        payload = {'email': 'user@example.com', 'password': 'wrongpass'}
+        with patch.object(PBKDF2PasswordHasher, 'verify', return_value=False) as verify:
+            for _ in range(2):
+                res = self.client.post(LOGIN_URL, payload)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+            res = self.client.post(LOGIN_URL, {**payload, 'email': 'USER@example.com'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(verify.call_count, 2)
+
+    def test_login_throttled_per_ip(self):
+        """Test the IP limit applies across emails."""
+        with patch.object(AuthIPThrottle, 'rate', '2/min'):
+            for index in range(2):
+                self.client.post(LOGIN_URL, {'email': f'user{index}@example.com', 'password': 'x'})
+
+            res = self.client.post(LOGIN_URL, {'email': 'other@example.com', 'password': 'x'})
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_spoofed_forwarded_for_is_ignored(self):
+        """Test a client cannot evade the IP limit with X-Forwarded-For."""
+        with patch.object(AuthIPThrottle, 'rate', '2/min'):
+            for index in range(2):
+                self.client.post(
+                    LOGIN_URL, {'email': f'user{index}@example.com', 'password': 'x'},
+                    HTTP_X_FORWARDED_FOR=f'10.0.0.{index}',
+                )
+
+            res = self.client.post(
+                LOGIN_URL, {'email': 'other@example.com', 'password': 'x'}, HTTP_X_FORWARDED_FOR='10.0.0.9',
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_client_address_from_trusted_proxy(self):
+        """Test the address appended by a trusted proxy is the throttle key."""
+        request = APIRequestFactory().post(
+            LOGIN_URL, HTTP_X_FORWARDED_FOR='10.0.0.1, 192.0.2.7', REMOTE_ADDR='172.16.0.2',
+        )
+
+        self.assertIn('192.0.2.7', AuthIPThrottle().get_cache_key(request, None))
+
+    def test_auth_endpoints_are_throttled(self):
+        """Test registration, password reset and Google login are throttled."""
+        urls = [reverse('rest_register'), reverse('password_reset'), reverse('google_login')]
+        with patch.object(AuthIPThrottle, 'rate', '0/min'):
+            for url in urls:
+                res = self.client.post(url, {})
+
+                self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS, url)
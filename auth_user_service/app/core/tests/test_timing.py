@@ -0,0 +1,131 @@
+"""
+Tests for the per-request timing instrumentation.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.cache import user_cache
+from core.timing import RequestTimings, _timings, measure, time_query
+from user.serializers import MyTokenObtainPairSerializer
+
+
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+ME_URL = reverse('user:me')
+
+
+def parse_server_timing(header):
+    """Return the metrics of a Server-Timing header as {name: {param: value}}."""
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@override_settings(REQUEST_TIMING={'HEADER': True, 'LOG': True})
+class RequestTimingMiddlewareTests(TestCase):
+    """Test the measures reported for the requests."""
+
+    def setUp(self):
+        caches['default'].clear()
+        user_cache.clear()
+        self.admin = get_user_model().objects.create_superuser(email='admin@example.com', password='adminpass')
+        self.client = APIClient()
+        token = MyTokenObtainPairSerializer.get_token(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_server_timing_header(self):
+        """Test the header reports every measure and the queries run."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(ADMIN_USERS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        metrics = parse_server_timing(res['Server-Timing'])
+        self.assertEqual(set(metrics), {'total', 'db', 'auth', 'serializer', 'size'})
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+        self.assertEqual(metrics['size']['desc'], f'"{len(res.content)} bytes"')
+        self.assertGreater(float(metrics['auth']['dur']), 0)
+        self.assertGreater(float(metrics['serializer']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+
+    def test_async_view_measured(self):
+        """Test the async views are measured, including their authentication."""
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        metrics = parse_server_timing(res['Server-Timing'])
+        self.assertGreater(float(metrics['auth']['dur']), 0)
+
+    def test_log_record(self):
+        """Test a structured record is logged per request."""
+        with self.assertLogs('core.timing', 'INFO') as logs:
+            self.client.get(ADMIN_USERS_URL)
+
+        record = logs.records[0].request_timing
+        self.assertEqual(record['view'], 'user:admin-users-list')
+        self.assertEqual(record['status'], status.HTTP_200_OK)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertEqual(
+            set(record),
+            {'method', 'path', 'view', 'status', 'total_ms', 'db_ms', 'db_queries',
+             'auth_ms', 'serializer_ms', 'response_bytes'},
+        )
+
+    def test_streaming_response_size_omitted(self):
+        """Test streaming responses are reported without size."""
+        res = self.client.get(reverse('user:admin-users-export'))
+
+        self.assertTrue(res.streaming)
+        self.assertNotIn('size', parse_server_timing(res['Server-Timing']))
+
+    @override_settings(REQUEST_TIMING={'HEADER': False, 'LOG': False})
+    def test_disabled(self):
+        """Test the header and the log record can be turned off."""
+        with self.assertNoLogs('core.timing'):
+            res = self.client.get(ADMIN_USERS_URL)
+
+        self.assertNotIn('Server-Timing', res)
+
+
+class MeasureTests(TestCase):
+    """Test the measure helpers."""
+
+    def setUp(self):
+        self.timings = RequestTimings()
+        token = _timings.set(self.timings)
+        self.addCleanup(_timings.reset, token)
+
+    def test_nested_measure_counted_once(self):
+        """Test nested blocks of a measure are not counted twice."""
+        with measure('serializer'):
+            with measure('serializer'):
+                pass
+            inner = self.timings.serializer
+
+        self.assertEqual(inner, 0)
+        self.assertGreater(self.timings.serializer, 0)
+
+    def test_query_timer_installed(self):
+        """Test the queries are counted by the connection wrapper."""
+        self.assertIn(time_query, connection.execute_wrappers)
+
+        get_user_model().objects.exists()
+
+        self.assertEqual(self.timings.db_queries, 1)
+        self.assertGreater(self.timings.db, 0)
+
+    def test_outside_requests(self):
+        """Test nothing is measured outside requests."""
+        _timings.set(None)
+
+        with measure('auth'):
+            get_user_model().objects.exists()
+
+        self.assertEqual(self.timings.auth, 0)
+        self.assertEqual(self.timings.db_queries, 0)
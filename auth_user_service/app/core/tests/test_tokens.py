@@ -0,0 +1,120 @@
+"""Tests for the revoked token set and the pruning of expired tokens."""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.tokens import RefreshToken, revoked_tokens
+
+
+REFRESH_URL = reverse('token_refresh')
+VERIFY_URL = reverse('token_verify')
+
+
+class RevokedTokenSetTests(TestCase):
+    """Test revocation checks through the cache."""
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+
+    def test_unknown_token_checked_in_database(self):
+        """Test a token missing from an incomplete set is looked up."""
+        token = RefreshToken.for_user(self.user)
+
+        with self.assertNumQueries(1):
+            self.assertFalse(revoked_tokens.is_revoked(token['jti'], timezone.now()))
+
+    def test_complete_set_skips_database(self):
+        """Test no query is made once the set is warmed."""
+        revoked = RefreshToken.for_user(self.user)
+        revoked.blacklist()
+        caches['default'].clear()
+        valid = RefreshToken.for_user(self.user)
+
+        self.assertEqual(revoked_tokens.warm(), 1)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(revoked_tokens.is_revoked(revoked['jti'], timezone.now()))
+            self.assertFalse(revoked_tokens.is_revoked(valid['jti'], timezone.now()))
+
+    def test_blacklisted_token_added_to_set(self):
+        """Test blacklisting a token adds it to the cached set."""
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(revoked_tokens.is_revoked(token['jti'], timezone.now()))
+
+    def test_rotated_refresh_token_rejected(self):
+        """Test a refresh token cannot be reused after rotation."""
+        token = str(RefreshToken.for_user(self.user))
+
+        res = self.client.post(REFRESH_URL, {'refresh': token})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['refresh'], token)
+
+        res = self.client.post(REFRESH_URL, {'refresh': token})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        res = self.client.post(VERIFY_URL, {'token': token})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PruneTokensCommandTests(TestCase):
+    """Test the prune_tokens command."""
+
+    def create_token(self, user, jti, expires_at, blacklisted=False):
+        token = OutstandingToken.objects.create(
+            user=user, jti=jti, token=jti, created_at=timezone.now(), expires_at=expires_at,
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token)
+        return token
+
+    def test_prune_expired_tokens(self):
+        """Test expired tokens are deleted in batches and the others kept."""
+        caches['default'].clear()
+        user = get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        for index in range(3):
+            self.create_token(user, f'expired{index}', past, blacklisted=index == 0)
+        self.create_token(user, 'valid', future)
+        self.create_token(user, 'revoked', future, blacklisted=True)
+        out = StringIO()
+
+        call_command('prune_tokens', batch_size=2, stdout=out)
+
+        self.assertEqual(
+            set(OutstandingToken.objects.values_list('jti', flat=True)), {'valid', 'revoked'},
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertIn('Deleted 3 expired tokens.', out.getvalue())
+        self.assertIn('Cached 1 revoked tokens.', out.getvalue())
+        with self.assertNumQueries(0):
+            self.assertTrue(revoked_tokens.is_revoked('revoked', future))
+
+    @override_settings(DATABASE_POOLER='transaction')
+    def test_prune_behind_transaction_pooler(self):
+        """Test no session advisory lock is taken behind a transaction pooler."""
+        user = get_user_model().objects.create_user(email='user@example.com', password='testpass123')
+        self.create_token(user, 'expired', timezone.now() - timedelta(days=1))
+        out = StringIO()
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('prune_tokens', stdout=out)
+
+        self.assertFalse(any('advisory' in query['sql'] for query in queries))
+        self.assertIn('Deleted 1 expired tokens.', out.getvalue())
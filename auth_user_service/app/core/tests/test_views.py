@@ -0,0 +1,139 @@
+"""
+Tests for the async views of the hot endpoints.
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import path, resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt import views as jwt_views
+
+from accounts.views import TokenVerifyView
+
+from core.authentication import ClaimsJWTAuthentication, TokenBackedUser
+from core.cache import user_cache
+from core.tokens import RefreshToken
+from user.serializers import MyTokenObtainPairSerializer
+from user.views import AsyncManageUserView, ManageUserView
+
+
+ME_URL = reverse('user:me')
+VERIFY_URL = reverse('token_verify')
+
+# The hot endpoints as routed when served by ASGI.
+urlpatterns = [
+    path(ME_URL[1:], AsyncManageUserView.as_view()),
+    path(VERIFY_URL[1:], TokenVerifyView.as_view()),
+]
+
+
+class ServedViewTests(TestCase):
+    """Test the views the hot endpoints are routed to."""
+
+    def test_sync_views_by_default(self):
+        """Test WSGI serves the sync views, which need no event loop."""
+        self.assertIs(resolve(ME_URL).func.view_class, ManageUserView)
+        self.assertIs(resolve(VERIFY_URL).func.view_class, jwt_views.TokenVerifyView)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncManageUserViewTests(TestCase):
+    """Test the async retrieval of the authenticated user."""
+
+    def setUp(self):
+        caches['default'].clear()
+        user_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpass123', first_name='Test', last_name='User',
+        )
+        self.token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    async def test_aauthenticate_from_claims(self):
+        """Test async authentication returns the token-backed user."""
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        user, _ = await ClaimsJWTAuthentication().aauthenticate(request)
+
+        self.assertIsInstance(user, TokenBackedUser)
+        self.assertEqual(user.email, 'test@example.com')
+
+    def test_retrieve_unauthenticated(self):
+        """Test a request without token is rejected like by DRF."""
+        res = APIClient().get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.json(), {'detail': 'Authentication credentials were not provided.'})
+        self.assertEqual(res['WWW-Authenticate'], 'Bearer realm="api"')
+
+    def test_update_delegated_to_sync_view(self):
+        """Test updates are handled by the DRF view."""
+        res = self.client.patch(ME_URL, {'first_name': 'New'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'New')
+
+    def test_method_not_allowed(self):
+        """Test methods without a handler are rejected."""
+        res = self.client.delete(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncTokenVerifyViewTests(TestCase):
+    """Test the async token verification."""
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = get_user_model().objects.create_user(email='test@example.com', password='testpass123')
+        self.client = APIClient()
+
+    def test_verify_valid_token(self):
+        """Test a valid token is accepted from a JSON body."""
+        token = str(RefreshToken.for_user(self.user).access_token)
+
+        res = self.client.post(VERIFY_URL, {'token': token}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {})
+
+    def test_verify_invalid_token(self):
+        """Test an invalid token is rejected like by simplejwt."""
+        res = self.client.post(VERIFY_URL, {'token': 'invalid'})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.json(), {'detail': 'Token is invalid', 'code': 'token_not_valid'})
+
+    def test_verify_missing_token(self):
+        """Test the token is required."""
+        res = self.client.post(VERIFY_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.json(), {'token': ['This field is required.']})
+
+
+class ReadinessViewTests(TestCase):
+    """Test the readiness probe."""
+
+    def test_ready(self):
+        """Test the probe succeeds when the database answers."""
+        res = self.client.get(reverse('readiness'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {'status': 'ready'})
+
+    def test_database_unavailable(self):
+        """Test the probe fails without waiting when the database is down."""
+        with patch('core.views.connections') as connections:
+            connections.__getitem__.return_value.cursor.side_effect = OperationalError('down')
+            res = self.client.get(reverse('readiness'))
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json(), {'status': 'unavailable'})
@@ -0,0 +1,81 @@
+"""
+Sliding window throttles for the authentication endpoints.
+"""
+import hashlib
+
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Throttle with a sliding window counter.
+
+    Each key keeps the number of requests of the current and the previous
+    fixed window, and the rate is estimated by weighting the previous count
+    with the part of it still inside the sliding window. That is two
+    integers per key, expiring with the windows, instead of the timestamp
+    list of `SimpleRateThrottle`. Rejected requests are counted too.
+    """
+    cache_alias = 'throttle'
+
+    def __init__(self):
+        super().__init__()
+        self.cache = caches[self.cache_alias]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer() / self.duration
+        window = int(now)
+        self.elapsed = now - window
+        current_key = f'{self.key}:{window}'
+
+        self.cache.add(current_key, 0, timeout=2 * self.duration)
+        try:
+            self.current = self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr().
+            self.current = 1
+            self.cache.set(current_key, 1, timeout=2 * self.duration)
+        self.previous = self.cache.get(f'{self.key}:{window - 1}', 0)
+
+        return self.previous * (1 - self.elapsed) + self.current <= self.num_requests
+
+    def wait(self):
+        """Return the seconds until a request would be allowed."""
+        remaining = self.num_requests - self.current - 1
+        if self.previous and remaining >= 0:
+            return max(1 - remaining / self.previous - self.elapsed, 0) * self.duration
+        return (1 - self.elapsed) * self.duration
+
+
+class AuthIPThrottle(SlidingWindowRateThrottle):
+    """Throttle authentication requests per client IP."""
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AuthEmailThrottle(SlidingWindowRateThrottle):
+    """
+    Throttle authentication requests per email, across client IPs.
+
+    Requests without an email are not throttled here.
+    """
+    scope = 'auth_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+AUTH_THROTTLE_CLASSES = [AuthIPThrottle, AuthEmailThrottle]
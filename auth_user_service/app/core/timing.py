@@ -0,0 +1,204 @@
+"""
+Per-request performance instrumentation.
+
+`RequestTimingMiddleware` measures each request and reports, in a
+`core.timing` log record and, if enabled, a `Server-Timing` header:
+
+- total: wall time through the middleware stack and the view;
+- db: time and number of the database queries, on every connection;
+- auth: time authenticating the request (its queries included);
+- serializer: time validating and rendering the serializers of the view;
+- response size in bytes, except for streaming responses.
+
+The measures are kept in a contextvar, so they follow the request into the
+threads running the sync code of the async views.
+"""
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from core.settings import get_setting
+
+
+REQUEST_TIMING_DEFAULTS = {
+    # Add the Server-Timing header. Opt-in, since it discloses the time spent
+    # in the database to every client.
+    'HEADER': False,
+    # Log a record per request at INFO level to the `core.timing` logger.
+    'LOG': True,
+}
+
+
+logger = logging.getLogger('core.timing')
+
+
+class RequestTimings:
+    """Measures of the current request; times are in seconds."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.db = 0.0
+        self.db_queries = 0
+        # Aliases of the connections queried, and of those opened, by the request.
+        self.aliases = set()
+        self.opened = set()
+        self.auth = 0.0
+        self.serializer = 0.0
+        self.response_size = None
+        self.depth = {}
+
+    def finish(self, response):
+        self.total = time.perf_counter() - self.start
+        if not response.streaming:
+            self.response_size = len(response.content)
+
+    def header(self):
+        metrics = [
+            f'total;dur={self.total * 1000:.2f}',
+            f'db;dur={self.db * 1000:.2f};desc="{self.db_queries} queries"',
+            f'auth;dur={self.auth * 1000:.2f}',
+            f'serializer;dur={self.serializer * 1000:.2f}',
+        ]
+        if self.response_size is not None:
+            metrics.append(f'size;desc="{self.response_size} bytes"')
+        return ', '.join(metrics)
+
+    def record(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'db_ms': round(self.db * 1000, 2),
+            'db_queries': self.db_queries,
+            'auth_ms': round(self.auth * 1000, 2),
+            'serializer_ms': round(self.serializer * 1000, 2),
+            'response_bytes': self.response_size,
+        }
+
+
+_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def get_timings():
+    """Return the measures of the current request, None outside requests."""
+    return _timings.get()
+
+
+@contextmanager
+def measure(name):
+    """
+    Add the time spent in the block to the `name` measure of the request.
+    Nested blocks of the same measure are only counted once.
+    """
+    timings = _timings.get()
+    if timings is None or timings.depth.get(name):
+        yield
+        return
+    timings.depth[name] = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.depth[name] = 0
+        setattr(timings, name, getattr(timings, name) + time.perf_counter() - start)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper counting and timing the queries of requests."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.db_queries += 1
+        timings.aliases.add(context['connection'].alias)
+
+
+def install_query_timer(connection):
+    """
+    Add `time_query` to the execute wrappers of a newly opened connection,
+    once, and note that the current request opened it.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+    timings = _timings.get()
+    if timings is not None:
+        timings.opened.add(connection.alias)
+
+
+class TimedSerializerMixin:
+    """Count the validation and rendering of the serializer as serializer time."""
+
+    def is_valid(self, *args, **kwargs):
+        with measure('serializer'):
+            return super().is_valid(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with measure('serializer'):
+            return super().to_representation(instance)
+
+
+class RequestTimingFormatter(logging.Formatter):
+    """Format the records of `core.timing` as one JSON object per line."""
+
+    def format(self, record):
+        return json.dumps({
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            **getattr(record, 'request_timing', {'message': record.getMessage()}),
+        })
+
+
+class RequestTimingMiddleware:
+    """Measure the request and report it; keep first in MIDDLEWARE."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+        return self.report(request, response, timings)
+
+    def report(self, request, response, timings):
+        timings.finish(response)
+        if get_setting('REQUEST_TIMING', 'HEADER', REQUEST_TIMING_DEFAULTS):
+            response['Server-Timing'] = timings.header()
+        if get_setting('REQUEST_TIMING', 'LOG', REQUEST_TIMING_DEFAULTS) and logger.isEnabledFor(logging.INFO):
+            match = request.resolver_match
+            logger.info(
+                '%s %s %s %.2fms', request.method, request.path, response.status_code, timings.total * 1000,
+                extra={'request_timing': {
+                    'method': request.method,
+                    'path': request.path,
+                    'view': match.view_name if match else None,
+                    'status': response.status_code,
+                    **timings.record(),
+                }},
+            )
+        return response
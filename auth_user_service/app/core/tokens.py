@@ -0,0 +1,134 @@
+"""
+Cache-backed revocation checks of JWTs.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from core.metrics import BLACKLIST_HITS
+
+
+TOKEN_REVOCATION_DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'revoked-token',
+    # How long the set is trusted to be complete after warm().
+    'COMPLETE_TTL': 2 * 60 * 60,
+    'WARM_CHUNK_SIZE': 2000,
+}
+
+
+class RevokedTokenSet:
+    """
+    Set of the JTIs of blacklisted tokens, kept in the shared Django cache.
+
+    A JTI in the set is revoked without querying the database. A JTI missing
+    from it is only known not to be revoked while the set is complete, that
+    is after `warm()` loaded every unexpired blacklisted token and until
+    `COMPLETE_TTL` elapses; otherwise the blacklist table is queried. Tokens
+    blacklisted afterwards are added by a signal handler, so the cache must
+    be shared by all processes and must not evict entries (e.g. a Redis
+    database with `noeviction`). With the per-process locmem backend only
+    the process calling `warm()` skips the database.
+    """
+
+    def __init__(self, **options):
+        self._options = options
+
+    @property
+    def config(self):
+        config = dict(TOKEN_REVOCATION_DEFAULTS)
+        config.update(getattr(settings, 'TOKEN_REVOCATION', {}))
+        config.update(self._options)
+        return config
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    def _key(self, jti):
+        return f"{self.config['KEY_PREFIX']}:{jti}"
+
+    def _complete_key(self):
+        return f"{self.config['KEY_PREFIX']}:complete"
+
+    @staticmethod
+    def _timeout(expires_at):
+        # Expired tokens are rejected anyway, so the entry can expire too.
+        return max(int((expires_at - timezone.now()).total_seconds()), 1)
+
+    def add(self, jti, expires_at):
+        """Add a revoked token until it expires."""
+        self.cache.set(self._key(jti), True, timeout=self._timeout(expires_at))
+
+    def is_revoked(self, jti, expires_at):
+        """Return whether the token is blacklisted."""
+        key = self._key(jti)
+        cached = self.cache.get_many([key, self._complete_key()])
+        if key in cached:
+            BLACKLIST_HITS.labels('cache').inc()
+            return True
+        if cached:
+            return False
+
+        revoked = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if revoked:
+            BLACKLIST_HITS.labels('database').inc()
+            self.add(jti, expires_at)
+        return revoked
+
+    async def ais_revoked(self, jti, expires_at):
+        """Async version of `is_revoked`."""
+        key = self._key(jti)
+        cached = await self.cache.aget_many([key, self._complete_key()])
+        if key in cached:
+            BLACKLIST_HITS.labels('cache').inc()
+            return True
+        if cached:
+            return False
+
+        revoked = await BlacklistedToken.objects.filter(token__jti=jti).aexists()
+        if revoked:
+            BLACKLIST_HITS.labels('database').inc()
+            await self.cache.aset(key, True, timeout=self._timeout(expires_at))
+        return revoked
+
+    def warm(self):
+        """Load every unexpired blacklisted token; return their number."""
+        chunk_size = self.config['WARM_CHUNK_SIZE']
+        rows = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now(),
+        ).values_list('token__jti', 'token__expires_at').iterator(chunk_size=chunk_size)
+
+        count = 0
+        chunk = {}
+        latest = timezone.now()
+        for jti, expires_at in rows:
+            chunk[self._key(jti)] = True
+            latest = max(latest, expires_at)
+            count += 1
+            if len(chunk) == chunk_size:
+                self.cache.set_many(chunk, timeout=self._timeout(latest))
+                chunk = {}
+        if chunk:
+            self.cache.set_many(chunk, timeout=self._timeout(latest))
+
+        self.cache.set(self._complete_key(), True, timeout=self.config['COMPLETE_TTL'])
+        return count
+
+
+revoked_tokens = RevokedTokenSet()
+
+
+class RefreshToken(tokens.RefreshToken):
+    """Refresh token checking the revoked set before the blacklist table."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if revoked_tokens.is_revoked(jti, datetime_from_epoch(self.payload['exp'])):
+            raise TokenError(_('Token is blacklisted'))
@@ -0,0 +1,121 @@
+"""
+Base view for the async implementations of the hot endpoints, and the
+readiness probe and metrics of the service.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from rest_framework import exceptions, status
+
+from core.authentication import ClaimsJWTAuthentication
+from core.metrics import get_registry, is_scrape_allowed
+from core.replicas import aroute_reads_to_replica
+
+
+def get_served_view(sync_view_class, async_view_class):
+    """
+    Return the async view class when the app is served by ASGI
+    (`settings.ASYNC_VIEWS`), else the sync one: under WSGI, an async view
+    runs every request in a new event loop through `async_to_sync`, which
+    costs more than the sync view.
+    """
+    return async_view_class if settings.ASYNC_VIEWS else sync_view_class
+
+
+class AsyncAPIView(View):
+    """
+    Async JSON view answering like the DRF views.
+
+    DRF runs views synchronously, so under ASGI every request to them holds
+    a thread for its whole duration, including the time spent waiting on
+    the cache, the database or an outbound HTTP call. These views await
+    them instead. The request is authenticated with `authentication_class`
+    when `authentication_required`, and `APIException`s are rendered like
+    DRF's exception handler does.
+
+    Methods listed in `sync_methods` are handed as a whole to `sync_view`,
+    e.g. the writes of an endpoint whose reads are served here. With
+    `replica_reads`, the safe requests read from a replica, see core.replicas.
+    """
+    authentication_class = ClaimsJWTAuthentication
+    authentication_required = True
+    sync_view = None
+    sync_methods = ()
+    replica_reads = False
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated, so CSRF does not apply, as with the DRF views.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() in self.sync_methods:
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+        try:
+            if self.authentication_required:
+                await self.authenticate(request)
+            if self.replica_reads:
+                await aroute_reads_to_replica(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+
+    async def authenticate(self, request):
+        result = await self.authentication_class().aauthenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+        request.user, request.auth = result
+
+    def get_data(self, request):
+        """Return the parsed JSON or form body."""
+        if request.content_type != 'application/json':
+            return request.POST
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            raise exceptions.ParseError(f'JSON parse error - {exc}')
+        if not isinstance(data, dict):
+            raise exceptions.ParseError('Expected a JSON object.')
+        return data
+
+    def handle_exception(self, request, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = JsonResponse(data, status=exc.status_code, safe=False)
+        if exc.status_code == status.HTTP_401_UNAUTHORIZED:
+            response['WWW-Authenticate'] = self.authentication_class().authenticate_header(request)
+        return response
+
+
+class ReadinessView(View):
+    """
+    Readiness probe for the load balancer or orchestrator: 200 when the
+    primary database answers, 503 otherwise.
+
+    Unlike `wait_for_db`, it checks once and answers at once, so a process
+    is only sent traffic while it can serve it. The check runs on the
+    persistent connection of the serving thread.
+    """
+
+    def get(self, request):
+        try:
+            with connections['default'].cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            return JsonResponse({'status': 'unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return JsonResponse({'status': 'ready'})
+
+
+class MetricsView(View):
+    """Prometheus metrics of every worker process, see core.metrics."""
+
+    def get(self, request):
+        if not is_scrape_allowed(request):
+            return HttpResponseForbidden()
+        return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -1,5 +1,12 @@
 from rest_framework import serializers
-from core.models import Group, Filial, DrivingCategory
+from core.models import Group, Filial, DrivingCategory, TeacherProfile
+from core.serializers import SparseFieldsetMixin
+from core.timing import TimedSerializerMixin
+
+
+def format_teacher(teaching_type, first_name, last_name):
+    """Render a teacher from its columns as TeacherProfile.__str__ does."""
+    return f'{first_name} {last_name} ({TeacherProfile.TeachingType(teaching_type).label})'
 
 
 class FilialSerializer(serializers.ModelSerializer):
@@ -12,7 +19,7 @@ class DrivingCategorySerializer(serializers.ModelSerializer):
         model = DrivingCategory
         fields = ['id', 'name']
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     driving_category = DrivingCategorySerializer()
     teacher = serializers.StringRelatedField()
     filial = FilialSerializer()
@@ -20,3 +27,14 @@ class GroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = ['id', 'name', 'driving_category', 'teacher', 'filial', 'type']
+        # Read by TeacherProfile.__str__.
+        field_lookups = {
+            'teacher': ['teacher__type', 'teacher__user__first_name', 'teacher__user__last_name'],
+        }
+        value_formatters = {
+            'teacher': format_teacher,
+        }
+        expandable_fields = {
+            'teacher': ('user_profile.serializers.TeacherProfileSerializer', {'read_only': True}),
+            'students': ('user_profile.serializers.StudentProfileSerializer', {'many': True, 'read_only': True}),
+        }
@@ -1,3 +1,169 @@
+"""Tests for the group API."""
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import DrivingCategory, Filial, Group, StudentProfile, TeacherProfile
+
+
+GROUPS_URL = reverse('group:group-list')
+GROUPS_EXPORT_URL = reverse('group:group-export')
+
+
+def get_roster_url(filial_id):
+    return reverse('group:filial-roster', args=[filial_id])
+
+
+# Queries allowed for listing groups, independent of the number of rows.
+GROUP_LIST_QUERY_BUDGET = 1
+
+
+def create_group(index):
+    """Create and return a group with its own filial and teacher."""
+    teacher = get_user_model().objects.create_user(
+        email=f'teacher{index}@example.com',
+        password='testpass123',
+        first_name='Teacher',
+        last_name=str(index),
+        role=get_user_model().Role.TEACHER,
+    )
+    return Group.objects.create(
+        name=f'Group {index}',
+        driving_category=DrivingCategory.objects.create(name=f'C{index}'),
+        teacher=TeacherProfile.objects.create(user=teacher, type=TeacherProfile.TeachingType.THEORY),
+        filial=Filial.objects.create(city='Kyiv', address=f'Street {index}'),
+        type=Group.GroupType.THEORY,
+    )
+
+
+class GroupApiTests(TestCase):
+    """Test the group API."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def list_groups(self):
+        """List groups and return the response and the number of queries."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(GROUPS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, len(queries)
+
+    def test_list_groups(self):
+        """Test groups are listed with their nested relations."""
+        group = create_group(1)
+
+        res, _ = self.list_groups()
+
+        self.assertEqual(len(res.data['results']), 1)
+        data = res.data['results'][0]
+        self.assertEqual(data['teacher'], str(group.teacher))
+        self.assertEqual(data['filial']['city'], group.filial.city)
+        self.assertEqual(data['driving_category']['name'], group.driving_category.name)
+
+    def test_list_groups_query_budget(self):
+        """Test listing groups issues a constant number of queries."""
+        create_group(0)
+        _, queries_for_one = self.list_groups()
+
+        for index in range(1, 10):
+            create_group(index)
+        res, queries_for_many = self.list_groups()
+
+        self.assertEqual(len(res.data['results']), 10)
+        self.assertLessEqual(queries_for_many, GROUP_LIST_QUERY_BUDGET)
+        self.assertEqual(queries_for_many, queries_for_one)
+
+    def test_list_groups_sparse_fieldset(self):
+        """Test `?fields=` skips the joins of the relations not rendered."""
+        group = create_group(1)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(GROUPS_URL, {'fields': 'id,name'})
+
+        self.assertEqual(res.data['results'], [{'id': group.id, 'name': group.name}])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_list_groups_expanded(self):
+        """Test expanded teachers and students cost a constant number of queries."""
+        for index in range(3):
+            group = create_group(index)
+            student = get_user_model().objects.create_user(
+                email=f'student{index}@example.com',
+                password='testpass123',
+            )
+            StudentProfile.objects.create(user=student, group=group)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(GROUPS_URL, {'expand': 'teacher,students'})
+
+        data = res.data['results'][0]
+        self.assertEqual(data['teacher']['type'], TeacherProfile.TeachingType.THEORY)
+        self.assertEqual(len(data['students']), 1)
+        self.assertEqual(len(queries), 2)
+
+
+class GroupExportApiTests(TestCase):
+    """Test streaming group and roster exports."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.group = create_group(1)
+        self.empty_group = create_group(2)
+        for index, is_paid in enumerate([True, False]):
+            student = get_user_model().objects.create_user(
+                email=f'student{index}@example.com',
+                password='testpass123',
+                is_paid=is_paid,
+            )
+            StudentProfile.objects.create(user=student, group=self.group)
+
+    def export(self, url, params):
+        res = self.client.get(url, {'file_format': 'jsonl', **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        content = b''.join(res.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export_groups_with_students(self):
+        """Test one row is exported per student, and per empty group."""
+        rows = self.export(GROUPS_EXPORT_URL, {'fields': 'group_id,student_email'})
+
+        self.assertEqual(rows, [
+            {'group_id': self.group.id, 'student_email': 'student0@example.com'},
+            {'group_id': self.group.id, 'student_email': 'student1@example.com'},
+            {'group_id': self.empty_group.id, 'student_email': None},
+        ])
+
+    def test_export_groups_filtered_by_is_paid(self):
+        """Test filtering exported students by is_paid."""
+        rows = self.export(GROUPS_EXPORT_URL, {'fields': 'student_email', 'is_paid': 'false'})
+
+        self.assertEqual(rows, [{'student_email': 'student1@example.com'}])
+
+    def test_export_filial_roster(self):
+        """Test the roster lists the students of the filial."""
+        rows = self.export(get_roster_url(self.group.filial_id), {'fields': 'email,group_name'})
 
-# Create your tests here.
+        self.assertEqual(rows, [
+            {'email': 'student0@example.com', 'group_name': self.group.name},
+            {'email': 'student1@example.com', 'group_name': self.group.name},
+        ])
+        self.assertEqual(self.export(get_roster_url(self.empty_group.filial_id), {}), [])
@@ -1,23 +1,105 @@
 """Views for the group app: allows for CRUD operations on the Group, Filial, and DrivingCategory models."""
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, serializers
+from rest_framework.decorators import action
 
-from core.models import Filial, Group, DrivingCategory
+from core.authentication import ClaimsJWTAuthentication
+from core.conditional import ConditionalGetMixin
+from core.export import export_response
+from core.filters import apply_query_filters
+from core.models import Filial, Group, DrivingCategory, StudentProfile
+from core.pagination import KeysetPagination
+from core.replicas import ReplicaReadMixin
+from core.serializers import ValuesListViewMixin
 from .serializers import FilialSerializer, GroupSerializer, DrivingCategorySerializer
 
 
-class DrivingCategoryViewSet(viewsets.ModelViewSet):
+class DrivingCategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = DrivingCategory.objects.all()
     serializer_class = DrivingCategorySerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
 
 
-class FilialViewSet(viewsets.ModelViewSet):
+class FilialViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Filial.objects.all()
     serializer_class = FilialSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
 
+    roster_fields = {
+        'student_id': 'user_id',
+        'email': 'user__email',
+        'first_name': 'user__first_name',
+        'last_name': 'user__last_name',
+        'phone': 'user__phone',
+        'is_paid': 'user__is_paid',
+        'group_id': 'group_id',
+        'group_name': 'group__name',
+        'group_type': 'group__type',
+        'driving_category': 'group__driving_category__name',
+    }
+    roster_filters = {
+        'is_paid': ('user__is_paid', serializers.BooleanField()),
+    }
 
-class GroupViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get'])
+    def roster(self, request, pk=None):
+        """Stream the students of the filial's groups as CSV or JSON Lines."""
+        filial = self.get_object()
+        queryset = apply_query_filters(
+            request,
+            StudentProfile.objects.filter(group__filial=filial).order_by('group_id', 'user_id'),
+            self.roster_filters,
+        )
+        return export_response(request, queryset, self.roster_fields, f'filial-{filial.pk}-roster')
+
+
+class GroupViewSet(ReplicaReadMixin, ConditionalGetMixin, ValuesListViewMixin, viewsets.ModelViewSet):
+    # The relations rendered by GroupSerializer are joined by the mixin.
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
-    permission_classes = [permissions.IsAdminUser]
\ No newline at end of file
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
+
+    etag_field_lookups = {
+        'driving_category': ('driving_category_id', 'driving_category__updated_at'),
+        'filial': ('filial_id', 'filial__updated_at'),
+        'teacher': ('teacher_id', 'teacher__updated_at', 'teacher__user__updated_at'),
+    }
+    etag_expand_lookups = {
+        'teacher': ('teacher_id', 'teacher__updated_at'),
+    }
+
+    export_fields = {
+        'group_id': 'id',
+        'group_name': 'name',
+        'group_type': 'type',
+        'driving_category': 'driving_category__name',
+        'filial_id': 'filial_id',
+        'filial_city': 'filial__city',
+        'teacher_email': 'teacher__user__email',
+        'student_id': 'students__user_id',
+        'student_email': 'students__user__email',
+        'student_first_name': 'students__user__first_name',
+        'student_last_name': 'students__user__last_name',
+        'student_is_paid': 'students__user__is_paid',
+    }
+    export_filters = {
+        'filial': ('filial', serializers.IntegerField()),
+        'is_paid': ('students__user__is_paid', serializers.BooleanField()),
+    }
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream groups with their students, one row per student.
+
+        Groups without students are exported as a single row with empty
+        student columns.
+        """
+        queryset = apply_query_filters(
+            request, Group.objects.order_by('id', 'students__user_id'), self.export_filters
+        )
+        return export_response(request, queryset, self.export_fields, 'groups')
@@ -0,0 +1,72 @@
+"""
+Gunicorn configuration of the production server, loaded by `gunicorn` run
+from this directory.
+
+The workers and threads are sized by core.serving.autotune from the CPU
+count and the measured cost of a password hash, unless set with
+SERVER_WORKERS / SERVER_THREADS. Every thread keeps its own persistent
+database connection, so workers x threads must fit the database (or
+pooler) connection limit.
+
+The application is loaded once in the master before forking (preload_app),
+so the workers share the memory of the imported modules. Because of it,
+SIGHUP restarts the workers gracefully but keeps the loaded code; deploy new
+code with SIGUSR2 (new master), then SIGWINCH and SIGQUIT to the old one.
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Metrics of all the workers, aggregated by /metrics; see core.metrics.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus-metrics')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+django.setup()
+
+from django.core.exceptions import ImproperlyConfigured  # noqa: E402
+from django.db import connections  # noqa: E402
+from prometheus_client import multiprocess  # noqa: E402
+
+from core.checks import check_shared_caches  # noqa: E402
+from core.metrics import reset_multiprocess_dir  # noqa: E402
+from core.serving import autotune  # noqa: E402
+
+
+wsgi_app = 'app.wsgi:application'
+bind = os.getenv('SERVER_BIND', '0.0.0.0:8000')
+preload_app = True
+
+_workers, _threads = autotune(latency_budget=float(os.getenv('SERVER_LATENCY_BUDGET', 1.0)))
+workers = int(os.getenv('SERVER_WORKERS', 0)) or _workers
+threads = int(os.getenv('SERVER_THREADS', 0)) or _threads
+worker_class = 'gthread'
+
+# The workers must share the caches; refuse to start with per-process ones.
+_errors = check_shared_caches(workers)
+if _errors:
+    raise ImproperlyConfigured('\n'.join(f'{error.msg} HINT: {error.hint}' for error in _errors))
+
+# Requests in flight get this long to finish on reload or shutdown.
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.getenv('SERVER_TIMEOUT', 60))
+keepalive = int(os.getenv('SERVER_KEEPALIVE', 5))
+# Recycle the workers now and then, staggered, to bound memory growth.
+max_requests = int(os.getenv('SERVER_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('SERVER_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def when_ready(server):
+    # The workers must not inherit a connection opened by the master.
+    connections.close_all()
+    server.log.info('Serving with %s workers of %s threads', workers, threads)
+
+
+def on_starting(server):
+    reset_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,204 @@
+"""
+Bulk import of users.
+"""
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+from rest_framework import serializers
+
+from core.models import Group, StudentProfile
+from core.settings import get_setting
+
+
+BULK_IMPORT_DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'HASH_WORKERS': None,
+    'MAX_API_ROWS': 100,
+}
+
+
+class BulkUserRowSerializer(serializers.Serializer):
+    """Validate a single row of a bulk import."""
+    email = serializers.EmailField()
+    password = serializers.CharField(min_length=8, write_only=True)
+    first_name = serializers.CharField(max_length=50, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=50, allow_blank=True, default='')
+    role = serializers.ChoiceField(
+        choices=get_user_model().Role.choices,
+        default=get_user_model().Role.STUDENT,
+    )
+    is_paid = serializers.BooleanField(default=False)
+    group = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate_email(self, value):
+        return get_user_model().objects.normalize_email(value)
+
+
+def read_rows(stream, file_format):
+    """Yield row dicts from a CSV or JSON Lines text stream.
+
+    Malformed JSON lines are yielded as None so they are reported as row
+    errors instead of aborting the import.
+    """
+    if file_format == 'csv':
+        for row in csv.DictReader(stream):
+            # Empty CSV cells mean "not provided".
+            yield {key: value for key, value in row.items() if value not in ('', None)}
+    elif file_format == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+    else:
+        raise ValueError(f'Unsupported format: {file_format}')
+
+
+def open_upload(upload):
+    """Return a text stream over an uploaded file."""
+    return io.TextIOWrapper(upload.file, encoding='utf-8')
+
+
+def _init_hash_worker():
+    """Configure Django in worker processes started with spawn."""
+    if not apps.ready:
+        django.setup()
+
+
+class BulkUserImporter:
+    """
+    Create users from an iterable of row dicts in batches.
+
+    Rows are validated as they are read, passwords of each batch are hashed
+    across a process pool and the users with their student profiles are
+    inserted with `bulk_create` in one transaction per batch. Invalid rows
+    are reported and skipped without aborting the batch.
+    """
+
+    def __init__(self, batch_size=None, workers=None):
+        self.batch_size = batch_size or get_setting('USER_BULK_IMPORT', 'BATCH_SIZE', BULK_IMPORT_DEFAULTS)
+        if workers is None:
+            workers = get_setting('USER_BULK_IMPORT', 'HASH_WORKERS', BULK_IMPORT_DEFAULTS) or os.cpu_count()
+        self.workers = workers
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        """Import the rows and return a summary of the result."""
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_hash_worker
+            )
+        try:
+            numbered_rows = enumerate(rows, start=1)
+            while True:
+                batch = list(islice(numbered_rows, self.batch_size))
+                if not batch:
+                    break
+                self._import_batch(batch, executor)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return {'created': self.created, 'errors': self.errors}
+
+    def _add_error(self, row_number, errors):
+        self.errors.append({'row': row_number, 'errors': errors})
+
+    def _validate_batch(self, batch):
+        """Return the valid rows of the batch as (row number, data)."""
+        valid = []
+        for row_number, row in batch:
+            serializer = BulkUserRowSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((row_number, serializer.validated_data))
+            else:
+                self._add_error(row_number, serializer.errors)
+
+        # Emails are unique ignoring case (served by the UPPER(email) index).
+        emails = [data['email'].upper() for _, data in valid]
+        existing = set(
+            get_user_model().objects
+            .annotate(email_upper=Upper('email'))
+            .filter(email_upper__in=emails)
+            .values_list('email_upper', flat=True)
+        )
+        group_ids = {data['group'] for _, data in valid if data.get('group')}
+        known_groups = set(
+            Group.objects.filter(id__in=group_ids).values_list('id', flat=True)
+        )
+
+        rows = []
+        for row_number, data in valid:
+            if data['email'].upper() in existing:
+                self._add_error(row_number, {'email': ['User with this email already exists.']})
+            elif data.get('group') and data['group'] not in known_groups:
+                self._add_error(row_number, {'group': ['Group does not exist.']})
+            else:
+                existing.add(data['email'].upper())
+                rows.append((row_number, data))
+        return rows
+
+    def _hash_passwords(self, passwords, executor):
+        if executor is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+    def _build_user(self, data, password_hash):
+        role = data['role']
+        return get_user_model()(
+            email=data['email'],
+            password=password_hash,
+            first_name=data['first_name'],
+            last_name=data['last_name'],
+            role=role,
+            # Mirrors User.save(), which bulk_create bypasses.
+            is_paid=data['is_paid'] if role == get_user_model().Role.STUDENT else None,
+        )
+
+    def _insert(self, rows, users):
+        """Insert users and the profiles of students."""
+        users = get_user_model().objects.bulk_create(users)
+        StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, group_id=data.get('group'))
+            for (_, data), user in zip(rows, users)
+            if user.role == get_user_model().Role.STUDENT
+        ])
+        return len(users)
+
+    def _import_batch(self, batch, executor):
+        rows = self._validate_batch(batch)
+        if not rows:
+            return
+
+        hashes = self._hash_passwords([data['password'] for _, data in rows], executor)
+        users = [self._build_user(data, password_hash) for (_, data), password_hash in zip(rows, hashes)]
+
+        try:
+            with transaction.atomic():
+                self.created += self._insert(rows, users)
+        except IntegrityError:
+            # A concurrent insert won the race for some email; retry row by
+            # row so only the conflicting rows are reported.
+            for row, user in zip(rows, users):
+                user.pk = None
+                try:
+                    with transaction.atomic():
+                        self.created += self._insert([row], [user])
+                except IntegrityError:
+                    self._add_error(row[0], {'non_field_errors': ['Row conflicts with existing data.']})
@@ -0,0 +1,38 @@
+"""
+Django command to import users from a CSV or JSON Lines file
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from user.bulk import BulkUserImporter, read_rows
+
+
+class Command(BaseCommand):
+    """Django command to bulk import users"""
+    help = 'Import users (and student profiles) from a CSV or JSON Lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to a .csv or .jsonl file.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], dest='file_format',
+                            help='File format, detected from the extension by default.')
+        parser.add_argument('--batch-size', type=int, help='Rows inserted per transaction.')
+        parser.add_argument('--workers', type=int, help='Processes used to hash passwords.')
+
+    def handle(self, *args, **options):
+        """Entry point for the command"""
+        path = options['path']
+        file_format = options['file_format'] or path.rsplit('.', 1)[-1].lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError('Cannot detect the file format, use --format.')
+
+        importer = BulkUserImporter(
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+        )
+        with open(path, encoding='utf-8', newline='') as stream:
+            result = importer.run(read_rows(stream, file_format))
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']} users, {len(result['errors'])} rows failed."
+        ))
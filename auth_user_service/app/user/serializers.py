@@ -1,12 +1,32 @@
 """
 Serializers for User API views.
 """
+from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers as jwt_serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
 
+from core.serializers import SparseFieldsetMixin
+from core.timing import TimedSerializerMixin
+from core.tokens import RefreshToken, revoked_tokens
 
-class UserSerializer(serializers.ModelSerializer):
+
+def validate_unique_email(value, instance=None):
+    """Reject an email used by another user, ignoring its case."""
+    users = get_user_model().objects.filter(email__iexact=value)
+    if instance is not None:
+        users = users.exclude(pk=instance.pk)
+    if users.exists():
+        raise serializers.ValidationError('user with this email already exists.')
+    return value
+
+
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
 
     class Meta:
@@ -17,6 +37,9 @@ class UserSerializer(serializers.ModelSerializer):
             'password': {'write_only': True, 'min_length': 8},
         }
 
+    def validate_email(self, value):
+        return validate_unique_email(value, self.instance)
+
     def create(self, validated_data):
         """Create a new user with encrypted password and return it."""
         return get_user_model().objects.create_user(**validated_data)
@@ -33,29 +56,48 @@ class UserSerializer(serializers.ModelSerializer):
                 'email': 'Email address cannot be changed.'
             })
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
-
         if password:
-            user.set_password(password)
-            user.save()
-
-        return user
+            # Hashed before the single save of ModelSerializer.update.
+            instance.set_password(password)
+        return super().update(instance, validated_data)
 
 
-class AdminUserSerializer(serializers.ModelSerializer):
+class AdminUserSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for the user object."""
 
     class Meta:
         model = get_user_model()
-        fields = '__all__'
+        fields = (
+            'id', 'password', 'last_login', 'is_superuser', 'email', 'first_name', 'last_name',
+            'role', 'birth_date', 'phone', 'address', 'is_active', 'is_staff', 'is_paid',
+            'created_at', 'updated_at', 'groups', 'user_permissions',
+        )
+        # Each many-to-many relation costs a prefetch query, so they are
+        # written as usual but only rendered when expanded.
+        expandable_fields = {
+            'groups': (serializers.PrimaryKeyRelatedField, {'many': True, 'read_only': True}),
+            'user_permissions': (serializers.PrimaryKeyRelatedField, {'many': True, 'read_only': True}),
+            'student_profile': ('user_profile.serializers.StudentProfileSerializer', {'read_only': True}),
+        }
 
         extra_kwargs = {
             'password': {'write_only': True, 'min_length': 8},
+            'groups': {'write_only': True},
+            'user_permissions': {'write_only': True},
         }
 
+    def validate_email(self, value):
+        return validate_unique_email(value, self.instance)
+
     def create(self, validated_data):
-        """Create a new user with encrypted password and return it."""
-        return get_user_model().objects.create_user(**validated_data)
+        """Create a new user with encrypted password and its relations, and return it."""
+        relations = {
+            name: validated_data.pop(name) for name in ('groups', 'user_permissions') if name in validated_data
+        }
+        user = get_user_model().objects.create_user(**validated_data)
+        for name, values in relations.items():
+            getattr(user, name).set(values)
+        return user
 
     def update(self, instance, validated_data):
         """Update a user instance.
@@ -69,13 +111,10 @@ class AdminUserSerializer(serializers.ModelSerializer):
                 'email': 'Email address cannot be changed.'
             })
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
-
         if password:
-            user.set_password(password)
-            user.save()
-
-        return user
+            # Hashed before the single save of ModelSerializer.update.
+            instance.set_password(password)
+        return super().update(instance, validated_data)
 
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -85,8 +124,62 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         """Generate a token for the user with additional claims."""
         token = super().get_token(user)
-
-        # Add custom claims
-        token['email'] = user.email
-        token['role'] = user.role
+        set_identity_claims(token, user)
         return token
+
+
+def set_identity_claims(token, user):
+    """Set the claims `ClaimsJWTAuthentication` serves the user from.
+
+    Only identity and authorization claims: profile fields such as the
+    names would go stale in the token after an update.
+    """
+    token['email'] = user.email
+    token['role'] = user.role
+    token['is_staff'] = user.is_staff
+
+
+class TokenRefreshSerializer(TimedSerializerMixin, CookieTokenRefreshSerializer):
+    """
+    Refresh serializer checking revocation through the revoked set.
+
+    The claims are copied from the refresh token into the new access token,
+    and kept by rotation, so they are re-issued from the current user: a
+    changed role is picked up by the next refresh instead of failing every
+    request with `token_claims_stale` until the next login.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(self.extract_refresh_token())
+        try:
+            user = get_user_model().objects.get(
+                **{jwt_settings.USER_ID_FIELD: refresh.payload.get(jwt_settings.USER_ID_CLAIM)}
+            )
+        except get_user_model().DoesNotExist:
+            user = None
+        if user is None or not jwt_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        set_identity_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    """Verify serializer checking revocation through the revoked set."""
+
+    def validate(self, attrs):
+        token = UntypedToken(attrs['token'])
+        jti = token.get(jwt_settings.JTI_CLAIM)
+        if jti and revoked_tokens.is_revoked(jti, datetime_from_epoch(token['exp'])):
+            raise serializers.ValidationError('Token is blacklisted')
+        return {}
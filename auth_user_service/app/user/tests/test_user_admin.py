@@ -31,7 +31,7 @@ class AdminUserApiTests(TestCase):
         res = self.client.get(ADMIN_USERS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertTrue(any(u['email'] == self.admin_user.email for u in res.data))
+        self.assertTrue(any(u['email'] == self.admin_user.email for u in res.data['results']))
 
     def test_admin_can_create_user(self):
         """Test admin can create a new user."""
@@ -61,6 +61,21 @@ class AdminUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('email', res.data)
 
+    def test_create_user_with_email_differing_in_case_fails(self):
+        """Test creating user with a differently cased existing email fails."""
+        User.objects.create_user(email='duplicate@example.com', password='pass1234')
+        payload = {
+            'email': 'DUPLICATE@example.com',
+            'password': 'pass1234',
+            'first_name': 'Dup',
+            'last_name': 'User'
+        }
+
+        res = self.client.post(ADMIN_USERS_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', res.data)
+
     def test_create_user_with_missing_fields_fails(self):
         """Test creating user with missing required fields fails."""
         payload = {
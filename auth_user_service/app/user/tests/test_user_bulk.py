@@ -0,0 +1,157 @@
+"""Tests for the bulk user import."""
+import io
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import DrivingCategory, Filial, Group, StudentProfile
+from user.bulk import BulkUserImporter
+
+User = get_user_model()
+
+BULK_URL = reverse('user:admin-users-bulk-import')
+
+
+def create_group():
+    return Group.objects.create(
+        name='Group 1',
+        driving_category=DrivingCategory.objects.create(name='B'),
+        filial=Filial.objects.create(city='Kyiv', address='Street 1'),
+        type=Group.GroupType.THEORY,
+    )
+
+
+@override_settings(USER_BULK_IMPORT={'HASH_WORKERS': 1})
+class BulkImportApiTests(TestCase):
+    """Test the bulk import endpoint."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+        self.group = create_group()
+
+    def test_import_reports_row_errors(self):
+        """Test valid rows are created and invalid ones reported."""
+        payload = [
+            {'email': 'student@example.com', 'password': 'testpass123', 'group': self.group.id},
+            {'email': 'teacher@example.com', 'password': 'testpass123', 'role': 'teacher'},
+            {'email': 'not-an-email', 'password': 'testpass123'},
+            {'email': 'admin@example.com', 'password': 'testpass123'},
+            {'email': 'student@example.com', 'password': 'testpass123'},
+            {'email': 'nogroup@example.com', 'password': 'testpass123', 'group': 9999},
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual([error['row'] for error in res.data['errors']], [3, 4, 5, 6])
+
+        student = User.objects.get(email='student@example.com')
+        self.assertTrue(student.check_password('testpass123'))
+        self.assertEqual(student.student_profile.group, self.group)
+        teacher = User.objects.get(email='teacher@example.com')
+        self.assertIsNone(teacher.is_paid)
+        self.assertFalse(StudentProfile.objects.filter(user=teacher).exists())
+
+    @override_settings(USER_BULK_IMPORT={'HASH_WORKERS': 4})
+    def test_import_hashes_in_process(self):
+        """Test the endpoint never forks a hashing pool from the serving worker."""
+        payload = [{'email': f'user{index}@example.com', 'password': 'testpass123'} for index in range(3)]
+
+        with mock.patch('user.bulk.ProcessPoolExecutor') as pool:
+            res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.data['created'], 3)
+        pool.assert_not_called()
+
+    @override_settings(USER_BULK_IMPORT={'HASH_WORKERS': 1, 'MAX_API_ROWS': 2})
+    def test_import_over_row_cap_refused(self):
+        """Test requests over the row cap are refused before any user is created."""
+        payload = [{'email': f'user{index}@example.com', 'password': 'testpass123'} for index in range(3)]
+        content = 'email,password\n' + ''.join(f'{row["email"]},testpass123\n' for row in payload)
+        upload = SimpleUploadedFile('users.csv', content.encode(), content_type='text/csv')
+
+        for res in (
+            self.client.post(BULK_URL, payload, format='json'),
+            self.client.post(BULK_URL, {'file': upload}, format='multipart'),
+        ):
+            self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            self.assertIn('import_users', res.data['detail'])
+        self.assertFalse(User.objects.filter(email__startswith='user').exists())
+
+        res = self.client.post(BULK_URL, payload[:2], format='json')
+        self.assertEqual(res.data['created'], 2)
+
+    def test_import_csv_upload(self):
+        """Test importing users from a CSV file."""
+        content = (
+            'email,password,first_name,last_name,group\n'
+            f'one@example.com,testpass123,One,User,{self.group.id}\n'
+            'two@example.com,short,Two,User,\n'
+        )
+        upload = SimpleUploadedFile('users.csv', content.encode(), content_type='text/csv')
+
+        res = self.client.post(BULK_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['errors'][0]['row'], 2)
+        self.assertIn('password', res.data['errors'][0]['errors'])
+        self.assertEqual(User.objects.get(email='one@example.com').first_name, 'One')
+
+    def test_import_jsonl_upload_with_malformed_line(self):
+        """Test a malformed JSON line is reported as a row error."""
+        content = '{"email": "one@example.com", "password": "testpass123"}\n{broken\n'
+        upload = SimpleUploadedFile('users.jsonl', content.encode())
+
+        res = self.client.post(BULK_URL, {'file': upload}, format='multipart')
+
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual(res.data['errors'][0]['row'], 2)
+
+    def test_non_admin_cannot_import(self):
+        """Test the endpoint is restricted to admins."""
+        user = User.objects.create_user(email='user@example.com', password='userpass')
+        self.client.force_authenticate(user=user)
+
+        res = self.client.post(BULK_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BulkUserImporterTests(TestCase):
+    """Test the importer and the import_users command."""
+
+    def test_hashes_passwords_in_worker_processes(self):
+        """Test batches are hashed with a process pool."""
+        rows = [
+            {'email': f'user{index}@example.com', 'password': 'testpass123'}
+            for index in range(3)
+        ]
+
+        result = BulkUserImporter(batch_size=2, workers=2).run(iter(rows))
+
+        self.assertEqual(result, {'created': 3, 'errors': []})
+        self.assertTrue(User.objects.get(email='user2@example.com').check_password('testpass123'))
+        self.assertEqual(StudentProfile.objects.count(), 3)
+
+    def test_import_users_command(self):
+        """Test the command imports a JSON Lines file."""
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl') as stream:
+            stream.write('{"email": "one@example.com", "password": "testpass123"}\n')
+            stream.flush()
+
+            call_command('import_users', stream.name, workers=1, stdout=io.StringIO())
+
+        self.assertTrue(User.objects.filter(email='one@example.com').exists())
@@ -0,0 +1,102 @@
+"""Tests for the streaming user export."""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.export import aiter_batches
+from core.models import DrivingCategory, Filial, Group, StudentProfile
+from user.serializers import MyTokenObtainPairSerializer
+
+User = get_user_model()
+
+EXPORT_URL = reverse('user:admin-users-export')
+
+
+def read_content(res):
+    return b''.join(res.streaming_content).decode()
+
+
+class UserExportApiTests(TestCase):
+    """Test exporting users."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.filial = Filial.objects.create(city='Kyiv', address='Street 1')
+        group = Group.objects.create(
+            name='Group 1',
+            driving_category=DrivingCategory.objects.create(name='B'),
+            filial=self.filial,
+            type=Group.GroupType.THEORY,
+        )
+        self.paid = User.objects.create_user(email='paid@example.com', password='testpass123', is_paid=True)
+        StudentProfile.objects.create(user=self.paid, group=group)
+        self.unpaid = User.objects.create_user(email='unpaid@example.com', password='testpass123')
+
+    def test_export_csv(self):
+        """Test users are streamed as CSV without passwords."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        lines = read_content(res).splitlines()
+        self.assertTrue(lines[0].startswith('id,email,'))
+        self.assertNotIn('password', lines[0])
+        self.assertEqual(len(lines), 4)
+
+    def test_export_jsonl_with_fields_and_filters(self):
+        """Test selecting fields and filtering by role, is_paid and filial."""
+        params = {
+            'file_format': 'jsonl',
+            'fields': 'email,is_paid,filial',
+            'role': 'student',
+            'is_paid': 'true',
+            'filial': self.filial.id,
+        }
+        res = self.client.get(EXPORT_URL, params)
+
+        rows = [json.loads(line) for line in read_content(res).splitlines()]
+        self.assertEqual(rows, [{'email': 'paid@example.com', 'is_paid': True, 'filial': self.filial.id}])
+
+    def test_export_unknown_field_fails(self):
+        """Test unknown fields are rejected."""
+        res = self.client.get(EXPORT_URL, {'fields': 'email,password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_export_invalid_filter_fails(self):
+        """Test invalid filter values are rejected."""
+        res = self.client.get(EXPORT_URL, {'role': 'pilot'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('role', res.data)
+
+    async def test_export_streamed_asynchronously_under_asgi(self):
+        """Test ASGI gets an async iterator, so the rows are not drained into a list first."""
+        token = await sync_to_async(MyTokenObtainPairSerializer.get_token)(self.admin_user)
+
+        res = await self.async_client.get(EXPORT_URL, {'fields': 'email'}, AUTHORIZATION=f'Bearer {token.access_token}')
+
+        self.assertTrue(res.is_async)
+        content = b''.join([chunk async for chunk in res.streaming_content]).decode()
+        self.assertCountEqual(
+            content.splitlines(), ['email', 'admin@example.com', 'paid@example.com', 'unpaid@example.com']
+        )
+
+    async def test_aiter_batches(self):
+        """Test the lines are read and sent in batches."""
+        batches = [batch async for batch in aiter_batches(iter(['a\n', 'b\n', 'c\n']), size=2)]
+
+        self.assertEqual(batches, ['a\nb\n', 'c\n'])
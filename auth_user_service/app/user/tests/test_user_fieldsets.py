@@ -0,0 +1,95 @@
+"""Tests for sparse fieldsets and expansion in the admin user API."""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group as PermissionGroup
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import StudentProfile
+
+User = get_user_model()
+
+ADMIN_USERS_URL = reverse('user:admin-users-list')
+
+
+def get_detail_url(user_id):
+    return reverse('user:admin-users-detail', args=[user_id])
+
+
+class UserFieldsetApiTests(TestCase):
+    """Test `?fields=` and `?expand=` on the admin user API."""
+
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.student = User.objects.create_user(email='student@example.com', password='testpass123')
+        StudentProfile.objects.create(user=self.student)
+        self.student.groups.add(PermissionGroup.objects.create(name='Editors'))
+
+    def get(self, url, params):
+        """Return the response and the SQL of the executed queries."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, [query['sql'] for query in queries.captured_queries]
+
+    def test_many_to_many_fields_are_not_rendered_by_default(self):
+        """Test users are listed in one query, without their groups."""
+        res, queries = self.get(ADMIN_USERS_URL, {})
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('groups', res.data['results'][0])
+        self.assertNotIn('user_permissions', res.data['results'][0])
+        self.assertNotIn('"password"', queries[0])
+
+    def test_many_to_many_fields_are_writable(self):
+        """Test groups and permissions are written, though not rendered."""
+        group = PermissionGroup.objects.create(name='Managers')
+
+        res = self.client.patch(get_detail_url(self.student.id), {'groups': [group.id]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn('groups', res.data)
+        self.assertEqual(list(self.student.groups.all()), [group])
+
+        res = self.client.post(ADMIN_USERS_URL, {
+            'email': 'new@example.com', 'password': 'testpass123', 'first_name': 'New', 'last_name': 'User',
+            'groups': [group.id],
+        }, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(User.objects.get(email='new@example.com').groups.all()), [group])
+
+    def test_fields_select_only_their_columns(self):
+        """Test `?fields=` trims the response and the selected columns."""
+        res, queries = self.get(ADMIN_USERS_URL, {'fields': 'id,email'})
+
+        self.assertEqual(res.data['results'][0], {'id': self.student.id, 'email': self.student.email})
+        self.assertNotIn('"first_name"', queries[0])
+
+    def test_expand_prefetches_relations(self):
+        """Test expanded relations are joined or prefetched."""
+        res, queries = self.get(
+            get_detail_url(self.student.id), {'fields': 'email', 'expand': 'groups,student_profile'}
+        )
+
+        self.assertEqual(set(res.data), {'email', 'groups', 'student_profile'})
+        self.assertEqual(len(res.data['groups']), 1)
+        self.assertEqual(res.data['student_profile']['user'], self.student.id)
+        self.assertEqual(len(queries), 2)
+
+    def test_unknown_fields_are_rejected(self):
+        """Test unknown fields and relations return a 400."""
+        res = self.client.get(ADMIN_USERS_URL, {'fields': 'email,secret'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+        res = self.client.get(ADMIN_USERS_URL, {'expand': 'password'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', res.data)
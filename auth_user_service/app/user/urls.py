@@ -4,7 +4,8 @@ URL mappings for the user API
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView, TokenVerifyView
 
-from user.views import UserCreateView, ManageUserView
+from core.views import get_served_view
+from user.views import UserCreateView, AsyncManageUserView, ManageUserView, UserCacheStatsView
 from user.router import urlpatterns as user_admin_urls
 
 
@@ -18,7 +19,8 @@ urlpatterns = [
     #path('logout/', LogoutView.as_view(), name='logout'),
     #path('change-password/', ChangePasswordView.as_view(), name='change_password'),
 
-    path('me/', ManageUserView.as_view(), name='me'),
+    path('me/', get_served_view(ManageUserView, AsyncManageUserView).as_view(), name='me'),
+    path('cache-stats/', UserCacheStatsView.as_view(), name='cache-stats'),
 
 
     # Include the user admin URLs
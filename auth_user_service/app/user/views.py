@@ -1,10 +1,27 @@
 """
 Views for the User API
 """
+from itertools import islice
+
 from django.contrib.auth import get_user_model
-from rest_framework import generics, viewsets, permissions
-from rest_framework_simplejwt import authentication
+from django.http import JsonResponse
+from rest_framework import generics, viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from core.authentication import ClaimsJWTAuthentication, get_model_user
+from core.cache import user_cache
+from core.conditional import ConditionalGetMixin, get_not_modified_response, make_etag, set_validators
+from core.export import export_response
+from core.filters import PrefixSearchFilter, QueryParamFilterBackend, StableOrderingFilter
+from core.pagination import CreatedAtKeysetPagination
+from core.replicas import ReplicaReadMixin
+from core.serializers import ValuesListViewMixin
+from core.settings import get_setting
+from core.views import AsyncAPIView
+from user.bulk import BULK_IMPORT_DEFAULTS, BulkUserImporter, open_upload, read_rows
 from user.serializers import UserSerializer, AdminUserSerializer
 
 
@@ -17,16 +34,155 @@ class UserCreateView(generics.CreateAPIView):
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """View to manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    # The fields rendered by UserSerializer.
+    etag_fields = ('email', 'first_name', 'last_name')
+
+    @classmethod
+    def get_etag(cls, user):
+        """Return the ETag of the user's representation."""
+        return make_etag(user.pk, *(getattr(user, name) for name in cls.etag_fields))
+
     def get_object(self):
-        """Retrieve and return the authenticated user."""
-        return self.request.user
+        """Retrieve and return the authenticated user.
+
+        Reads are served from the token claims and the cached user;
+        updates need the model.
+        """
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        return get_model_user(self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_etag(request.user)
+        response = get_not_modified_response(request, etag)
+        if response is None:
+            response = set_validators(super().retrieve(request, *args, **kwargs), etag)
+        return response
+
 
+class AsyncManageUserView(AsyncAPIView):
+    """Async retrieval of the authenticated user; updates go to `ManageUserView`."""
+    sync_view = staticmethod(ManageUserView.as_view())
+    sync_methods = ('put', 'patch')
+    replica_reads = True
 
-class UserAdminViewSet(viewsets.ModelViewSet):
+    async def get(self, request, *args, **kwargs):
+        # Served from the token claims and the cached user, see
+        # TokenBackedUser, and so is the ETag.
+        etag = ManageUserView.get_etag(request.user)
+        response = get_not_modified_response(request, etag)
+        if response is None:
+            response = set_validators(JsonResponse(UserSerializer(request.user).data), etag)
+        return response
+
+
+class UserAdminViewSet(ReplicaReadMixin, ConditionalGetMixin, ValuesListViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing users, accessible only to admins."""
     queryset = get_user_model().objects.all()
     serializer_class = AdminUserSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = CreatedAtKeysetPagination
+    filter_backends = [QueryParamFilterBackend, PrefixSearchFilter, StableOrderingFilter]
+
+    # Every filter is backed by an index, see the User model Meta and
+    # user/tests/test_user_filters.py.
+    query_filters = {
+        'role': ('role', serializers.ChoiceField(choices=get_user_model().Role.choices)),
+        'is_paid': ('is_paid', serializers.BooleanField()),
+        'is_active': ('is_active', serializers.BooleanField()),
+        'created_after': ('created_at__gte', serializers.DateTimeField()),
+        'created_before': ('created_at__lt', serializers.DateTimeField()),
+        'group': ('student_profile__group', serializers.IntegerField()),
+        'filial': ('student_profile__group__filial', serializers.IntegerField()),
+    }
+    search_fields = ['email', 'first_name', 'last_name']
+    ordering_fields = ['id', 'created_at', 'email', 'last_name']
+    ordering = ('-created_at', '-id')
+
+    etag_field_lookups = {
+        # Saved on login with update_fields, which leaves updated_at as is.
+        'last_login': ('last_login',),
+    }
+    etag_expand_lookups = {
+        'student_profile': ('student_profile__updated_at', 'student_profile__group_id'),
+    }
+
+    export_fields = {
+        'id': 'id',
+        'email': 'email',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'role': 'role',
+        'phone': 'phone',
+        'birth_date': 'birth_date',
+        'address': 'address',
+        'is_active': 'is_active',
+        'is_paid': 'is_paid',
+        'group': 'student_profile__group_id',
+        'filial': 'student_profile__group__filial_id',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream users as CSV or JSON Lines.
+
+        Columns are chosen with `?fields=`, the format with `?file_format=`,
+        and rows are filtered, searched and ordered as in the list.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(request, queryset, self.export_fields, 'users')
+
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[JSONParser, MultiPartParser])
+    def bulk_import(self, request):
+        """Create users from a JSON list or an uploaded CSV/JSON Lines file.
+
+        Students get a profile in the optional `group`. Invalid rows are
+        reported by row number and do not prevent the others from being created.
+        Requests over `MAX_API_ROWS` rows are refused with 413 before any is
+        imported; import them with `manage.py import_users`.
+        """
+        upload = request.FILES.get('file')
+        if upload is not None:
+            file_format = upload.name.rsplit('.', 1)[-1].lower()
+            if file_format not in ('csv', 'jsonl'):
+                return Response(
+                    {'file': ['Only .csv and .jsonl files are supported.']},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            rows = read_rows(open_upload(upload), file_format)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {'detail': 'Expected a list of users or a file upload.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_rows = get_setting('USER_BULK_IMPORT', 'MAX_API_ROWS', BULK_IMPORT_DEFAULTS)
+        rows = list(islice(rows, max_rows + 1))
+        if len(rows) > max_rows:
+            return Response(
+                {'detail': f'At most {max_rows} users can be imported per request; '
+                           'use manage.py import_users for larger files.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        # Hashed in-process: forking a pool from a serving worker would
+        # copy it per request and compete with the other workers for the
+        # CPUs. Large imports belong to the import_users command.
+        return Response(BulkUserImporter(workers=1).run(rows))
+
+
+class UserCacheStatsView(APIView):
+    """Report the user cache counters of the serving process."""
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(user_cache.stats())
@@ -1,17 +1,26 @@
 """Serializers for user profile models."""
 from rest_framework import serializers
 from core.models import StudentProfile, TeacherProfile
+from core.serializers import SparseFieldsetMixin
+from core.timing import TimedSerializerMixin
 
 
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = StudentProfile
         fields = ['id', 'user', 'group']
         read_only_fields = ['id']
+        expandable_fields = {
+            'user': ('user.serializers.AdminUserSerializer', {'read_only': True}),
+            'group': ('group.serializers.GroupSerializer', {'read_only': True}),
+        }
 
 
-class TeacherProfileSerializer(serializers.ModelSerializer):
+class TeacherProfileSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = TeacherProfile
         fields = ['id', 'user', 'type']
         read_only_fields = ['id']
+        expandable_fields = {
+            'user': ('user.serializers.AdminUserSerializer', {'read_only': True}),
+        }
@@ -1,3 +1,42 @@
+"""Tests for the user profile API."""
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from core.models import StudentProfile
+
+
+STUDENTS_URL = reverse('student-list')
+
+
+class StudentProfileApiTests(TestCase):
+    """Test the student profile API."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='adminpass',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_list_students_with_expanded_user(self):
+        """Test `?expand=user` renders the users with a join."""
+        for index in range(3):
+            user = get_user_model().objects.create_user(
+                email=f'student{index}@example.com',
+                password='testpass123',
+            )
+            StudentProfile.objects.create(user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(STUDENTS_URL, {'expand': 'user', 'fields': 'id'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(set(res.data['results'][0]), {'id', 'user'})
+        self.assertEqual(res.data['results'][0]['user']['email'], 'student0@example.com')
@@ -1,16 +1,40 @@
 """Serializers for user profiles."""
 from rest_framework import viewsets, permissions
+
+from core.authentication import ClaimsJWTAuthentication
+from core.conditional import ConditionalGetMixin
 from core.models import StudentProfile, TeacherProfile
+from core.pagination import KeysetPagination
+from core.replicas import ReplicaReadMixin
+from core.serializers import SparseFieldsetViewMixin
+from group.views import GroupViewSet
 from .serializers import StudentProfileSerializer, TeacherProfileSerializer
 
 
-class StudentProfileViewSet(viewsets.ModelViewSet):
+class StudentProfileViewSet(ReplicaReadMixin, ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = StudentProfile.objects.all()
+    etag_lookups = ('updated_at', 'user_id', 'group_id')
+    etag_expand_lookups = {
+        'user': ('user__updated_at',),
+        'group': tuple(
+            f'group__{lookup}'
+            for lookups in (GroupViewSet.etag_lookups, *GroupViewSet.etag_field_lookups.values())
+            for lookup in lookups
+        ),
+    }
     serializer_class = StudentProfileSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination
 
 
-class TeacherProfileViewSet(viewsets.ModelViewSet):
+class TeacherProfileViewSet(ReplicaReadMixin, ConditionalGetMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = TeacherProfile.objects.all()
+    etag_lookups = ('updated_at', 'user_id')
+    etag_expand_lookups = {
+        'user': ('user__updated_at',),
+    }
     serializer_class = TeacherProfileSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = KeysetPagination